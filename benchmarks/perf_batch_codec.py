@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import argparse
+import time
+
+from datahub.batch.batch_serializer import BatchSerializer
+from datahub.batch.binary_record import BinaryRecord
+from datahub.batch.record_codec import RecordCodec
+from datahub.batch.record_header import RecordHeader, RECORD_HEADER_SIZE
+from datahub.batch.utils import SchemaObject
+from datahub.models import RecordSchema, TupleRecord, FieldType, CompressFormat
+
+
+class Timer(object):
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        self.end = time.time()
+        self.secs = self.end - self.start
+        self.msecs = self.secs * 1000  # millisecs
+        if self.verbose:
+            print('elapsed time: %f ms' % self.msecs)
+
+
+FIELD_TYPES = [FieldType.BIGINT, FieldType.STRING, FieldType.DOUBLE, FieldType.BOOLEAN, FieldType.TIMESTAMP,
+               FieldType.INTEGER, FieldType.FLOAT, FieldType.STRING]
+FIELD_VALUES = [1234567, 'short', 10.01, True, 1455869335000000, 42, 1.5, 'a long string value over 7 bytes']
+
+
+def gen_records(column_num, record_num):
+    schema = RecordSchema.from_lists(['field_%d' % i for i in range(column_num)],
+                                     [FIELD_TYPES[i % len(FIELD_TYPES)] for i in range(column_num)])
+    values = [FIELD_VALUES[i % len(FIELD_VALUES)] for i in range(column_num)]
+    return schema, [TupleRecord(schema=schema, values=values) for _ in range(record_num)]
+
+
+def serialize_records(schema, records, shared_codec):
+    codec = RecordCodec(schema) if shared_codec else None
+    buffers = []
+    for record in records:
+        binary_record = BinaryRecord(schema=schema, version_id=0, codec=codec if codec else RecordCodec(schema))
+        for i in range(len(schema.field_list)):
+            binary_record.set_field(i, record.get_value(i))
+        buffers.append(binary_record.serialize())
+    return buffers
+
+
+def deserialize_records(schema, buffers, shared_codec):
+    codec = RecordCodec(schema) if shared_codec else None
+    for buffer in buffers:
+        record_header = RecordHeader.deserialize(buffer[:RECORD_HEADER_SIZE])
+        binary_record = BinaryRecord.deserialize(schema, buffer, record_header, codec if codec else RecordCodec(schema))
+        [binary_record.get_field(i) for i in range(binary_record.field_cnt)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--columns', help='column nums of schema', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--batch', help='batch record num', type=int, default=1000)
+    parser.add_argument('--round', help='round num', type=int, default=5)
+    args = parser.parse_args()
+    print("=============configuration=============")
+    print("columns:%s" % args.columns)
+    print("batch record num:%d" % args.batch)
+    print("round num:%d" % args.round)
+    print("=======================================\n\n")
+
+    schema_object = SchemaObject('py_perf_test_project', 'py_perf_test_topic', None)
+    for column_num in args.columns:
+        schema, records = gen_records(column_num, args.batch)
+
+        result = dict()
+        for shared_codec in (False, True):
+            with Timer() as t_serialize:
+                for i in range(0, args.round):
+                    buffers = serialize_records(schema, records, shared_codec)
+            with Timer() as t_deserialize:
+                for i in range(0, args.round):
+                    deserialize_records(schema, buffers, shared_codec)
+            result[shared_codec] = (t_serialize.msecs, t_deserialize.msecs)
+
+        with Timer() as t_batch:
+            for i in range(0, args.round):
+                BatchSerializer.deserialize(schema, schema_object,
+                                            BatchSerializer.serialize(CompressFormat.NONE, schema_object, records))
+
+        record_num = args.round * args.batch
+        print("===============columns: %d==================" % column_num)
+        for shared_codec, name in ((False, "codec per record"), (True, "shared codec")):
+            print("serialize with %s: %f records/s" % (name, 1000.0 * record_num / result[shared_codec][0]))
+            print("deserialize with %s: %f records/s" % (name, 1000.0 * record_num / result[shared_codec][1]))
+        print("batch serialize + deserialize: %f records/s" % (1000.0 * record_num / t_batch.msecs))
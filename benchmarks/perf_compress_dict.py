@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import argparse
+import time
+
+from datahub.batch.batch_header import BATCH_HEAD_SIZE
+from datahub.batch.batch_serializer import BatchSerializer
+from datahub.batch.utils import SchemaObject
+from datahub.models import RecordSchema, TupleRecord, FieldType, CompressFormat
+from datahub.models.compress import get_compressor, register_zstd_dictionary, zstd
+
+
+class Timer(object):
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        self.end = time.time()
+        self.secs = self.end - self.start
+        self.msecs = self.secs * 1000  # millisecs
+        if self.verbose:
+            print('elapsed time: %f ms' % self.msecs)
+
+
+HOSTS = ['web-%02d.cn-hangzhou.internal' % i for i in range(20)]
+METHODS = ['GET', 'POST', 'PUT', 'DELETE']
+PATHS = ['/api/v1/items', '/api/v1/orders', '/api/v2/users/profile', '/healthz']
+
+
+def gen_records(record_num, offset=0):
+    schema = RecordSchema.from_lists(['host', 'method', 'path', 'status', 'latency'],
+                                     [FieldType.STRING, FieldType.STRING, FieldType.STRING, FieldType.BIGINT,
+                                      FieldType.DOUBLE])
+    records = []
+    for i in range(offset, offset + record_num):
+        values = [HOSTS[i % len(HOSTS)], METHODS[i % len(METHODS)], PATHS[(i * 7) % len(PATHS)],
+                  200 if i % 10 else 500, (i % 97) * 0.25]
+        records.append(TupleRecord(schema=schema, values=values))
+    return records
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', help='batch record num', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--sample', help='sample record num to train dictionary', type=int, default=5000)
+    parser.add_argument('--dict_size', help='dictionary size in bytes', type=int, default=16 * 1024)
+    parser.add_argument('--round', help='round num', type=int, default=200)
+    args = parser.parse_args()
+    print("=============configuration=============")
+    print("batch record num:%s" % args.batch)
+    print("sample record num:%d" % args.sample)
+    print("dictionary size:%d" % args.dict_size)
+    print("round num:%d" % args.round)
+    print("=======================================\n\n")
+
+    compressors = [(compress_format.name, get_compressor(compress_format)) for compress_format in CompressFormat
+                   if compress_format != CompressFormat.NONE and (compress_format != CompressFormat.ZSTD or zstd)]
+    if zstd:
+        with Timer() as t_train:
+            dict_data = BatchSerializer.train_dictionary(gen_records(args.sample, offset=1000000), args.dict_size)
+        print("train dictionary: %f ms\n" % t_train.msecs)
+        compressors.append(("ZSTD+DICT", register_zstd_dictionary(dict_data)))
+    else:
+        print("zstandard is not installed, skip ZSTD\n")
+
+    schema_object = SchemaObject('py_perf_test_project', 'py_perf_test_topic', None)
+    for batch_num in args.batch:
+        # raw payload of BinaryRecords in a batch, the same as the data compressed in put records
+        raw_data = BatchSerializer.serialize(CompressFormat.NONE, schema_object, gen_records(batch_num))[BATCH_HEAD_SIZE:]
+        raw_size = len(raw_data)
+
+        print("===============batch: %d records, %d bytes==================" % (batch_num, raw_size))
+        for name, compressor in compressors:
+            with Timer() as t_compress:
+                for i in range(0, args.round):
+                    compressed = compressor.compress(raw_data)
+            with Timer() as t_decompress:
+                for i in range(0, args.round):
+                    compressor.decompress(compressed, raw_size)
+            total_mb = raw_size * args.round / 1024.0 / 1024.0
+            print("%-10s ratio: %.3f, compress: %.2f MB/s, decompress: %.2f MB/s"
+                  % (name, float(len(compressed)) / raw_size, total_mb / t_compress.secs, total_mb / t_decompress.secs))
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import argparse
+import os
+import time
+
+from datahub.utils.crc import available_crc32c_backends, crc32c_backend, get_crc32c_function
+
+
+class Timer(object):
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        self.end = time.time()
+        self.secs = self.end - self.start
+        self.msecs = self.secs * 1000  # millisecs
+        if self.verbose:
+            print('elapsed time: %f ms' % self.msecs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', help='payload size in KB', type=int, nargs='+', default=[4, 512, 4096])
+    parser.add_argument('--round', help='round num', type=int, default=20)
+    args = parser.parse_args()
+    print("=============configuration=============")
+    print("payload size(KB):%s" % args.size)
+    print("round num:%d" % args.round)
+    print("available backends:%s" % available_crc32c_backends())
+    print("default backend:%s" % crc32c_backend())
+    print("=======================================\n\n")
+
+    for size in args.size:
+        data = os.urandom(size * 1024)
+        print("===============payload: %d KB==================" % size)
+        for backend in available_crc32c_backends():
+            crc32c = get_crc32c_function(backend)
+            # the table fallback is pure python, keep it short
+            round_num = 1 if backend == 'table' else args.round
+            with Timer() as t:
+                for i in range(0, round_num):
+                    crc32c(data)
+            print("%s: %f MB/s" % (backend, 1000.0 * size * round_num / 1024 / max(t.msecs, 1e-3)))
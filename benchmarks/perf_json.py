@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import argparse
+import time
+
+from datahub.models import RecordSchema, TupleRecord, FieldType, GetRecordsResult
+from datahub.models.params import PutRecordsRequestParams
+from datahub.utils import get_json_backends, set_json_backend, get_json_backend
+
+
+class Timer(object):
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        self.end = time.time()
+        self.secs = self.end - self.start
+        self.msecs = self.secs * 1000  # millisecs
+        if self.verbose:
+            print('elapsed time: %f ms' % self.msecs)
+
+
+SCHEMA = RecordSchema.from_lists(['host', 'method', 'path', 'status', 'latency'],
+                                 [FieldType.STRING, FieldType.STRING, FieldType.STRING, FieldType.BIGINT,
+                                  FieldType.DOUBLE])
+
+
+def gen_records(record_num):
+    records = []
+    for i in range(record_num):
+        record = TupleRecord(schema=SCHEMA, values=['web-%02d.cn-hangzhou.internal' % (i % 20), 'GET',
+                                                    '/api/v1/items/%d' % i, 200, (i % 97) * 0.25])
+        record.shard_id = '0'
+        record.put_attribute('source', 'perf')
+        records.append(record)
+    return records
+
+
+def gen_get_records_content(records):
+    content = '{"NextCursor": "30005af19b3800000000000003e80000", "RecordCount": %d, "StartSeq": 0, "Records": [%s]}'
+    return (content % (len(records), ', '.join([
+        '{"Data": ["%s", "%s", "%s", "%s", "%s"], "Sequence": %d, "SystemTime": 1660194841312, '
+        '"Attributes": {"source": "perf"}}' % (tuple(record.encode_values()) + (index,))
+        for index, record in enumerate(records)]))).encode('utf-8')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', help='record num of each request', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--round', help='round num', type=int, default=100)
+    args = parser.parse_args()
+    print("=============configuration=============")
+    print("batch record num:%s" % args.batch)
+    print("round num:%d" % args.round)
+    print("installed json backends:%s" % get_json_backends())
+    print("default json backend:%s" % get_json_backend())
+    print("=======================================\n\n")
+
+    default_backend = get_json_backend()
+    for batch_num in args.batch:
+        records = gen_records(batch_num)
+        content = gen_get_records_content(records)
+        print("===============batch: %d records==================" % batch_num)
+        for backend in get_json_backends():
+            set_json_backend(backend)
+            with Timer() as t_put:
+                for i in range(0, args.round):
+                    PutRecordsRequestParams(records).content()
+            with Timer() as t_get:
+                for i in range(0, args.round):
+                    GetRecordsResult.parse_content(content, {}, record_schema=SCHEMA)
+            total_num = batch_num * args.round
+            print("%-10s put records content: %.0f records/s, parse get records: %.0f records/s"
+                  % (backend, total_num / t_put.secs, total_num / t_get.secs))
+    set_json_backend(default_backend)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import argparse
+import time
+
+from datahub.models import RecordSchema, TupleRecord, FieldType
+from datahub.proto.datahub_pb2 import GetRecordsResponse
+from datahub.proto.proto_utils import decode_get_records_response, STREAMING_DECODE
+
+
+class Timer(object):
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        self.end = time.time()
+        self.secs = self.end - self.start
+        self.msecs = self.secs * 1000  # millisecs
+        if self.verbose:
+            print('elapsed time: %f ms' % self.msecs)
+
+
+SCHEMA = RecordSchema.from_lists(['host', 'method', 'path', 'status', 'latency'],
+                                 [FieldType.STRING, FieldType.STRING, FieldType.STRING, FieldType.BIGINT,
+                                  FieldType.DOUBLE])
+
+
+def gen_response(record_num):
+    response = GetRecordsResponse(next_cursor='30005af19b3800000000000003e80000', record_count=record_num,
+                                  start_sequence=1000)
+    for i in range(record_num):
+        entry = response.records.add()
+        entry.sequence = 1000 + i
+        entry.system_time = 1660194841312 + i
+        for value in ['web-%02d.cn-hangzhou.internal' % (i % 20), 'GET', '/api/v1/items/%d' % i, '200',
+                      str((i % 97) * 0.25)]:
+            entry.data.data.add().value = value.encode()
+        attribute = entry.attributes.attributes.add()
+        attribute.key = 'source'
+        attribute.value = 'perf'
+    return response.SerializeToString()
+
+
+def decode(pb_str, streaming, with_record):
+    response = decode_get_records_response(pb_str, streaming)
+    records = []
+    for values, attributes, sequence, system_time in response.records():
+        if with_record:
+            record = TupleRecord.from_wire(SCHEMA, values)
+            record._attributes = attributes
+            values = record
+        records.append((values, sequence, system_time))
+    return records
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--record', help='record num in response', type=int, nargs='+', default=[1000])
+    parser.add_argument('--round', help='round num', type=int, default=100)
+    args = parser.parse_args()
+    print("=============configuration=============")
+    print("record num:%s" % args.record)
+    print("round num:%d" % args.round)
+    print("default decoder:%s" % ('streaming' if STREAMING_DECODE else 'protobuf'))
+    print("=======================================\n\n")
+
+    for record_num in args.record:
+        pb_str = gen_response(record_num)
+        print("===============response: %d records, %d bytes==================" % (record_num, len(pb_str)))
+        for with_record in (False, True):
+            for name, streaming in (('protobuf', False), ('streaming', True)):
+                with Timer() as t:
+                    for i in range(0, args.round):
+                        decode(pb_str, streaming, with_record)
+                print("%-10s %-12s avg: %f ms" % (name, 'tuple record' if with_record else 'values only',
+                                                    t.msecs / args.round))
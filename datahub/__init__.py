@@ -19,7 +19,10 @@
 
 from __future__ import absolute_import
 
+import sys
+
 from .core import DataHub, DatahubProtocolType
+from .rest import TransportType
 from .version import __version__, __datahub_client_version__
 
 """ author
@@ -27,3 +30,8 @@ from .version import __version__, __datahub_client_version__
 __author__ = 'panjinxing.pjx'
 
 __all__ = ['DataHub', '__author__', '__version__', '__datahub_client_version__']
+
+# the asyncio client is written in async/await syntax of python 3.7+
+if sys.version_info >= (3, 7):
+    from .async_core import AsyncDataHub
+    __all__.append('AsyncDataHub')
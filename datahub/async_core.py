@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from __future__ import absolute_import
+
+import asyncio
+import functools
+
+import six
+
+from .async_rest import AsyncRestClient
+from .core import DatahubProtocolType, get_client
+from .models import CompressFormat
+from .models.params import PutPreparedRecordsRequestParams
+
+# kwargs consumed by the protocol client, the others are passed to the rest client
+_IMPL_KWARGS = ('account', 'security_token', 'integrity_mode', 'integrity_sample_rate', 'enable_schema_register')
+
+
+class AsyncDataHub(object):
+    """
+    Asyncio entrance to DataHub, the data plane, offset and consumer group apis are coroutines.
+
+    Requests are built by the same request params, signed by the same account and parsed by the same results
+    as :class:`datahub.DataHub`, so the arguments, results and exceptions are the same as the sync client.
+    The requests are sent by httpx async client, ``transport=TransportType.HTTPX`` enables HTTP/2.
+    The records to put are serialized and compressed in the default executor of event loop, and the records read
+    are parsed in the executor too. The other requests are built and parsed in the event loop.
+    In batch protocol, the schema register is still queried by sync client.
+
+    :param access_id: Aliyun Access ID
+    :param secret_access_key: Aliyun Access Key
+    :param endpoint: Rest service URL
+    :param protocol_type: protocol type
+    :type protocol_type: :class:`datahub.core.DatahubProtocolType`
+    :param compress_format: compress format, default value is LZ4.
+    :type compress_format: :class:`datahub.models.compress.CompressFormat`
+
+    :Example:
+
+    >>> async with AsyncDataHub('**your access id**', '**your access key**', '**endpoint**', protocol_type=DatahubProtocolType.PB) as dh:
+    >>>     cursor = await dh.get_cursor('project', 'topic', '0', CursorType.OLDEST)
+    >>>     result = await dh.get_tuple_records('project', 'topic', '0', schema, cursor.cursor, 100)
+    """
+
+    def __init__(self, access_id, access_key, endpoint=None, compress_format=CompressFormat.LZ4, credential=None, **kwargs):
+        protocol_type = DatahubProtocolType.JSON
+        if "enable_pb" in kwargs and kwargs.pop("enable_pb"):
+            protocol_type = DatahubProtocolType.PB
+        elif "protocol_type" in kwargs:
+            protocol_type = kwargs.pop("protocol_type")
+        if not isinstance(protocol_type, DatahubProtocolType):
+            protocol_type = DatahubProtocolType.JSON
+        self._protocol_type = protocol_type
+        self._datahub_impl = get_client(protocol_type)(access_id, access_key, endpoint, compress_format, credential=credential, **kwargs)
+        rest_kwargs = dict((k, v) for k, v in six.iteritems(kwargs) if k not in _IMPL_KWARGS)
+        self._rest_client = AsyncRestClient(self._datahub_impl.account, self._datahub_impl.rest_client.endpoint,
+                                            **rest_kwargs)
+
+    @classmethod
+    def from_credential(cls, credential, endpoint, compress_format=CompressFormat.LZ4, **kwargs):
+        return cls("", "", endpoint, compress_format, credential, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def protocol_type(self):
+        return self._protocol_type
+
+    @property
+    def datahub_impl(self):
+        """
+        The sync protocol client sharing the account, used by the apis not provided in async
+        """
+        return self._datahub_impl
+
+    async def close(self):
+        """
+        Close the connections of async client
+        """
+        await self._rest_client.aclose()
+
+    async def list_shard(self, project_name, topic_name):
+        """
+        List all shards of a topic
+
+        :return: shards info
+        :rtype: :class:`datahub.models.ListShardResult`
+        """
+        return await self.__send_request(self._datahub_impl.build_list_shard_request(project_name, topic_name))
+
+    async def get_topic(self, project_name, topic_name):
+        """
+        Get a topic
+
+        :return: topic info
+        :rtype: :class:`datahub.models.GetTopicResult`
+        """
+        return await self.__send_request(self._datahub_impl.build_get_topic_request(project_name, topic_name))
+
+    async def get_cursor(self, project_name, topic_name, shard_id, cursor_type, param=-1):
+        """
+        Get cursor, see :meth:`datahub.DataHub.get_cursor`
+
+        :rtype: :class:`datahub.models.GetCursorResult`
+        """
+        return await self.__send_request(self._datahub_impl.build_get_cursor_request(project_name, topic_name, shard_id,
+                                                                                     cursor_type, param))
+
+    async def put_records(self, project_name, topic_name, record_list):
+        """
+        Put records to a topic, see :meth:`datahub.DataHub.put_records`
+
+        :rtype: :class:`datahub.models.PutRecordsResult`
+        """
+        api_request = await self.__run_in_executor(self.__build_compressed_request,
+                                                   self._datahub_impl.build_put_records_request,
+                                                   project_name, topic_name, record_list)
+        return await self.__send_request(api_request)
+
+    async def prepare_records_by_shard(self, project_name, topic_name, shard_id, record_list):
+        """
+        Serialize and compress records for :meth:`put_records_by_shard`, see :meth:`datahub.DataHub.prepare_records_by_shard`
+
+        :rtype: :class:`datahub.models.PutPreparedRecordsRequestParams`
+        """
+        return await self.__run_in_executor(self._datahub_impl.prepare_records_by_shard,
+                                            project_name, topic_name, shard_id, record_list)
+
+    async def put_records_by_shard(self, project_name, topic_name, shard_id, record_list):
+        """
+        Put records to a shard, only support pb and batch protocol, see :meth:`datahub.DataHub.put_records_by_shard`
+
+        :rtype: :class:`datahub.models.PutRecordsByShardResult`
+        """
+        if not isinstance(record_list, PutPreparedRecordsRequestParams):
+            record_list = await self.prepare_records_by_shard(project_name, topic_name, shard_id, record_list)
+        return await self.__send_request(self._datahub_impl.build_put_records_by_shard_request(project_name, topic_name,
+                                                                                               shard_id, record_list))
+
+    async def get_blob_records(self, project_name, topic_name, shard_id, cursor, limit_num=0, sub_id=None):
+        """
+        Get records from a blob topic, see :meth:`datahub.DataHub.get_blob_records`
+
+        :rtype: :class:`datahub.models.GetRecordsResult`
+        """
+        return await self.__send_request(self._datahub_impl.build_get_records_request(project_name, topic_name, sub_id,
+                                                                                      shard_id, cursor, limit_num))
+
+    async def get_tuple_records(self, project_name, topic_name, shard_id, record_schema=None, cursor="", limit_num=0,
+                                sub_id=None, lazy_decode=False):
+        """
+        Get records from a tuple topic, see :meth:`datahub.DataHub.get_tuple_records`
+
+        :rtype: :class:`datahub.models.GetRecordsResult`
+        """
+        return await self.__send_request(self._datahub_impl.build_get_records_request(project_name, topic_name, sub_id,
+                                                                                      shard_id, cursor, limit_num,
+                                                                                      record_schema, lazy_decode))
+
+    async def init_and_get_subscription_offset(self, project_name, topic_name, sub_id, shard_ids):
+        """
+        Open subscription offset session
+
+        :rtype: :class:`datahub.models.InitAndGetSubscriptionOffsetResult`
+        """
+        return await self.__send_request(self._datahub_impl.build_init_and_get_subscription_offset_request(
+            project_name, topic_name, sub_id, shard_ids))
+
+    async def get_subscription_offset(self, project_name, topic_name, sub_id, shard_ids=None):
+        """
+        Get subscription offset
+
+        :rtype: :class:`datahub.models.GetSubscriptionOffsetResult`
+        """
+        return await self.__send_request(self._datahub_impl.build_get_subscription_offset_request(
+            project_name, topic_name, sub_id, shard_ids))
+
+    async def update_subscription_offset(self, project_name, topic_name, sub_id, offsets):
+        """
+        Update subscription offset
+
+        :param offsets: offsets, dict of shard id to :class:`datahub.models.OffsetWithSession` or dict
+        """
+        return await self.__send_request(self._datahub_impl.build_update_subscription_offset_request(
+            project_name, topic_name, sub_id, offsets))
+
+    async def reset_subscription_offset(self, project_name, topic_name, sub_id, offsets):
+        """
+        Reset subscription offset
+
+        :param offsets: offsets, dict of shard id to :class:`datahub.models.OffsetBase` or dict
+        """
+        return await self.__send_request(self._datahub_impl.build_reset_subscription_offset_request(
+            project_name, topic_name, sub_id, offsets))
+
+    async def join_group(self, project_name, topic_name, consumer_group, session_timeout):
+        """
+        Join consumer group
+
+        :rtype: :class:`datahub.models.JoinGroupResult`
+        """
+        return await self.__send_request(self._datahub_impl.build_join_group_request(project_name, topic_name,
+                                                                                     consumer_group, session_timeout))
+
+    async def heart_beat(self, project_name, topic_name, consumer_group, consumer_id, version_id, hold_shard_list,
+                         read_end_shard_list):
+        """
+        Heart beat of consumer
+
+        :rtype: :class:`datahub.models.HeartBeatResult`
+        """
+        return await self.__send_request(self._datahub_impl.build_heart_beat_request(
+            project_name, topic_name, consumer_group, consumer_id, version_id, hold_shard_list, read_end_shard_list))
+
+    async def sync_group(self, project_name, topic_name, consumer_group, consumer_id, version_id, release_shard_list,
+                         read_end_shard_list):
+        """
+        Sync consumer group
+        """
+        return await self.__send_request(self._datahub_impl.build_sync_group_request(
+            project_name, topic_name, consumer_group, consumer_id, version_id, release_shard_list, read_end_shard_list))
+
+    async def leave_group(self, project_name, topic_name, consumer_group, consumer_id, version_id):
+        """
+        Leave consumer group
+        """
+        return await self.__send_request(self._datahub_impl.build_leave_group_request(
+            project_name, topic_name, consumer_group, consumer_id, version_id))
+
+    # =======================================================
+    # private function
+    # =======================================================
+
+    def __build_compressed_request(self, build_request, *args):
+        # serialize and compress the content in executor, the request is sent without compressing again
+        api_request = build_request(*args)
+        compress_format = api_request.kwargs.pop('compress_format', CompressFormat.NONE)
+        if compress_format is not None and 'data' in api_request.kwargs:
+            data, compress_headers = self._rest_client.compress_content(api_request.kwargs['data'], compress_format,
+                                                                        self._rest_client.endpoint + api_request.url)
+            headers = dict(api_request.kwargs.get('headers') or {})
+            headers.update(compress_headers)
+            api_request.kwargs.update(data=data, headers=headers)
+        api_request.kwargs['compress_format'] = None
+        return api_request
+
+    async def __send_request(self, api_request):
+        content, headers = await self._rest_client.request(api_request.method, api_request.url, **api_request.kwargs)
+        if api_request.cpu_bound:
+            return await self.__run_in_executor(api_request.parse, content, headers=headers)
+        return api_request.parse(content, headers=headers)
+
+    @staticmethod
+    async def __run_in_executor(func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from .models.compress import CompressFormat
+from .rest import RestClient, HttpxTransport, TransportType, httpx
+
+
+class AsyncHttpxTransport(HttpxTransport):
+    """
+    Transport by httpx async client, send returns awaitable response, the client is closed by aclose
+    """
+
+    @staticmethod
+    def _httpx_classes():
+        return httpx.AsyncClient, httpx.AsyncHTTPTransport
+
+    @staticmethod
+    def _close_client(client):
+        # the async client can not be closed out of event loop, connections are released by gc
+        pass
+
+    async def _trace(self, event_name, info):
+        # the trace of async httpcore is awaited
+        super()._trace(event_name, info)
+
+    async def send(self, prepared_req):
+        self._connection_metrics.incr('requests')
+        resp = await self._client.send(prepared_req.request, stream=True)
+        try:
+            resp._content = b''.join([chunk async for chunk in resp.aiter_raw()])
+        finally:
+            await resp.aclose()
+        return resp
+
+    def aclose(self):
+        return self._client.aclose()
+
+
+class AsyncRestClient(RestClient):
+    """Restful client on asyncio, requests are built, signed and checked the same as RestClient.
+    The methods get/post/put/head/delete return awaitable (content, headers).
+    Transport ``HTTPX`` enables HTTP/2, else the async client uses HTTP/1.1, httpx is required for both.
+    """
+
+    def _new_transport(self, transport, pool_connections, pool_maxsize):
+        return AsyncHttpxTransport(self._retry_times, pool_maxsize, self._proxies, self._conn_timeout,
+                                   self._read_timeout, http2=transport == TransportType.HTTPX)
+
+    async def request(self, method, url, compress_format=CompressFormat.NONE, **kwargs):
+        prepared_req = self._prepare_request(method, url, compress_format, **kwargs)
+        resp = await self._transport.send(prepared_req)
+        return self._handle_response(resp)
+
+    async def aclose(self):
+        await self._transport.aclose()
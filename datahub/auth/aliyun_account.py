@@ -19,14 +19,16 @@
 
 from __future__ import absolute_import
 
-from collections import OrderedDict
+import hmac
+from base64 import b64encode
+from hashlib import sha1
 
 import six
 from six.moves.urllib.parse import urlparse, unquote
 
 from .core import Account, AccountType
 from ..rest import Headers
-from ..utils import hmac_sha1, to_str
+from ..utils import to_binary, to_str
 
 try:
     from urllib.parse import parse_qsl
@@ -41,13 +43,17 @@ logger.setLevel(logging.INFO)
 if not logger.handlers:
     logger.addHandler(logging.NullHandler())
 
+# path url --> canonical resource in signing string, cleared when full
+_CANONICAL_RESOURCE_CACHE_SIZE = 1024
+_canonical_resource_cache = dict()
+
 
 class AliyunAccount(Account):
     """
     Aliyun account implement base from :class:`datahub.auth.Account`
     """
 
-    __slots__ = '_access_id', '_access_key', '_security_token', '_credential'
+    __slots__ = '_access_id', '_access_key', '_security_token', '_credential', '_prepared_hmac'
 
     def __init__(self, *args, **kwargs):
         super(AliyunAccount, self).__init__(*args, **kwargs)
@@ -55,6 +61,8 @@ class AliyunAccount(Account):
         self._access_key = kwargs.get('access_key', '').strip()
         self._security_token = kwargs.get('security_token', '').strip()
         self._credential = kwargs.get('credential', None)
+        # (access key, hmac keyed by it), copied for every request
+        self._prepared_hmac = None
 
     @property
     def access_id(self):
@@ -71,6 +79,7 @@ class AliyunAccount(Account):
     @access_key.setter
     def access_key(self, value):
         self._access_key = value
+        self._prepared_hmac = None
 
     @property
     def security_token(self):
@@ -104,32 +113,46 @@ class AliyunAccount(Account):
         return '&'.join(param_parts)
 
     @staticmethod
-    def _build_canonical_str(url_components, req):
-        # Build signing string
-        lines = [req.method, req.headers[Headers.CONTENT_TYPE], req.headers[Headers.DATE], ]
+    def _build_canonical_resource(path_url):
+        resource = _canonical_resource_cache.get(path_url)
+        if resource is None:
+            url_components = urlparse(unquote(path_url))
+            canonical_query = AliyunAccount._build_canonical_query(url_components.query)
+            resource = url_components.path + '?' + canonical_query if canonical_query else url_components.path
+            if len(_canonical_resource_cache) >= _CANONICAL_RESOURCE_CACHE_SIZE:
+                _canonical_resource_cache.clear()
+            _canonical_resource_cache[path_url] = resource
+        return resource
 
-        headers_to_sign = dict()
+    @staticmethod
+    def _build_canonical_str(path_url, req):
+        # Build signing string
+        headers = req.headers
+        lines = [req.method, headers[Headers.CONTENT_TYPE], headers[Headers.DATE]]
 
         # req headers
-        headers = req.headers
+        headers_to_sign = dict()
         for k, v in six.iteritems(headers):
             k = k.lower()
             if k.startswith('x-datahub-'):
                 headers_to_sign[k] = v
+        logger.debug('headers to sign: %s', headers_to_sign)
 
-        # url params
-        canonical_query = AliyunAccount._build_canonical_query(url_components.query)
-
-        headers_to_sign = OrderedDict([(k, headers_to_sign[k])
-                                       for k in sorted(headers_to_sign)])
-        logger.debug('headers to sign: %s' % headers_to_sign)
+        for k in sorted(headers_to_sign):
+            lines.append('%s:%s' % (k, headers_to_sign[k]))
 
-        for k, v in six.iteritems(headers_to_sign):
-            lines.append('%s:%s' % (k, v))
-
-        lines.append(url_components.path + '?' + canonical_query if canonical_query else url_components.path)
+        # url path and params
+        lines.append(AliyunAccount._build_canonical_resource(path_url))
         return '\n'.join(lines)
 
+    def _new_hmac(self, access_key):
+        prepared_hmac = self._prepared_hmac
+        if prepared_hmac is None or prepared_hmac[0] != access_key:
+            # the key is changed by setter or rotated by credential provider
+            prepared_hmac = (access_key, hmac.new(to_binary(access_key, 'latin-1'), digestmod=sha1))
+            self._prepared_hmac = prepared_hmac
+        return prepared_hmac[1].copy()
+
     def sign_request(self, request):
         """
         Generator signature for request.
@@ -148,11 +171,11 @@ class AliyunAccount(Account):
             if security_token:
                 request.headers[Headers.SECURITY_TOKEN] = security_token
 
-        url = request.path_url
-        url_components = urlparse(unquote(url))
-        canonical_str = self._build_canonical_str(url_components, request)
-        logger.debug('canonical string: ' + canonical_str)
+        canonical_str = self._build_canonical_str(request.path_url, request)
+        logger.debug('canonical string: %s', canonical_str)
 
-        sign = to_str(hmac_sha1(access_key, canonical_str))
+        signer = self._new_hmac(access_key)
+        signer.update(to_binary(canonical_str, 'latin-1'))
+        sign = to_str(b64encode(signer.digest()))
         auth_str = 'DATAHUB %s:%s' % (access_id, sign)
         request.headers[Headers.AUTHORIZATION] = auth_str
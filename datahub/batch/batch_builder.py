@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from .batch_header import BatchHeader, BATCH_HEAD_SIZE
+from ..models.compress import *
+from ..exceptions import DatahubException
+from ..utils.crc import crc32c
+
+INIT_BUFFER_SIZE = 4096
+
+
+class BatchBuilder:
+    """
+    Append-only builder of batch binary.
+    BinaryRecord is serialized into one growing buffer when appended, the raw size is known at any time.
+    Compression and crc are done once when the batch is sealed.
+    """
+
+    def __init__(self, compress_type=None, init_size=INIT_BUFFER_SIZE, compress_policy=None, compress_key=None,
+                 compressor=None):
+        self._compress_type = compress_type
+        self._compressor = compressor
+        self._compress_policy = compress_policy
+        self._compress_key = compress_key
+        # the batch header is written in front of the records when sealed
+        self._buffer = bytearray(max(init_size, BATCH_HEAD_SIZE))
+        self._size = BATCH_HEAD_SIZE
+        self._record_count = 0
+        self._sealed = False
+
+    def append(self, record):
+        """
+        Serialize BinaryRecord to the end of the buffer
+        """
+        self.__check_not_sealed()
+        self.__ensure_capacity(record.record_size)
+        self._size = record.serialize_into(self._buffer, self._size)
+        self._record_count += 1
+
+    def append_raw(self, raw_buffer, record_count):
+        """
+        Append the buffer of record_count BinaryRecord which is already serialized
+        """
+        self.__check_not_sealed()
+        raw_size = len(raw_buffer)
+        self.__ensure_capacity(raw_size)
+        self._buffer[self._size:self._size + raw_size] = raw_buffer
+        self._size += raw_size
+        self._record_count += record_count
+
+    def seal(self):
+        """
+        Compress and compute crc of the records, return the whole batch binary with header.
+        The returned bytearray is the builder buffer itself, only the compressed payload is copied once
+        to put the header in front of it.
+        """
+        self.__check_not_sealed()
+        self._sealed = True
+
+        raw_size = self.raw_size
+        attributes = CompressFormat.NONE.get_index() | 8
+        del self._buffer[self._size:]
+        data = memoryview(self._buffer)[BATCH_HEAD_SIZE:]
+        try:
+            if self._compress_type and self._compress_type != CompressFormat.NONE:
+                compressor = self._compressor or get_compressor(self._compress_type)
+                if self._compress_policy is None:
+                    compress_data = compressor.compress(data)
+                else:
+                    compress_data = self._compress_policy.compress(compressor, data, self._compress_key)
+                if compress_data is not None and len(compress_data) < raw_size:
+                    attributes = self._compress_type.get_index() | 8
+                    data.release()
+                    self._buffer = bytearray(BATCH_HEAD_SIZE + len(compress_data))
+                    self._buffer[BATCH_HEAD_SIZE:] = compress_data
+                    data = memoryview(self._buffer)[BATCH_HEAD_SIZE:]
+        except Exception as e:
+            data.release()
+            raise DatahubException("Compress data fail. {}".format(e))
+
+        crc32 = crc32c(data)
+        data.release()
+        BatchHeader.serialize_into(self._buffer, 0, 0, len(self._buffer), raw_size, crc32, attributes, self._record_count)
+        return self._buffer
+
+    @property
+    def raw_size(self):
+        return self._size - BATCH_HEAD_SIZE
+
+    @property
+    def record_count(self):
+        return self._record_count
+
+    def __ensure_capacity(self, size):
+        capacity = len(self._buffer)
+        if self._size + size > capacity:
+            # grow to double size at least, the tail is truncated when sealed
+            self._buffer.extend(bytes(max(capacity, self._size + size - capacity)))
+
+    def __check_not_sealed(self):
+        if self._sealed:
+            raise DatahubException("Batch has been sealed")
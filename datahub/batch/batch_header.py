@@ -18,12 +18,15 @@
 # under the License.
 
 
+import struct
 from .utils import *
 from ..utils.converters import to_binary, to_text
 from ..exceptions import DatahubException, InvalidParameterException
 
 MAGIC_NUMBER = "DHUB"
 BATCH_HEAD_SIZE = 26
+# magic, version, length, raw_size, crc32, attributes(short), record_count
+BATCH_HEAD_STRUCT = struct.Struct("<4siIIIHI")
 
 
 class BatchHeader:
@@ -42,15 +45,11 @@ class BatchHeader:
 
     @staticmethod
     def serialize(version, length, raw_size, crc32, attributes, record_count):
-        header = bytes()
-        header += to_binary(MAGIC_NUMBER)
-        header += int2byte(version, size=4)
-        header += int2byte(length, size=4, unsigned=True)
-        header += int2byte(raw_size, size=4, unsigned=True)
-        header += int2byte(crc32, size=4, unsigned=True)
-        header += int2byte(attributes, size=2, unsigned=True)  # short
-        header += int2byte(record_count, size=4, unsigned=True)
-        return header
+        return BATCH_HEAD_STRUCT.pack(to_binary(MAGIC_NUMBER), version, length, raw_size, crc32, attributes, record_count)
+
+    @staticmethod
+    def serialize_into(buffer, offset, version, length, raw_size, crc32, attributes, record_count):
+        BATCH_HEAD_STRUCT.pack_into(buffer, offset, to_binary(MAGIC_NUMBER), version, length, raw_size, crc32, attributes, record_count)
 
     @staticmethod
     def deserialize(header):
@@ -59,14 +58,7 @@ class BatchHeader:
         if to_text(header[:4]) != MAGIC_NUMBER:
             raise InvalidParameterException("Error. Batch header should start with ", MAGIC_NUMBER)
 
-        return BatchHeader(
-            byte2int(header[4:8]),
-            byte2int(header[8:12], unsigned=True),
-            byte2int(header[12:16], unsigned=True),
-            byte2int(header[16:20], unsigned=True),
-            byte2int(header[20:22], size=2, unsigned=True),
-            byte2int(header[22:26], unsigned=True)
-        )
+        return BatchHeader(*BATCH_HEAD_STRUCT.unpack(header)[1:])
 
     @property
     def magic(self):
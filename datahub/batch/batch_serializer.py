@@ -18,13 +18,18 @@
 # under the License.
 
 
-import crcmod.predefined
 from .binary_record import BinaryRecord
+from .record_codec import get_record_codec
 from .batch_binary_record import BatchBinaryRecord
+from .batch_builder import BatchBuilder
+from .lazy_tuple_record import LazyTupleRecord
+from .columnar import ColumnarSerializer
 from .record_header import RECORD_HEADER_SIZE, RecordHeader
 from .batch_header import BATCH_HEAD_SIZE, BatchHeader
+from .utils import SchemaObject
 from ..models.compress import *
 from ..models import BlobRecord, TupleRecord, RecordSchema
+from ..utils.crc import crc32c
 
 
 class BatchSerializer:
@@ -33,64 +38,116 @@ class BatchSerializer:
     """
 
     @staticmethod
-    def serialize(compress_type, schema_object, record_list):
-        batch = BatchBinaryRecord()
+    def serialize(compress_type, schema_object, record_list, compress_policy=None):
+        # TupleRecord/BlobRecord to BinaryRecord, schema/version/codec are resolved once for the same field list
+        schema_cache = dict()
+        compressor = None
+        if compress_type == CompressFormat.ZSTD and record_list and isinstance(record_list[0], TupleRecord):
+            schema, version_id, codec = BatchSerializer.__get_schema_info(record_list[0].field_list, schema_object, schema_cache)
+            compressor = BatchSerializer.__get_dict_compressor(schema_object, version_id)
+        batch_builder = BatchBuilder(compress_type, compress_policy=compress_policy,
+                                     compress_key=BatchSerializer.__get_compress_key(schema_object), compressor=compressor)
+
+        for record in record_list:
+            batch_builder.append(BatchSerializer.convert_to_binary_record(record, schema_object, schema_cache))
+        return batch_builder.seal()
 
-        # TupleRecord/BlobRecord to BinaryRecord
-        binary_records = [BatchSerializer.convert_to_binary_record(record, schema_object) for record in record_list]
+    @staticmethod
+    def serialize_columns(compress_type, schema_object, column_batch, compress_policy=None):
+        # ColumnBatch is encoded column by column, no TupleRecord/BinaryRecord is created
+        schema, version_id, codec = BatchSerializer.__get_schema_info(column_batch.schema.field_list, schema_object, None)
+        raw_buffer = ColumnarSerializer.serialize(column_batch, version_id)
+        compressor = BatchSerializer.__get_dict_compressor(schema_object, version_id) if compress_type == CompressFormat.ZSTD else None
+        batch_builder = BatchBuilder(compress_type, len(raw_buffer) + BATCH_HEAD_SIZE, compress_policy,
+                                     BatchSerializer.__get_compress_key(schema_object), compressor)
+        batch_builder.append_raw(raw_buffer, column_batch.record_count)
+        return batch_builder.seal()
 
-        for record in binary_records:
-            batch.add_record(record)
-        return batch.serialize(compress_type)
+    @staticmethod
+    def train_dictionary(record_list, dict_size=DEFAULT_ZSTD_DICT_SIZE):
+        """
+        Train a zstd dictionary from the BinaryRecord payloads of the sample records
+        """
+        schema_object = SchemaObject(None, None, None)
+        schema_cache = dict()
+        samples = [BatchSerializer.convert_to_binary_record(record, schema_object, schema_cache).serialize()
+                   for record in record_list]
+        return train_zstd_dictionary(samples, dict_size)
 
     @staticmethod
-    def deserialize(init_schema, schema_object, byte_data):
+    def deserialize(init_schema, schema_object, byte_data, lazy_decode=False, check_crc=True):
         # bytes --> BatchBinaryRecord
-        batch_records = BatchSerializer.convert_byte_to_batch_record(init_schema, schema_object, byte_data)
-        # BatchBinaryRecord --> list of TupleRecord/BlobRecord
-        record_list = [BatchSerializer.convert_to_record(record, init_schema) for record in batch_records.records]
+        batch_records = BatchSerializer.convert_byte_to_batch_record(init_schema, schema_object, byte_data, lazy_decode, check_crc)
+        # BatchBinaryRecord --> list of TupleRecord/BlobRecord, LazyTupleRecord if lazy_decode
+        record_list = [BatchSerializer.convert_to_record(record, init_schema, lazy_decode) for record in batch_records.records]
         return record_list
 
     # =======================
     # serialize
     # =======================
     @staticmethod
-    def convert_to_binary_record(record, schema_object):
+    def convert_to_binary_record(record, schema_object, schema_cache=None):
         if isinstance(record, BlobRecord):
-            binary_record = BinaryRecord(schema=None, version_id=-1)
+            binary_record = BinaryRecord(schema=None, version_id=-1, codec=get_record_codec(None))
             binary_record.set_field(0, record.blob_data)
         else:
-            schema = RecordSchema(record.field_list)
-            version_id = 0
-            if schema_object.schema_register:
-                version_id_new = int(schema_object) if isinstance(schema_object, str) else schema_object.schema_register.get_version_id(schema_object.project, schema_object.topic, schema)
-                if version_id_new:
-                    version_id = version_id_new
-            binary_record = BinaryRecord(schema=schema, version_id=version_id)
+            schema, version_id, codec = BatchSerializer.__get_schema_info(record.field_list, schema_object, schema_cache)
+            binary_record = BinaryRecord(schema=schema, version_id=version_id, codec=codec)
             for i in range(len(schema.field_list)):
                 value = record.get_value(i)
-                binary_record.set_field(i, value)
+                if value is not None:
+                    binary_record.set_field(i, value)
         if record.attributes:
             for key, val in record.attributes.items():
                 binary_record.add_attribute(key, val)
         return binary_record
 
+    @staticmethod
+    def __get_dict_compressor(schema_object, version_id):
+        if isinstance(schema_object, str) or not schema_object.schema_register:
+            return None
+        return schema_object.schema_register.get_dictionary(schema_object.project, schema_object.topic, version_id)
+
+    @staticmethod
+    def __get_compress_key(schema_object):
+        # compress ratio is tracked by topic
+        return "{}/{}".format(schema_object.project, schema_object.topic)
+
+    @staticmethod
+    def __get_schema_info(field_list, schema_object, schema_cache):
+        # the cache only lives in one serialize call, so the id of field list is stable
+        key = id(field_list)
+        if schema_cache is not None and key in schema_cache:
+            return schema_cache[key]
+
+        schema = RecordSchema(field_list)
+        version_id = 0
+        if schema_object.schema_register:
+            version_id_new = int(schema_object) if isinstance(schema_object, str) else schema_object.schema_register.get_version_id(schema_object.project, schema_object.topic, schema)
+            if version_id_new:
+                version_id = version_id_new
+        schema_info = (schema, version_id, get_record_codec(schema))
+        if schema_cache is not None:
+            schema_cache[key] = schema_info
+        return schema_info
+
     # =======================
     # deserialize
     # =======================
 
     # BinaryRecord --> TupleRecord/BlobRecord
     @staticmethod
-    def convert_to_record(binary_record, init_schema):
+    def convert_to_record(binary_record, init_schema, lazy_decode=False):
         if init_schema is None:             # BLOB
             # set blob data
             blob_data = binary_record.get_field(0)
             record = BlobRecord(blob_data=blob_data)
+        elif lazy_decode:                   # TUPLE, decode field and attribute on demand
+            return LazyTupleRecord(binary_record)
         else:                               # TUPLE
             # set tuple data
-            record = TupleRecord(field_list=None, schema=binary_record.schema, values=None)
-            for i in range(binary_record.field_cnt):
-                record.set_value(i, value=binary_record.get_field(i))
+            record = TupleRecord.from_wire(binary_record.schema,
+                                           [binary_record.get_field(i) for i in range(binary_record.field_cnt)])
         # set attribute
         attr_map = binary_record.get_attribute()
         for key, val in attr_map.items():
@@ -98,50 +155,70 @@ class BatchSerializer:
         return record
 
     @staticmethod
-    def convert_byte_to_batch_record(init_schema, schema_object, byte_data):
-        # Deserialize the batch header
-        batch_header_byte = byte_data[:BATCH_HEAD_SIZE]
-        batch_header = BatchHeader.deserialize(batch_header_byte)
-
-        # Check crc
-        crc32c = crcmod.predefined.mkCrcFun('crc-32c')
-        compute_crc32 = crc32c(byte_data[BATCH_HEAD_SIZE:]) & 0xffffffff
-        if batch_header.crc32 != compute_crc32:
-            raise DatahubException("Check crc fail. expect: {}, real: {}".format(batch_header.crc32, compute_crc32))
-
-        # Check length
-        if batch_header.length != len(byte_data):
-            raise DatahubException(
-                "Check batch header length fail. expect: {}, real: {}".format(batch_header.length, len(byte_data)))
-
-        # Decompress
-        compress_type = CompressFormat.get_compress(batch_header.attributes & 0x03)
-        all_binary_buffer = byte_data[BATCH_HEAD_SIZE:]
-        data_decompressor = get_compressor(compress_type)
-        all_binary_buffer = data_decompressor.decompress(all_binary_buffer, batch_header.raw_size)
+    def convert_byte_to_batch_record(init_schema, schema_object, byte_data, lazy_decode=False, check_crc=True):
+        batch_header, all_binary_buffer = BatchSerializer.convert_byte_to_raw_buffer(byte_data, check_crc)
 
         # deserialize to list of BinaryRecord
         batch_records = BatchBinaryRecord()
+        schema_cache = dict()
         next_pos = 0
         for index in range(batch_header.record_count):
             # deserializer record header first
             record_header = RecordHeader.deserialize(all_binary_buffer[next_pos: next_pos + RECORD_HEADER_SIZE])
             total_size = record_header.total_size
 
-            binary_record = BatchSerializer.convert_byte_to_binary_record(init_schema, schema_object, all_binary_buffer[next_pos:next_pos + total_size], record_header)
+            binary_record = BatchSerializer.convert_byte_to_binary_record(init_schema, schema_object, all_binary_buffer[next_pos:next_pos + total_size], record_header, schema_cache, lazy_decode)
             next_pos += total_size
             batch_records.add_record(binary_record)
         return batch_records
 
     @staticmethod
-    def convert_byte_to_binary_record(init_schema, schema_object, binary_records_buffer, record_header):
-        schema = init_schema
-        if schema_object.schema_register:
-            schema_new = RecordSchema.from_json_str(schema_object) if isinstance(schema_object, str) else schema_object.schema_register.get_schema(schema_object.project, schema_object.topic, record_header.schema_version)
-            if schema_new:
-                schema = schema_new
+    def convert_byte_to_raw_buffer(byte_data, check_crc=True):
+        """
+        Check and decompress the batch, return the batch header and the buffer of all BinaryRecord
+        """
+        # Deserialize the batch header
+        batch_header_byte = byte_data[:BATCH_HEAD_SIZE]
+        batch_header = BatchHeader.deserialize(batch_header_byte)
+
+        # Check crc
+        if check_crc:
+            compute_crc32 = crc32c(memoryview(byte_data)[BATCH_HEAD_SIZE:])
+            if batch_header.crc32 != compute_crc32:
+                raise DatahubException("Check crc fail. expect: {}, real: {}".format(batch_header.crc32, compute_crc32))
+
+        # Check length
+        if batch_header.length != len(byte_data):
+            raise DatahubException(
+                "Check batch header length fail. expect: {}, real: {}".format(batch_header.length, len(byte_data)))
+
+        # Decompress
+        compress_type = CompressFormat.get_compress(batch_header.attributes & 0x07)
+        if compress_type == CompressFormat.NONE:
+            return batch_header, byte_data[BATCH_HEAD_SIZE:]
+        # decompress from a view of the batch, avoid copying the whole compressed data
+        data_decompressor = get_compressor(compress_type)
+        all_binary_buffer = data_decompressor.decompress(memoryview(byte_data)[BATCH_HEAD_SIZE:], batch_header.raw_size)
+        return batch_header, all_binary_buffer
 
-        record = BinaryRecord.deserialize(schema, binary_records_buffer, record_header)
+    @staticmethod
+    def convert_byte_to_binary_record(init_schema, schema_object, binary_records_buffer, record_header, schema_cache=None, lazy_decode=False):
+        version_id = record_header.schema_version
+        if schema_cache is not None and version_id in schema_cache:
+            schema, codec = schema_cache[version_id]
+        else:
+            schema = init_schema
+            if schema_object.schema_register:
+                schema_new = RecordSchema.from_json_str(schema_object) if isinstance(schema_object, str) else schema_object.schema_register.get_schema(schema_object.project, schema_object.topic, version_id)
+                if schema_new:
+                    schema = schema_new
+            codec = get_record_codec(schema)
+            if schema_cache is not None:
+                schema_cache[version_id] = (schema, codec)
+
+        # blob record has only one field, no need to decode lazily
+        lazy = lazy_decode and schema is not None
+        record = BinaryRecord.deserialize(schema, binary_records_buffer, record_header, codec, lazy)
         return record
 
 
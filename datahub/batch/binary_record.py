@@ -18,23 +18,25 @@
 # under the License.
 
 
-from decimal import Decimal
+import struct
 from .utils import *
 from .record_header import RecordHeader, RECORD_HEADER_SIZE
-from ..models import FieldType
+from .record_codec import get_record_codec, BYTE_SIZE_ONE_FIELD, FIELD_COUNT_BYTE_SIZE, INT_BYTE_SIZE
 from ..utils.converters import to_binary, to_text
 from ..exceptions import InvalidParameterException, DatahubException
 
 
-BYTE_SIZE_ONE_FIELD = 8
-FIELD_COUNT_BYTE_SIZE = 4
-INT_BYTE_SIZE = 4
 PADDING_BYTES = b'\x00'
+EMPTY_FIELD_BYTES = PADDING_BYTES * BYTE_SIZE_ONE_FIELD
+LENGTH_OFFSET_STRUCT = struct.Struct("<ii")
+SMALL_SIZE_BYTES = [int2byte(size | 0x80, size=1, unsigned=True) for size in range(8)]
+UNDECODED_FIELD = object()
 
 
 class BinaryRecord:
-    def __init__(self, schema=None, version_id=None, buffer=None, header=None):
-        self._field_cnt = len(schema.field_list) if schema else 1
+    def __init__(self, schema=None, version_id=None, buffer=None, header=None, codec=None):
+        self._codec = codec if codec else get_record_codec(schema)
+        self._field_cnt = self._codec.field_cnt
         self._attr_length = 0
         self._version_id = version_id
         self._schema = schema
@@ -42,11 +44,12 @@ class BinaryRecord:
         self._attr_map = dict()
         self._has_init_attr_map = False
 
-        self._null_bit = [0] * (((self._field_cnt + 63) >> 6) << 3)  # N/8
+        self._null_bit = [0] * self._codec.null_bit_size  # N/8
         self._fields = [bytes()] * self._field_cnt  # N*8
+        self._var_fields = []  # variable length data without padding
 
-        self._field_pos = RECORD_HEADER_SIZE + FIELD_COUNT_BYTE_SIZE + len(self._null_bit)
-        self._next_pos = self._field_pos + self._field_cnt * BYTE_SIZE_ONE_FIELD
+        self._field_pos = self._codec.field_pos
+        self._next_pos = self._codec.fixed_size
 
         # RecordHeader
         self._record_header = header
@@ -56,111 +59,121 @@ class BinaryRecord:
     # =======================
 
     def serialize(self):
+        buffer = bytearray(self.__get_record_size())
+        self.serialize_into(buffer, 0)
+        self._buffer = buffer
+        return buffer
+
+    def serialize_into(self, buffer, offset):
+        """
+        Write record into a writable buffer which has at least record_size bytes from offset,
+        return the position after the record
+        """
+        record_size = self.__get_record_size()
+        if len(buffer) - offset < record_size:
+            raise DatahubException("Buffer size is not enough, need {}, remain {}".format(record_size, len(buffer) - offset))
+
         # record header
-        record_head_byte = RecordHeader.serialize(0, self._version_id, self.__get_record_size(), self._next_pos)
-        if len(record_head_byte) != RECORD_HEADER_SIZE:
-            raise DatahubException("Record header size is {}, should be {}".format(len(record_head_byte), RECORD_HEADER_SIZE))
-        self.__append(record_head_byte)
+        RecordHeader.serialize_into(buffer, offset, 0, self._version_id, record_size, self._next_pos)
+        pos = offset + RECORD_HEADER_SIZE
 
         # field count
-        field_count_byte = int2byte(self._field_cnt)
-        self.__append(field_count_byte)
+        INT_STRUCT.pack_into(buffer, pos, self._field_cnt)
+        pos += FIELD_COUNT_BYTE_SIZE
 
         # NullBit: N/8
-        for null_bit in self._null_bit:
-            null_bit_byte = int2byte(null_bit, size=1, unsigned=True)
-            self.__append(null_bit_byte)
+        null_bit_size = len(self._null_bit)
+        buffer[pos:pos + null_bit_size] = bytes(self._null_bit)
+        pos += null_bit_size
 
         # Field: N*8
         for field_data in self._fields:
-            self.__append(field_data)
+            buffer[pos:pos + BYTE_SIZE_ONE_FIELD] = field_data if field_data else EMPTY_FIELD_BYTES
+            pos += BYTE_SIZE_ONE_FIELD
 
-        # attribute map
-        attr_map_len_byte = int2byte(len(self._attr_map))
-        self.__append(attr_map_len_byte)
+        # variable length data, add padding to 8N Byte
+        for value in self._var_fields:
+            value_size = len(value)
+            padding_size = BinaryRecord.__get_padding_size(value_size)
+            buffer[pos:pos + value_size] = value
+            buffer[pos + value_size:pos + padding_size] = PADDING_BYTES * (padding_size - value_size)
+            pos += padding_size
 
+        # attribute map
+        INT_STRUCT.pack_into(buffer, pos, len(self._attr_map))
+        pos += INT_BYTE_SIZE
         for key, val in self._attr_map.items():
-            key_len_byte = int2byte(len(key))
-            self.__append(key_len_byte)
-            key_byte = to_binary(key)
-            self.__append(key_byte)
-            val_len_byte = int2byte(len(val))
-            self.__append(val_len_byte)
-            val_byte = to_binary(val)
-            self.__append(val_byte)
-        return self._buffer
+            pos = BinaryRecord.__write_bytes(buffer, pos, to_binary(key))
+            pos = BinaryRecord.__write_bytes(buffer, pos, to_binary(val))
+        return pos
 
     def set_field(self, pos, value):
         self.__set_none(pos)
-        if self._schema is None:    # Blob
-            if not isinstance(value, bytes):
-                raise InvalidParameterException("Only support write bytes for no schema")
-            self._fields[0] = self.__set_byte_field(value)
-        else:                       # Tuple
-            field = self._schema.get_field(pos)
-            field_type = field.type
-            if field_type is FieldType.STRING or field_type is FieldType.DECIMAL:
-                value_byte = self.__set_byte_field(to_binary(str(value)))
-            elif field_type is FieldType.BOOLEAN:
-                value_byte = bool2byte(value)
-                value_byte += PADDING_BYTES * 7
-            elif field_type is FieldType.FLOAT:
-                value_byte = float2byte(value)
-                value_byte += PADDING_BYTES * 4
-            elif field_type is FieldType.DOUBLE:
-                value_byte = double2byte(value)
-            elif field_type in (FieldType.TINYINT, FieldType.SMALLINT, FieldType.INTEGER,
-                                FieldType.BIGINT, FieldType.TIMESTAMP):
-                value_byte = int2byte(value, size=8)
-            else:
-                raise DatahubException("Error field type. {}".format(field_type))
-            self._fields[pos] = value_byte
+        value_byte = self._codec.encoders[pos](value)
+        if self._codec.variables[pos]:
+            value_byte = self.__set_byte_field(value_byte)
+        self._fields[pos] = value_byte
 
     def add_attribute(self, key, value):
+        self.__init_attr_map_if_need()
+        if key in self._attr_map:
+            self._attr_length -= BinaryRecord.__get_attribute_size(key, self._attr_map[key])
         self._attr_map[key] = value
-        self._attr_length += (INT_BYTE_SIZE * 2 + len(key) + len(value))
-        self._has_init_attr_map = False
+        self._attr_length += BinaryRecord.__get_attribute_size(key, value)
 
     def __set_byte_field(self, value):
         value_byte_len = len(value)
         if value_byte_len <= 7:
-            value += (PADDING_BYTES * (7 - value_byte_len))
-            value += int2byte(value_byte_len | 0x80, size=1, unsigned=True)
-            return value
+            return value + PADDING_BYTES * (7 - value_byte_len) + SMALL_SIZE_BYTES[value_byte_len]
         # offset from the end of RecordHeader
-        value_offset = FIELD_COUNT_BYTE_SIZE + len(self._null_bit) + self._field_cnt * 8
-        for i in range(self._field_cnt, len(self._fields)):
-            value_offset += len(self._fields[i])
+        value_offset = self._next_pos - RECORD_HEADER_SIZE
         # length(4 Byte) + offset(4 Byte)
-        value_byte = int2byte(value_byte_len, size=4) + int2byte(value_offset, size=4)
-        # add padding to 8N Byte
-        value += (PADDING_BYTES * (BYTE_SIZE_ONE_FIELD - (len(value) % BYTE_SIZE_ONE_FIELD)))
-        self._fields.append(value)
-        self._next_pos += len(value)
+        value_byte = LENGTH_OFFSET_STRUCT.pack(value_byte_len, value_offset)
+        self._var_fields.append(value)
+        self._next_pos += BinaryRecord.__get_padding_size(value_byte_len)
         return value_byte
 
-    def __append(self, src_buffer):
-        self._buffer += src_buffer
-
     def __set_none(self, pos, none=False):
         if not none:
             self.__check_pos_valid(pos)
             index = pos >> 3
             self._null_bit[index] |= (1 << (pos & 0x07))
 
+    @staticmethod
+    def __write_bytes(buffer, pos, value):
+        value_size = len(value)
+        INT_STRUCT.pack_into(buffer, pos, value_size)
+        pos += INT_BYTE_SIZE
+        buffer[pos:pos + value_size] = value
+        return pos + value_size
+
+    @staticmethod
+    def __get_padding_size(size):
+        # always add padding to the next 8N Byte
+        return size + BYTE_SIZE_ONE_FIELD - (size % BYTE_SIZE_ONE_FIELD)
+
+    @staticmethod
+    def __get_attribute_size(key, value):
+        return INT_BYTE_SIZE * 2 + len(to_binary(key)) + len(to_binary(value))
+
     # =======================
     # get record
     # =======================
 
     @classmethod
-    def deserialize(cls, schema, buffer, record_header):
-        binary_record = cls(schema, record_header.schema_version, buffer, record_header)
+    def deserialize(cls, schema, buffer, record_header, codec=None, lazy=False):
+        """
+        Deserialize record from buffer, if lazy is True, field and attribute map are decoded on first access
+        """
+        binary_record = cls(schema, record_header.schema_version, buffer, record_header, codec)
 
         # Deserialize null_bit
         null_bit_pos = RECORD_HEADER_SIZE + FIELD_COUNT_BYTE_SIZE
-        for index in range(len(binary_record._null_bit)):
-            binary_record._null_bit[index] = byte2int(binary_record._buffer[null_bit_pos:null_bit_pos + 1], size=1)
-            null_bit_pos += 1
+        binary_record._null_bit = list(buffer[null_bit_pos:null_bit_pos + binary_record._codec.null_bit_size])
+
+        if lazy:
+            binary_record._fields = [UNDECODED_FIELD] * binary_record._field_cnt
+            return binary_record
 
         # Deserialize filed
         for i in range(binary_record._field_cnt):
@@ -173,60 +186,33 @@ class BinaryRecord:
 
     def get_field(self, pos):
         self.__check_pos_valid(pos)
-        return self._fields[pos]
+        value = self._fields[pos]
+        if value is UNDECODED_FIELD:
+            value = self.__get_field(pos)
+            self._fields[pos] = value
+        return value
 
     def get_attribute(self):
+        self.__init_attr_map_if_need()
         return self._attr_map
 
     def __get_field(self, pos):
         if self.__is_field_none(pos):
             return None
-        field_byte = self.__read_field(pos)
-        if self._schema is None:    # BLOB
-            return self.__get_byte_field(field_byte)
-        else:                       # TUPLE
-            field_type = self._schema.get_field(pos).type
-            value = None
-            # length = 1
-            if field_type is FieldType.BOOLEAN:
-                value = byte2bool(field_byte[:1])
-            elif field_type is FieldType.TINYINT:
-                value = byte2int(field_byte[:1], size=1)
-            # length = 2
-            elif field_type is FieldType.SMALLINT:
-                value = byte2int(field_byte[:2], size=2)
-            # length = 4
-            elif field_type is FieldType.INTEGER:
-                value = byte2int(field_byte[:4], size=4)
-            elif field_type is FieldType.FLOAT:
-                value = byte2float(field_byte[:4])
-            # length = 8
-            elif field_type is FieldType.BIGINT or field_type is FieldType.TIMESTAMP:
-                value = byte2int(field_byte, size=8)
-            elif field_type is FieldType.DOUBLE:
-                value = byte2double(field_byte)
-            # length = ?
-            elif field_type is FieldType.STRING or field_type is FieldType.DECIMAL:
-                value = self.__get_str_field(field_byte)
-                if field_type is FieldType.DECIMAL:
-                    value = Decimal(value)
-        return value
+        offset = self._field_pos + pos * BYTE_SIZE_ONE_FIELD
+        if self._codec.variables[pos]:
+            return self._codec.decoders[pos](self.__get_byte_field(offset))
+        return self._codec.decoders[pos](self._buffer, offset)
 
-    def __get_byte_field(self, value_byte):
-        data = byte2int(value_byte, size=8)
+    def __get_byte_field(self, offset):
+        data = LONG_STRUCT.unpack_from(self._buffer, offset)[0]
         is_little_str = (data & (0x80 << 56)) != 0
         if is_little_str:
             str_size = ((data >> 56) & 0x07)
-            value = value_byte[:str_size]
-        else:
-            str_offset = RECORD_HEADER_SIZE + (data >> 32)
-            str_size = byte2int(value_byte[:4], size=4)
-            value = self._buffer[str_offset:str_offset + str_size]
-            self._next_pos -= str_size
-        return value
-
-    def __get_str_field(self, value_byte):
-        return to_text(self.__get_byte_field(value_byte))
+            return self._buffer[offset:offset + str_size]
+        str_offset = RECORD_HEADER_SIZE + (data >> 32)
+        str_size = INT_STRUCT.unpack_from(self._buffer, offset)[0]
+        return self._buffer[str_offset:str_offset + str_size]
 
     def __is_field_none(self, pos):
         self.__check_pos_valid(pos)
@@ -235,20 +221,21 @@ class BinaryRecord:
         return value == 0
 
     def __init_attr_map_if_need(self):
-        if self._has_init_attr_map:
+        # only record deserialized from buffer has attribute map to init
+        if self._has_init_attr_map or self._record_header is None:
             return
         offset = self._record_header.attr_offset
-        attr_size = byte2int(self._buffer[offset:offset+4])
+        attr_size = INT_STRUCT.unpack_from(self._buffer, offset)[0]
         if attr_size != 0 and self._attr_map is None:
             self._attr_map = dict()
 
         offset += INT_BYTE_SIZE
         for i in range(attr_size):
-            key_size = byte2int(self._buffer[offset:offset+4])
+            key_size = INT_STRUCT.unpack_from(self._buffer, offset)[0]
             offset += INT_BYTE_SIZE
             key_str = to_text(self._buffer[offset:offset+key_size])
             offset += key_size
-            val_size = byte2int(self._buffer[offset:offset+4])
+            val_size = INT_STRUCT.unpack_from(self._buffer, offset)[0]
             offset += INT_BYTE_SIZE
             value_str = to_text(self._buffer[offset:offset+val_size])
             offset += val_size
@@ -256,13 +243,6 @@ class BinaryRecord:
             self._attr_length += (key_size + val_size + 2*INT_BYTE_SIZE)
         self._has_init_attr_map = True
 
-    def __get_field_offset(self, pos):
-        return self._field_pos + pos * BYTE_SIZE_ONE_FIELD
-
-    def __read_field(self, pos):
-        offset = self.__get_field_offset(pos)
-        return self._buffer[offset:offset + BYTE_SIZE_ONE_FIELD]
-
     # =======================
     # common
     # =======================
@@ -274,6 +254,14 @@ class BinaryRecord:
         if pos < 0 or pos >= self._field_cnt:
             raise InvalidParameterException("Invalid position. position: {}, fieldCount: {}".format(pos, self._field_cnt))
 
+    @property
+    def record_size(self):
+        return self.__get_record_size()
+
+    @property
+    def codec(self):
+        return self._codec
+
     @property
     def field_cnt(self):
         return self._field_cnt
@@ -289,3 +277,4 @@ class BinaryRecord:
     @schema.setter
     def schema(self, schema):
         self._schema = schema
+        self._codec = get_record_codec(schema)
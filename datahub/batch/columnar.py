@@ -0,0 +1,416 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import six
+from decimal import Decimal
+from .record_codec import get_record_codec, BYTE_SIZE_ONE_FIELD, FIELD_COUNT_BYTE_SIZE, INT_BYTE_SIZE
+from .record_header import RECORD_HEADER_STRUCT, RECORD_HEADER_SIZE
+from .utils import INT_STRUCT
+from ..models import FieldType
+from ..models import types as _types
+from ..utils.converters import to_binary, to_text, to_str
+from ..exceptions import DatahubException, InvalidParameterException
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# field type --> numpy dtype of the value in the 8 bytes slot, the value is stored at the beginning of the slot
+_fixed_dtype_dict = {
+    FieldType.BOOLEAN: '?',
+    FieldType.TINYINT: '<i1',
+    FieldType.SMALLINT: '<i2',
+    FieldType.INTEGER: '<i4',
+    FieldType.BIGINT: '<i8',
+    FieldType.TIMESTAMP: '<i8',
+    FieldType.FLOAT: '<f4',
+    FieldType.DOUBLE: '<f8'
+}
+
+_variable_types = (FieldType.STRING, FieldType.DECIMAL)
+
+# field type --> (min, max) of value, checked per column when build from user data
+_bounds_dict = {
+    FieldType.TINYINT: (_types.Tinyint, _types.Tinyint._bounds),
+    FieldType.SMALLINT: (_types.Smallint, _types.Smallint._bounds),
+    FieldType.INTEGER: (_types.Integer, _types.Integer._bounds),
+    FieldType.TIMESTAMP: (_types.Timestamp, _types.Timestamp._ticks_bound)
+}
+
+# RecordHeader + field count of BinaryRecord
+_record_head_dtype = [('encode_type', '<i4'), ('schema_version', '<i4'), ('total_size', '<u4'), ('attr_offset', '<u4'),
+                      ('field_cnt', '<i4')]
+
+
+def check_numpy():
+    if np is None:
+        raise DatahubException("Columnar api requires numpy, please install numpy first")
+
+
+class Column:
+    """
+    One column of a ColumnBatch
+
+    Members:
+        field (:class:`datahub.models.Field`): field of the column
+
+        validity (:class:`numpy.ndarray`): bool array, False means the value is null
+
+        values (:class:`numpy.ndarray`): values of fixed length field, null value is 0
+
+        offsets (:class:`numpy.ndarray`): int64 array of STRING/DECIMAL field, value i is data[offsets[i]:offsets[i+1]]
+
+        data (:class:`numpy.ndarray`): uint8 array of STRING/DECIMAL field, utf-8 bytes of all values
+    """
+
+    def __init__(self, field, validity, values=None, offsets=None, data=None):
+        self._field = field
+        self._validity = validity
+        self._values = values
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self):
+        return len(self._validity)
+
+    @property
+    def field(self):
+        return self._field
+
+    @property
+    def validity(self):
+        return self._validity
+
+    @property
+    def values(self):
+        return self._values
+
+    @property
+    def offsets(self):
+        return self._offsets
+
+    @property
+    def data(self):
+        return self._data
+
+    @classmethod
+    def from_values(cls, field, values):
+        """
+        Build column from a numpy array, numpy masked array or sequence, None or masked value means null.
+        For integer and timestamp field, NaN in float array means null too.
+        """
+        if isinstance(values, np.ma.MaskedArray):
+            validity = ~np.ma.getmaskarray(values)
+            values = np.ma.getdata(values)
+        else:
+            values = np.asarray(values)
+            validity = np.not_equal(values, None) if values.dtype == object else np.ones(len(values), dtype=bool)
+        if values.ndim != 1:
+            raise InvalidParameterException('Column %s should be one dimension' % field.name)
+        if field.type in _bounds_dict or field.type == FieldType.BIGINT:
+            if values.dtype.kind == 'f':
+                validity &= ~np.isnan(values)
+        if not field.allow_null and not validity.all():
+            raise InvalidParameterException('Field %s can not be none' % field.name)
+
+        if field.type in _variable_types:
+            value_bytes = [to_binary(str(value)) if valid else b'' for value, valid in zip(values.tolist(), validity.tolist())]
+            offsets = np.zeros(len(value_bytes) + 1, dtype=np.int64)
+            np.cumsum(np.fromiter(map(len, value_bytes), dtype=np.int64, count=len(value_bytes)), out=offsets[1:])
+            data = np.frombuffer(b''.join(value_bytes), dtype=np.uint8)
+            return cls(field, validity, offsets=offsets, data=data)
+        if field.type not in _fixed_dtype_dict:
+            raise DatahubException("Error field type. {}".format(field.type))
+
+        dtype = _fixed_dtype_dict[field.type]
+        try:
+            if not validity.all():
+                values = np.where(validity, values, 0)
+            if field.type in _bounds_dict:
+                values = values.astype(np.int64)
+                Column.__check_bounds(field, values, validity)
+            values = values.astype(dtype)
+        except (TypeError, ValueError, OverflowError) as e:
+            raise InvalidParameterException('Column %s can not convert to %s. %s' % (field.name, field.type.value, e))
+        return cls(field, validity, values=values)
+
+    @staticmethod
+    def __check_bounds(field, values, validity):
+        data_type, (smallest, largest) = _bounds_dict[field.type]
+        invalid = validity & ((values < smallest) | (values > largest))
+        if invalid.any():
+            raise InvalidParameterException('InvalidData: %s(%s) out of range'
+                                            % (data_type.__name__, values[np.argmax(invalid)]))
+
+    def get_value(self, index):
+        if not 0 <= index < len(self._validity):
+            raise InvalidParameterException('Index %d out of range' % index)
+        if not self._validity[index]:
+            return None
+        if self._field.type not in _variable_types:
+            return self._values[index].item()
+        value = to_text(self._data[self._offsets[index]:self._offsets[index + 1]].tobytes())
+        return Decimal(value) if self._field.type == FieldType.DECIMAL else value
+
+    def to_list(self):
+        return [self.get_value(index) for index in range(len(self._validity))]
+
+
+class ColumnBatch:
+    """
+    Columnar records of a tuple topic, one Column per field of the schema
+
+    Members:
+        schema (:class:`datahub.models.RecordSchema`): record schema
+
+        record_count (:class:`int`): record count
+
+        columns (:class:`list`): list of :class:`datahub.batch.columnar.Column`
+    """
+
+    def __init__(self, schema, columns, record_count):
+        self._schema = schema
+        self._columns = columns
+        self._record_count = record_count
+        self._name_indices = dict((field.name, index) for index, field in enumerate(schema.field_list))
+
+    def __len__(self):
+        return self._record_count
+
+    @property
+    def schema(self):
+        return self._schema
+
+    @property
+    def columns(self):
+        return self._columns
+
+    @property
+    def record_count(self):
+        return self._record_count
+
+    def get_column(self, index_or_name):
+        if isinstance(index_or_name, six.integer_types):
+            if not 0 <= index_or_name < len(self._columns):
+                raise InvalidParameterException('Index %d out of range' % index_or_name)
+            return self._columns[index_or_name]
+        name = to_str(index_or_name)
+        if name not in self._name_indices:
+            raise InvalidParameterException('Field name %s does not exists' % name)
+        return self._columns[self._name_indices[name]]
+
+    def __getitem__(self, index_or_name):
+        return self.get_column(index_or_name)
+
+    @classmethod
+    def from_dict(cls, schema, data):
+        """
+        Build ColumnBatch from a dict of field name --> numpy array or sequence, such as dict of pandas DataFrame columns
+
+        :param schema: record schema
+        :param data: dict of field name --> values of the column
+        :return: ColumnBatch
+        """
+        check_numpy()
+        for name in data:
+            schema.get_field(name)
+
+        columns, record_count = [], None
+        for field in schema.field_list:
+            if field.name not in data:
+                raise InvalidParameterException('Field %s is missing in columns' % field.name)
+            column = Column.from_values(field, data[field.name])
+            if record_count is not None and len(column) != record_count:
+                raise InvalidParameterException('Length of columns are not equal')
+            record_count = len(column)
+            columns.append(column)
+        return cls(schema, columns, record_count or 0)
+
+
+class ColumnarDeserializer:
+    """
+    Decode the BinaryRecord buffers of batches into a ColumnBatch.
+    Fixed length slots are at constant offsets from the record start, so each column is gathered by one vectorized read.
+    """
+
+    @staticmethod
+    def deserialize(schema, raw_buffers):
+        """
+        :param schema: record schema of all records
+        :param raw_buffers: list of (BatchHeader, decompressed buffer of all BinaryRecord)
+        :return: ColumnBatch
+        """
+        check_numpy()
+        if schema is None:
+            raise InvalidParameterException("Columnar api only support TUPLE topic")
+        codec = get_record_codec(schema)
+
+        buffer = raw_buffers[0][1] if len(raw_buffers) == 1 else b''.join(raw_buffer for _, raw_buffer in raw_buffers)
+        starts = ColumnarDeserializer.__get_record_starts(raw_buffers, codec.field_cnt)
+        byte_array = np.frombuffer(buffer, dtype=np.uint8)
+
+        columns = []
+        null_bit_pos = starts + (RECORD_HEADER_SIZE + FIELD_COUNT_BYTE_SIZE)
+        slot_range = np.arange(BYTE_SIZE_ONE_FIELD)
+        for index, field in enumerate(schema.field_list):
+            validity = ((byte_array[null_bit_pos + (index >> 3)] >> (index & 0x07)) & 1).astype(bool)
+            slot_pos = starts + (codec.field_pos + index * BYTE_SIZE_ONE_FIELD)
+            slots = byte_array[slot_pos[:, None] + slot_range]     # record_count * 8 bytes
+            if field.type in _variable_types:
+                offsets, data = ColumnarDeserializer.__gather_variable(byte_array, starts, slot_pos, slots, validity)
+                columns.append(Column(field, validity, offsets=offsets, data=data))
+            elif field.type in _fixed_dtype_dict:
+                values = np.ascontiguousarray(slots.view(_fixed_dtype_dict[field.type])[:, 0])
+                values[~validity] = 0
+                columns.append(Column(field, validity, values=values))
+            else:
+                raise DatahubException("Error field type. {}".format(field.type))
+        return ColumnBatch(schema, columns, len(starts))
+
+    @staticmethod
+    def __get_record_starts(raw_buffers, field_cnt):
+        # record size is variable, so the record header has to be walked one by one
+        starts = []
+        base = 0
+        for batch_header, raw_buffer in raw_buffers:
+            next_pos = 0
+            for index in range(batch_header.record_count):
+                total_size = RECORD_HEADER_STRUCT.unpack_from(raw_buffer, next_pos)[2]
+                record_field_cnt = INT_STRUCT.unpack_from(raw_buffer, next_pos + RECORD_HEADER_SIZE)[0]
+                if record_field_cnt != field_cnt:
+                    raise DatahubException("Columnar decode needs the same schema for all records. expect field count: {}, real: {}"
+                                           .format(field_cnt, record_field_cnt))
+                starts.append(base + next_pos)
+                next_pos += total_size
+            base += len(raw_buffer)
+        return np.array(starts, dtype=np.int64)
+
+    @staticmethod
+    def __gather_variable(byte_array, starts, slot_pos, slots, validity):
+        data = slots.view('<i8')[:, 0]
+        # value no longer than 7 bytes is in the slot, the highest bit is set and the size is in the last byte
+        is_little = data < 0
+        sizes = np.where(is_little, (data >> 56) & 0x07, data & 0xffffffff)
+        sizes[~validity] = 0
+        # offset of big value is from the end of RecordHeader
+        value_pos = np.where(is_little, slot_pos, starts + RECORD_HEADER_SIZE + (data >> 32))
+
+        offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        gather_index = np.repeat(value_pos - offsets[:-1], sizes) + np.arange(offsets[-1])
+        return offsets, byte_array[gather_index]
+
+
+class ColumnarSerializer:
+    """
+    Encode a ColumnBatch into the buffer of BinaryRecord, same as serializing one BinaryRecord per row,
+    but every column is written by vectorized operation
+    """
+
+    @staticmethod
+    def serialize(column_batch, version_id):
+        check_numpy()
+        codec = get_record_codec(column_batch.schema)
+        record_count = column_batch.record_count
+
+        # variable length data of each record is appended in field order, value no longer than 7 bytes is in the slot
+        var_pos = dict()
+        var_size = np.zeros(record_count, dtype=np.int64)
+        for index, column in enumerate(column_batch.columns):
+            if column.field.type in _variable_types:
+                sizes = np.diff(column.offsets)
+                var_pos[index] = codec.fixed_size + var_size
+                var_size = var_size + np.where(sizes > 7, sizes + BYTE_SIZE_ONE_FIELD - sizes % BYTE_SIZE_ONE_FIELD, 0)
+
+        attr_offset = codec.fixed_size + var_size
+        record_size = attr_offset + INT_BYTE_SIZE
+        starts = np.zeros(record_count, dtype=np.int64)
+        np.cumsum(record_size[:-1], out=starts[1:])
+        buffer = np.zeros(int(record_size.sum()), dtype=np.uint8)
+
+        # record header and field count
+        record_head = np.zeros(record_count, dtype=_record_head_dtype)
+        record_head['schema_version'] = version_id
+        record_head['total_size'] = record_size
+        record_head['attr_offset'] = attr_offset
+        record_head['field_cnt'] = codec.field_cnt
+        ColumnarSerializer.__scatter(buffer, starts, record_head.view(np.uint8).reshape(record_count, -1))
+
+        # null bit, field, variable length data
+        null_bit = np.zeros((record_count, codec.null_bit_size), dtype=np.uint8)
+        for index, column in enumerate(column_batch.columns):
+            null_bit[:, index >> 3] |= column.validity.astype(np.uint8) << (index & 0x07)
+            slot_pos = starts + (codec.field_pos + index * BYTE_SIZE_ONE_FIELD)
+            if index in var_pos:
+                ColumnarSerializer.__write_variable(buffer, starts, slot_pos, var_pos[index], column)
+            else:
+                ColumnarSerializer.__scatter(buffer, slot_pos, ColumnarSerializer.__get_fixed_slots(column))
+        ColumnarSerializer.__scatter(buffer, starts + (RECORD_HEADER_SIZE + FIELD_COUNT_BYTE_SIZE), null_bit)
+
+        # attribute map is empty, the count is 0
+        return buffer.tobytes()
+
+    @staticmethod
+    def __get_fixed_slots(column):
+        values = np.where(column.validity, column.values, 0)
+        slots = np.zeros((len(values), BYTE_SIZE_ONE_FIELD), dtype=np.uint8)
+        if column.field.type == FieldType.BOOLEAN:
+            slots[:, 0] = values.astype(np.uint8)
+        elif column.field.type == FieldType.FLOAT:
+            slots[:, :4] = values.astype('<f4').view(np.uint8).reshape(-1, 4)
+        elif column.field.type == FieldType.DOUBLE:
+            slots[:] = values.astype('<f8').view(np.uint8).reshape(-1, BYTE_SIZE_ONE_FIELD)
+        else:
+            # all integer type are written as 8 bytes
+            slots[:] = values.astype('<i8').view(np.uint8).reshape(-1, BYTE_SIZE_ONE_FIELD)
+        return slots
+
+    @staticmethod
+    def __write_variable(buffer, starts, slot_pos, var_pos, column):
+        sizes = np.diff(column.offsets)
+        is_big = column.validity & (sizes > 7)
+        is_little = column.validity & ~is_big
+
+        # big value: length(4 Byte) + offset(4 Byte) from the end of RecordHeader
+        slots = np.zeros((len(sizes), BYTE_SIZE_ONE_FIELD), dtype=np.uint8)
+        length_offset = np.stack([sizes, var_pos - RECORD_HEADER_SIZE], axis=1).astype('<i4')
+        slots[is_big] = length_offset[is_big].view(np.uint8).reshape(-1, BYTE_SIZE_ONE_FIELD)
+        # little value: value + padding + (size | 0x80)
+        slots[is_little, BYTE_SIZE_ONE_FIELD - 1] = (sizes[is_little] | 0x80).astype(np.uint8)
+        ColumnarSerializer.__scatter(buffer, slot_pos, slots)
+
+        value_pos = np.where(is_big, starts + var_pos, slot_pos)
+        ColumnarSerializer.__copy_ranges(buffer, value_pos, column.data, column.offsets[:-1], sizes)
+
+    @staticmethod
+    def __scatter(buffer, positions, matrix):
+        # write row i of matrix to buffer[positions[i]:positions[i] + width]
+        buffer[positions[:, None] + np.arange(matrix.shape[1])] = matrix
+
+    @staticmethod
+    def __copy_ranges(buffer, dst_starts, data, src_starts, sizes):
+        # copy data[src_starts[i]:src_starts[i] + sizes[i]] to buffer[dst_starts[i]:...]
+        total_size = int(sizes.sum())
+        if total_size == 0:
+            return
+        ends = np.cumsum(sizes)
+        inner = np.arange(total_size) - np.repeat(ends - sizes, sizes)
+        buffer[np.repeat(dst_starts, sizes) + inner] = data[np.repeat(src_starts, sizes) + inner]
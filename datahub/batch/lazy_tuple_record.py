@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from ..models.record import Record, TupleRecord
+from ..exceptions import InvalidParameterException
+
+
+class LazyTupleRecord(TupleRecord):
+    """
+    Tuple record view backed by a lazy deserialized BinaryRecord.
+    Field value is decoded on first get_value, attributes are decoded on first access.
+    Values are copied out of the BinaryRecord only when the record is modified or read as a whole.
+    """
+
+    __slots__ = ('_binary_record',)
+
+    def __init__(self, binary_record):
+        # skip TupleRecord.__init__, the values in buffer are written by server and no need to validate
+        Record.__init__(self)
+        self._binary_record = binary_record
+        self._field_list = binary_record.schema.field_list
+        self._name_indices = binary_record.codec.name_indices
+        self._values = None
+        self._attributes = None
+
+    @property
+    def values(self):
+        return tuple(self.__init_values())
+
+    @values.setter
+    def values(self, value):
+        TupleRecord.values.fset(self, value)
+
+    @property
+    def attributes(self):
+        return self.__init_attributes()
+
+    @attributes.setter
+    def attributes(self, value):
+        self._attributes = value
+
+    def get_attribute(self, key):
+        self.__init_attributes()
+        return super(LazyTupleRecord, self).get_attribute(key)
+
+    def put_attribute(self, key, value):
+        self.__init_attributes()
+        super(LazyTupleRecord, self).put_attribute(key, value)
+
+    def encode_values(self):
+        self.__init_values()
+        return super(LazyTupleRecord, self).encode_values()
+
+    def encode_pb_record_data(self):
+        self.__init_values()
+        return super(LazyTupleRecord, self).encode_pb_record_data()
+
+    def to_json(self):
+        self.__init_attributes()
+        return super(LazyTupleRecord, self).to_json()
+
+    def to_pb_record_entry(self):
+        self.__init_attributes()
+        return super(LazyTupleRecord, self).to_pb_record_entry()
+
+    def encode_pb_values(self):
+        self.__init_values()
+        return super(LazyTupleRecord, self).encode_pb_values()
+
+    def encode_pb_record_entry(self):
+        self.__init_attributes()
+        return super(LazyTupleRecord, self).encode_pb_record_entry()
+
+    def _set_value_by_index(self, index, value):
+        self.__init_values()
+        super(LazyTupleRecord, self)._set_value_by_index(index, value)
+
+    def _get_value_by_index(self, index):
+        if not 0 <= index < len(self._field_list):
+            raise InvalidParameterException('Index %d out of range' % index)
+        if self._values is not None:
+            return self._values[index]
+        return self._binary_record.get_field(index)
+
+    def _get_value_by_name(self, name):
+        if name not in self._name_indices:
+            raise InvalidParameterException('Field name %s does not exists' % name)
+        return self._get_value_by_index(self._name_indices[name])
+
+    def __init_values(self):
+        if self._values is None:
+            self._values = [self._binary_record.get_field(index) for index in range(len(self._field_list))]
+        return self._values
+
+    def __init_attributes(self):
+        if self._attributes is None:
+            self._attributes = dict(self._binary_record.get_attribute())
+        return self._attributes
+
+    def __repr__(self):
+        self.__init_values()
+        self.__init_attributes()
+        return super(LazyTupleRecord, self).__repr__()
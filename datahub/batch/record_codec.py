@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+import struct
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from .record_header import RECORD_HEADER_SIZE
+from ..models import FieldType
+from ..utils.converters import to_binary, to_text
+from ..exceptions import InvalidParameterException, DatahubException
+
+
+BYTE_SIZE_ONE_FIELD = 8
+FIELD_COUNT_BYTE_SIZE = 4
+INT_BYTE_SIZE = 4
+MAX_CODEC_CACHE_SIZE = 1024
+
+
+def _fixed_encoder(fmt, padding_size=0):
+    return struct.Struct("<{}{}".format(fmt, "x" * padding_size)).pack
+
+
+def _fixed_decoder(fmt):
+    unpack_from = struct.Struct("<{}".format(fmt)).unpack_from
+
+    def decode(buffer, offset):
+        return unpack_from(buffer, offset)[0]
+    return decode
+
+
+def _encode_blob(value):
+    if not isinstance(value, bytes):
+        raise InvalidParameterException("Only support write bytes for no schema")
+    return value
+
+
+def _encode_str(value):
+    return to_binary(str(value))
+
+
+def _decode_decimal(value_byte):
+    return Decimal(to_text(value_byte))
+
+
+# field type --> (encoder, decoder, is variable length), None means BLOB
+# fixed length: encoder returns the whole 8 bytes slot, decoder reads from (record buffer, slot offset)
+# variable length: encoder returns the value bytes, decoder converts the value bytes
+_field_codec_dict = {
+    FieldType.BOOLEAN: (_fixed_encoder("?", 7), _fixed_decoder("?"), False),
+    FieldType.TINYINT: (_fixed_encoder("q"), _fixed_decoder("b"), False),
+    FieldType.SMALLINT: (_fixed_encoder("q"), _fixed_decoder("h"), False),
+    FieldType.INTEGER: (_fixed_encoder("q"), _fixed_decoder("i"), False),
+    FieldType.BIGINT: (_fixed_encoder("q"), _fixed_decoder("q"), False),
+    FieldType.TIMESTAMP: (_fixed_encoder("q"), _fixed_decoder("q"), False),
+    FieldType.FLOAT: (_fixed_encoder("f", 4), _fixed_decoder("f"), False),
+    FieldType.DOUBLE: (_fixed_encoder("d"), _fixed_decoder("d"), False),
+    FieldType.STRING: (_encode_str, to_text, True),
+    FieldType.DECIMAL: (_encode_str, _decode_decimal, True),
+    None: (_encode_blob, bytes, True)
+}
+
+
+class RecordCodec:
+    """
+    Binary codec of a record schema, holds the fixed slot layout and the encoder/decoder of each field.
+    It is compiled once and shared by all BinaryRecord with the same schema.
+    """
+
+    def __init__(self, schema=None):
+        field_types = [field.type for field in schema.field_list] if schema else [None]
+
+        self._schema = schema
+        self._name_indices = dict((field.name, index) for index, field in enumerate(schema.field_list)) if schema else dict()
+        self._field_cnt = len(field_types)
+        self._null_bit_size = ((self._field_cnt + 63) >> 6) << 3
+        self._field_pos = RECORD_HEADER_SIZE + FIELD_COUNT_BYTE_SIZE + self._null_bit_size
+        self._fixed_size = self._field_pos + self._field_cnt * BYTE_SIZE_ONE_FIELD
+
+        self._encoders = []
+        self._decoders = []
+        self._variables = []
+        for field_type in field_types:
+            if field_type not in _field_codec_dict:
+                raise DatahubException("Error field type. {}".format(field_type))
+            encoder, decoder, is_variable = _field_codec_dict[field_type]
+            self._encoders.append(encoder)
+            self._decoders.append(decoder)
+            self._variables.append(is_variable)
+
+    @property
+    def schema(self):
+        return self._schema
+
+    @property
+    def name_indices(self):
+        return self._name_indices
+
+    @property
+    def field_cnt(self):
+        return self._field_cnt
+
+    @property
+    def null_bit_size(self):
+        return self._null_bit_size
+
+    @property
+    def field_pos(self):
+        return self._field_pos
+
+    @property
+    def fixed_size(self):
+        return self._fixed_size
+
+    @property
+    def encoders(self):
+        return self._encoders
+
+    @property
+    def decoders(self):
+        return self._decoders
+
+    @property
+    def variables(self):
+        return self._variables
+
+
+_codec_cache = OrderedDict()      # schema cache key --> RecordCodec, in the order of use
+_codec_lock = threading.Lock()
+
+
+def get_record_codec(schema):
+    key = schema.cache_key if schema else None
+    with _codec_lock:
+        codec = _codec_cache.pop(key, None)
+        if codec is not None:
+            # reinsert as the most recently used
+            _codec_cache[key] = codec
+            return codec
+
+    codec = RecordCodec(schema)
+    with _codec_lock:
+        _codec_cache[key] = codec
+        if len(_codec_cache) > MAX_CODEC_CACHE_SIZE:
+            _codec_cache.popitem(last=False)
+    return codec
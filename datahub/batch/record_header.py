@@ -18,10 +18,12 @@
 # under the License.
 
 
+import struct
 from .utils import *
 from ..exceptions import DatahubException
 
 RECORD_HEADER_SIZE = 16
+RECORD_HEADER_STRUCT = struct.Struct("<iiII")  # encode_type, schema_version, total_size, attr_offset
 
 
 class RecordHeader:
@@ -33,23 +35,17 @@ class RecordHeader:
 
     @staticmethod
     def serialize(encode_type, schema_version, total_size, attr_offset):
-        header = bytes()
-        header += int2byte(encode_type)
-        header += int2byte(schema_version)
-        header += int2byte(total_size, unsigned=True)
-        header += int2byte(attr_offset, unsigned=True)
-        return header
+        return RECORD_HEADER_STRUCT.pack(encode_type, schema_version, total_size, attr_offset)
+
+    @staticmethod
+    def serialize_into(buffer, offset, encode_type, schema_version, total_size, attr_offset):
+        RECORD_HEADER_STRUCT.pack_into(buffer, offset, encode_type, schema_version, total_size, attr_offset)
 
     @staticmethod
     def deserialize(header):
         if len(header) != RECORD_HEADER_SIZE:
             raise DatahubException("Record header length should be {}".format(RECORD_HEADER_SIZE))
-        return RecordHeader(
-            byte2int(header[:4]),
-            byte2int(header[4:8]),
-            byte2int(header[8:12]),
-            byte2int(header[12:16])
-        )
+        return RecordHeader(*RECORD_HEADER_STRUCT.unpack(header))
 
     @property
     def encode_type(self):
@@ -20,6 +20,7 @@
 
 import threading
 from ..models import RecordSchema
+from ..models.compress import register_zstd_dictionary
 from ..exceptions import ResourceNotFoundException
 
 
@@ -56,6 +57,21 @@ class SchemaRegistryClient:
                                             .format(project_name, topic_name, version_id, e))
         return result
 
+    def register_dictionary(self, project_name, topic_name, schema, dict_data):
+        """
+        Register the zstd dictionary of the schema version, records of the version are compressed with it in ZSTD
+        """
+        version_id = self.get_version_id(project_name, topic_name, schema)
+        schema_meta = self.__get_schema_meta(project_name, topic_name)
+        schema_meta.add_dictionary(version_id, register_zstd_dictionary(dict_data))
+        return version_id
+
+    def get_dictionary(self, project_name, topic_name, version_id):
+        """
+        Return the ZstdCompressor with the dictionary of the schema version, None if not registered
+        """
+        return self.__get_schema_meta(project_name, topic_name).get_dictionary(version_id)
+
     def __get_schema_meta(self, project_name, topic_name):
         key = self.__gen_key(project_name, topic_name)
         if key not in self._cache:
@@ -83,6 +99,7 @@ class SchemaMeta:
     def __init__(self):
         self._version_schema_map = dict()          # version_string --> schema_string
         self._schema_version_map = dict()          # schema_string --> version_string
+        self._version_dict_map = dict()            # version_string --> ZstdCompressor with dictionary
         self._version_lock = threading.Lock()
         self._schema_lock = threading.Lock()
 
@@ -105,6 +122,12 @@ class SchemaMeta:
                 raise ResourceNotFoundException("VersionId not found with the specified schema {}.".format(schema.to_json_string()))
             return version_id
 
+    def get_dictionary(self, version_id):
+        return self._version_dict_map.get(version_id)
+
+    def add_dictionary(self, version_id, dict_compressor):
+        self._version_dict_map[version_id] = dict_compressor
+
     def add(self, version_id, schema):
         schema_str = schema.to_json_string()
         self._version_schema_map[version_id] = schema_str
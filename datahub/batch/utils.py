@@ -22,52 +22,56 @@ import struct
 
 PADDING_BYTES = b'\x00'
 
+# (size, unsigned) --> precompiled little endian struct
+_int_struct_dict = {
+    (1, False): struct.Struct("<b"),
+    (1, True): struct.Struct("<B"),
+    (2, False): struct.Struct("<h"),
+    (2, True): struct.Struct("<H"),
+    (4, False): struct.Struct("<i"),
+    (4, True): struct.Struct("<I"),
+    (8, False): struct.Struct("<q"),
+    (8, True): struct.Struct("<Q"),
+}
+INT_STRUCT = _int_struct_dict[(4, False)]
+LONG_STRUCT = _int_struct_dict[(8, False)]
+FLOAT_STRUCT = struct.Struct("<f")
+DOUBLE_STRUCT = struct.Struct("<d")
+BOOL_STRUCT = struct.Struct("<?")
+
+
 def int2byte(input_int, size=4, unsigned=False):
-    if size == 1:
-        return struct.pack("<{}".format("B" if unsigned else "b"), input_int)
-    if size == 2:
-        return struct.pack("<{}".format("H" if unsigned else "h"), input_int)
-    if size == 4:
-        return struct.pack("<{}".format("I" if unsigned else "i"), input_int)
-    if size == 8:
-        return struct.pack("<{}".format("Q" if unsigned else "q"), input_int)
-    return None
+    int_struct = _int_struct_dict.get((size, unsigned))
+    return int_struct.pack(input_int) if int_struct else None
 
 
 def byte2int(input_byte, size=4, unsigned=False):
-    if size == 1:
-        return struct.unpack("<{}".format("B" if unsigned else "b"), input_byte)[0]
-    if size == 2:
-        return struct.unpack("<{}".format("H" if unsigned else "h"), input_byte)[0]
-    if size == 4:
-        return struct.unpack("<{}".format("I" if unsigned else "i"), input_byte)[0]
-    if size == 8:
-        return struct.unpack("<{}".format("Q" if unsigned else "q"), input_byte)[0]
-    return None
+    int_struct = _int_struct_dict.get((size, unsigned))
+    return int_struct.unpack(input_byte)[0] if int_struct else None
 
 
 def float2byte(input_float):
-    return struct.pack("<f", input_float)
+    return FLOAT_STRUCT.pack(input_float)
 
 
 def byte2float(input_byte):
-    return struct.unpack("<f", input_byte)[0]
+    return FLOAT_STRUCT.unpack(input_byte)[0]
 
 
 def double2byte(input_double):
-    return struct.pack("<d", input_double)
+    return DOUBLE_STRUCT.pack(input_double)
 
 
 def byte2double(input_byte):
-    return struct.unpack("<d", input_byte)[0]
+    return DOUBLE_STRUCT.unpack(input_byte)[0]
 
 
 def bool2byte(input_bool):
-    return struct.pack("<?", input_bool)
+    return BOOL_STRUCT.pack(input_bool)
 
 
 def byte2bool(input_byte):
-    return struct.unpack("<?", input_byte)[0]
+    return BOOL_STRUCT.unpack(input_byte)[0]
 
 
 class SchemaObject:
@@ -18,8 +18,15 @@
 # under the License.
 
 
+import sys
+
 from .common import ProducerConfig
 from .common import ConsumerConfig
 
 from .producer.datahub_producer import DatahubProducer
 from .consumer.datahub_consumer import DatahubConsumer
+
+# the asyncio producer and consumer are written in async/await syntax of python 3.7+
+if sys.version_info >= (3, 7):
+    from .producer.async_datahub_producer import AsyncDatahubProducer
+    from .consumer.async_datahub_consumer import AsyncDatahubConsumer
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+import logging
+from datahub.exceptions import DatahubException
+from .constant import Constant
+from .datahub_factory import DatahubFactory
+from .meta_data import TopicMeta, ShardMeta
+from .timer import Timer
+
+
+class AsyncShardCoordinator:
+    """
+    Coordinator of async producer and consumer, the topic and shard meta are kept per coordinator
+    since the async client is bound to the event loop.
+    """
+
+    def __init__(self, project_name, topic_name, sub_id, common_config):
+        self._closed = False
+        self._logger = logging.getLogger(AsyncShardCoordinator.__name__)
+
+        self._endpoint = common_config.endpoint
+        self._project_name = project_name
+        self._topic_name = topic_name
+        self._sub_id = sub_id
+        self._uniq_key = None
+        self._gen_uniq_key()
+
+        self._datahub_client = DatahubFactory.create_async_datahub_client(common_config)
+        self._topic_meta = None
+        self._shard_meta_map = dict()
+        self._timer = Timer(Constant.SHARD_META_REFRESH_TIMEOUT)
+
+        self._assign_shard_list = []
+        self._shard_change = None
+        self._remove_all_shards = None
+
+    async def start(self):
+        try:
+            get_topic_result = await self._datahub_client.get_topic(self._project_name, self._topic_name)
+            self._topic_meta = TopicMeta(self._project_name, self._topic_name, get_topic_result.record_type,
+                                         get_topic_result.record_schema)
+        except Exception as e:
+            self._logger.warning("Init topic meta fail. key: {}, {}".format(self._uniq_key, e))
+            raise e
+        await self.__update_shard_meta_once()
+
+    async def close(self):
+        self._closed = True
+        await self._datahub_client.close()
+
+    async def update_shard_info(self):
+        if self._closed:
+            self._logger.warning("AsyncShardCoordinator closed when update shard info. key: {}".format(self._uniq_key))
+            raise DatahubException("AsyncShardCoordinator closed when update shard info")
+
+        await self.update_shard_meta()
+
+    async def update_shard_meta(self, force=False):
+        if force or self._timer.is_expired():
+            try:
+                await self.__update_shard_meta_once()
+            except DatahubException as e:
+                self._logger.warning("AsyncShardCoordinator update shard meta fail. key: {}. Exception: {}".format(self._uniq_key, e))
+
+    def register_shard_change(self, shard_change_callback):
+        self._shard_change = shard_change_callback
+
+    def register_remove_all_shards(self, remove_all_shards_callback):
+        self._remove_all_shards = remove_all_shards_callback
+
+    async def on_shard_meta_change(self, add_shards, del_shards):
+        if not self.is_user_shard_assign():
+            await self._do_shard_change(add_shards, del_shards)
+
+    def is_user_shard_assign(self):
+        return len(self._assign_shard_list) > 0
+
+    @property
+    def assign_shard_list(self):
+        return self._assign_shard_list
+
+    @assign_shard_list.setter
+    def assign_shard_list(self, value):
+        self._assign_shard_list = value
+
+    @property
+    def endpoint(self):
+        return self._endpoint
+
+    @property
+    def project_name(self):
+        return self._project_name
+
+    @property
+    def topic_name(self):
+        return self._topic_name
+
+    @property
+    def sub_id(self):
+        return self._sub_id
+
+    @property
+    def uniq_key(self):
+        return self._uniq_key
+
+    @property
+    def datahub_client(self):
+        return self._datahub_client
+
+    @property
+    def topic_meta(self):
+        return self._topic_meta
+
+    @property
+    def shard_meta_map(self):
+        return self._shard_meta_map
+
+    async def _do_shard_change(self, add_shards, del_shards):
+        if self._closed:
+            self._logger.warning("AsyncShardCoordinator closed when shard change. key: {}".format(self._uniq_key))
+            raise DatahubException("AsyncShardCoordinator closed when shard change")
+
+        if self._shard_change and ((add_shards and len(add_shards) != 0) or (del_shards and len(del_shards) != 0)):
+            await self._shard_change(add_shards, del_shards)
+
+    async def _do_remove_all_shards(self):
+        if self._closed:
+            self._logger.warning("AsyncShardCoordinator closed when remove all shards. key: {}".format(self._uniq_key))
+            raise DatahubException("AsyncShardCoordinator closed when remove all shards")
+
+        if self._remove_all_shards:
+            await self._remove_all_shards()
+
+    def _gen_uniq_key(self, suffix=None):
+        if not self._uniq_key:
+            self._uniq_key = "{}:{}".format(self._project_name, self._topic_name)
+            if self._sub_id:
+                self._uniq_key += (":" + self._sub_id)
+
+        if suffix:
+            self._uniq_key += (":" + suffix)
+
+    async def __update_shard_meta_once(self):
+        try:
+            list_shard_result = await self._datahub_client.list_shard(self._project_name, self._topic_name)
+            new_shard_map = dict()
+            for shard in list_shard_result.shards:
+                new_shard_map[shard.shard_id] = ShardMeta(shard.shard_id, self._endpoint, shard.state, list_shard_result.protocol)
+
+            new_add = [k for k in new_shard_map if k not in self._shard_meta_map]
+            new_del = [k for k in self._shard_meta_map if k not in new_shard_map]
+            init = len(self._shard_meta_map) == 0
+            self._shard_meta_map = new_shard_map
+            self._timer.reset()
+
+            if not init and (len(new_add) > 0 or len(new_del) > 0):
+                self._logger.debug("Shard changed when update shard meta. key: {}, new_add: {}, new_del: {}".format(self._uniq_key, new_add, new_del))
+                await self.on_shard_meta_change(new_add, new_del)
+            self._logger.debug("Update shard meta success. key: {}".format(self._uniq_key))
+        except DatahubException as e:
+            self._logger.warning("Update shard meta fail. key: {}, DatahubException: {}".format(self._uniq_key, e))
+            raise e
+        except Exception as e:
+            self._logger.warning("Update shard meta fail. key: {}, {}".format(self._uniq_key, e))
+            raise e
@@ -92,7 +92,8 @@ class DatahubConfig:
 class CommonConfig(DatahubConfig):
     """Common configuration with shared settings for producer and consumer"""
 
-    __slots__ = '_retry_times', '_async_thread_limit', '_thread_queue_limit', '_logging_level', '_logging_filename'
+    __slots__ = '_retry_times', '_async_thread_limit', '_thread_queue_limit', '_logging_level', '_logging_filename', \
+                '_host_ip'
 
     def __init__(self, access_id, access_key, endpoint, protocol_type, compress_format, credential=None):
         super().__init__(access_id, access_key, endpoint, protocol_type, compress_format, credential)
@@ -101,6 +102,7 @@ class CommonConfig(DatahubConfig):
         self._thread_queue_limit = Constant.DEFAULT_THREAD_QUEUE_LIMIT
         self._logging_level = Constant.DEFAULT_LOGING_LEVEL
         self._logging_filename = Constant.DEFAULT_LOGING_FILENAME
+        self._host_ip = None
 
     @classmethod
     def from_access(cls, access_id, access_key, endpoint, protocol_type=Constant.DEFAULT_PROTOCOL_TYPE,
@@ -152,6 +154,14 @@ class CommonConfig(DatahubConfig):
     def logging_filename(self, value):
         self._logging_filename = value
 
+    @property
+    def host_ip(self):
+        return self._host_ip
+
+    @host_ip.setter
+    def host_ip(self, value):
+        self._host_ip = value
+
 
 class ConsumerConfig(CommonConfig):
     """
@@ -178,6 +188,8 @@ class ConsumerConfig(CommonConfig):
 
         logging_filename (:class:`string`): Logging file name
 
+        host_ip (:class:`string`): Host ip in user agent, detected once per process by default
+
         auto_ack_offset (:class:`bool`): Auto ack offset for fetched records or not
 
         session_timeout (:class:`int`): Session timeout
@@ -185,9 +197,14 @@ class ConsumerConfig(CommonConfig):
         max_record_buffer_size (:class:`int`): Max record buffer size in consumer
 
         fetch_limit (:class:`int`): Fetch num limit need to consume
+
+        integrity_mode (:class:`datahub.models.IntegrityMode`): Crc check mode of fetched records
+
+        integrity_sample_rate (:class:`float`): Sample rate of crc check, only valid in ``IntegrityMode.SAMPLED``
     """
 
-    __slots__ = '_auto_ack_offset', '_session_timeout', '_max_record_buffer_size', '_fetch_limit'
+    __slots__ = '_auto_ack_offset', '_session_timeout', '_max_record_buffer_size', '_fetch_limit', \
+                '_integrity_mode', '_integrity_sample_rate'
 
     def __init__(self, access_id, access_key, endpoint, protocol_type=Constant.DEFAULT_PROTOCOL_TYPE,
                  compress_format=Constant.DEFAULT_COMPRESS_FORMAT, credential=None):
@@ -196,6 +213,8 @@ class ConsumerConfig(CommonConfig):
         self._session_timeout = Constant.DEFAULT_SESSION_TIMEOUT
         self._max_record_buffer_size = Constant.DEFAULT_MAX_RECORD_BUFFER_SIZE
         self._fetch_limit = Constant.DEFAULT_FETCH_LIMIT
+        self._integrity_mode = Constant.DEFAULT_INTEGRITY_MODE
+        self._integrity_sample_rate = Constant.DEFAULT_INTEGRITY_SAMPLE_RATE
 
     @property
     def auto_ack_offset(self):
@@ -229,6 +248,22 @@ class ConsumerConfig(CommonConfig):
     def fetch_limit(self, value):
         self._fetch_limit = value
 
+    @property
+    def integrity_mode(self):
+        return self._integrity_mode
+
+    @integrity_mode.setter
+    def integrity_mode(self, value):
+        self._integrity_mode = value
+
+    @property
+    def integrity_sample_rate(self):
+        return self._integrity_sample_rate
+
+    @integrity_sample_rate.setter
+    def integrity_sample_rate(self, value):
+        self._integrity_sample_rate = value
+
 
 class ProducerConfig(CommonConfig):
     """
@@ -255,6 +290,8 @@ class ProducerConfig(CommonConfig):
 
         logging_filename (:class:`string`): Logging file name
 
+        host_ip (:class:`string`): Host ip in user agent, detected once per process by default
+
         max_async_buffer_records (:class:`int`): Max buffer records number to PutRecords once. Only valid when write async.
 
         max_async_buffer_size (:class:`int`): Max buffer size to PutRecords once. Only valid when write async.
@@ -262,10 +299,12 @@ class ProducerConfig(CommonConfig):
         max_async_buffer_time (:class:`int`): Max buffer time to PutRecords once. Only valid when write async.
 
         max_record_pack_queue_limit (:class:`int`): Max ready record pack limit for queue. Only valid when write async.
+
+        prepare_thread_limit (:class:`int`): Thread num limit for serializing and compressing record packs in message writer. Only valid when write async.
     """
 
     __slots__ = '_max_async_buffer_records', '_max_async_buffer_size',\
-                '_max_async_buffer_time', '_max_record_pack_queue_limit'
+                '_max_async_buffer_time', '_max_record_pack_queue_limit', '_prepare_thread_limit'
 
     def __init__(self, access_id, access_key, endpoint, protocol_type=Constant.DEFAULT_PROTOCOL_TYPE,
                  compress_format=Constant.DEFAULT_COMPRESS_FORMAT, credential=None):
@@ -274,6 +313,7 @@ class ProducerConfig(CommonConfig):
         self._max_async_buffer_size = Constant.MAX_ASYNC_BUFFER_SIZE
         self._max_async_buffer_time = Constant.MAX_ASYNC_BUFFER_TIMEOUT_S
         self._max_record_pack_queue_limit = Constant.MAX_RECORD_PACK_QUEUE_LIMIT
+        self._prepare_thread_limit = Constant.DEFAULT_PREPARE_THREAD_LIMIT
 
     @property
     def max_async_buffer_records(self):
@@ -306,3 +346,11 @@ class ProducerConfig(CommonConfig):
     @max_record_pack_queue_limit.setter
     def max_record_pack_queue_limit(self, value):
         self._max_record_pack_queue_limit = value
+
+    @property
+    def prepare_thread_limit(self):
+        return self._prepare_thread_limit
+
+    @prepare_thread_limit.setter
+    def prepare_thread_limit(self, value):
+        self._prepare_thread_limit = value
@@ -20,7 +20,7 @@
 
 import logging
 from datahub import DatahubProtocolType
-from datahub.models import CompressFormat
+from datahub.models import CompressFormat, IntegrityMode
 
 
 class Constant:
@@ -39,15 +39,20 @@ class Constant:
     DEFAULT_SESSION_TIMEOUT = 6000
     DEFAULT_MAX_RECORD_BUFFER_SIZE = 100
     DEFAULT_FETCH_LIMIT = 1000
+    DEFAULT_INTEGRITY_MODE = IntegrityMode.FULL
+    DEFAULT_INTEGRITY_SAMPLE_RATE = 0.1
 
     MIN_ASYNC_THREAD_LIMIT = 2                       # MessageReader/MessageWriter 线程池数量
     MAX_ASYNC_THREAD_LIMIT = 100
+    EXTRA_POOL_CONNECTIONS = 4                      # 心跳/点位提交/元数据更新等后台线程使用的连接数
 
     # ProducerConfig
     MAX_ASYNC_BUFFER_TIMEOUT_S = 1
     MAX_ASYNC_BUFFER_SIZE = 4000000
     MAX_ASYNC_BUFFER_RECORD_COUNT = 10000
     MAX_RECORD_PACK_QUEUE_LIMIT = 1024
+    MAX_SHARD_WRITE_TASK_NUM = 2                # 一个RecordPack发送时, 下一个RecordPack并行序列化和压缩
+    DEFAULT_PREPARE_THREAD_LIMIT = 2            # MessageWriter 序列化和压缩线程池数量
 
 
     # MetaData
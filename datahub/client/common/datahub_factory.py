@@ -20,17 +20,26 @@
 
 import threading
 from datahub import DataHub
+from .constant import Constant
 
 
 class DatahubFactory:
 
-    _datahub_client_pool = dict()        # "endpoint:id:key:protocol:compress" --> client
+    _datahub_client_pool = dict()        # "endpoint:id:key:protocol:compress:integrity:pool:ip" --> client
     _datahub_lock = threading.Lock()
 
     @staticmethod
     def create_datahub_client(datahub_config):
-        key = "{}:{}:{}:{}:{}".format(datahub_config.endpoint, datahub_config.access_id, datahub_config.access_key,
-                                      datahub_config.protocol_type.value, datahub_config.compress_format.value)
+        # only consumer config has integrity mode, producer client always use the default
+        integrity_mode = getattr(datahub_config, "integrity_mode", Constant.DEFAULT_INTEGRITY_MODE)
+        integrity_sample_rate = getattr(datahub_config, "integrity_sample_rate", Constant.DEFAULT_INTEGRITY_SAMPLE_RATE)
+        # every thread of the reader/writer pool and the background threads keeps a connection to reuse
+        pool_maxsize = getattr(datahub_config, "async_thread_limit", Constant.DEFAULT_ASYNC_THREAD_LIMIT) \
+            + Constant.EXTRA_POOL_CONNECTIONS
+        key = "{}:{}:{}:{}:{}:{}:{}:{}:{}".format(datahub_config.endpoint, datahub_config.access_id,
+                                                  datahub_config.access_key, datahub_config.protocol_type.value,
+                                                  datahub_config.compress_format.value, integrity_mode.value,
+                                                  integrity_sample_rate, pool_maxsize, datahub_config.host_ip)
         if key not in DatahubFactory._datahub_client_pool:
             with DatahubFactory._datahub_lock:
                 if key not in DatahubFactory._datahub_client_pool:
@@ -41,6 +50,27 @@ class DatahubFactory:
                         protocol_type=datahub_config.protocol_type,
                         compress_format=datahub_config.compress_format,
                         credential=datahub_config.credential,
+                        integrity_mode=integrity_mode,
+                        integrity_sample_rate=integrity_sample_rate,
+                        pool_maxsize=pool_maxsize,
+                        host_ip=datahub_config.host_ip,
                         use_client=True
                     )
         return DatahubFactory._datahub_client_pool.get(key)
+
+    @staticmethod
+    def create_async_datahub_client(datahub_config):
+        # the async client holds connections of the running event loop, so it is not shared
+        from datahub.async_core import AsyncDataHub
+        return AsyncDataHub(
+            access_id=datahub_config.access_id,
+            access_key=datahub_config.access_key,
+            endpoint=datahub_config.endpoint,
+            protocol_type=datahub_config.protocol_type,
+            compress_format=datahub_config.compress_format,
+            credential=datahub_config.credential,
+            integrity_mode=getattr(datahub_config, "integrity_mode", Constant.DEFAULT_INTEGRITY_MODE),
+            integrity_sample_rate=getattr(datahub_config, "integrity_sample_rate", Constant.DEFAULT_INTEGRITY_SAMPLE_RATE),
+            host_ip=datahub_config.host_ip,
+            use_client=True
+        )
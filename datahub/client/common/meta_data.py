@@ -56,7 +56,8 @@ class MetaData:
         if sub_id:
             self._message_reader, self._message_writer = MessageReader(self, queue_limit, thread_num), None
         else:
-            self._message_reader, self._message_writer = None, MessageWriter(self, queue_limit, thread_num)
+            prepare_thread_num = max(min(getattr(common_config, "prepare_thread_limit", Constant.DEFAULT_PREPARE_THREAD_LIMIT), thread_num), 1)
+            self._message_reader, self._message_writer = None, MessageWriter(self, queue_limit, thread_num, prepare_thread_num)
 
     def close(self):
         if self._message_writer:
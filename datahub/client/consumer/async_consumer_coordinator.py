@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+import asyncio
+from datahub.exceptions import SubscriptionOfflineException, DatahubException, TimeoutException
+from .sync_group_meta import SyncGroupMeta
+from .async_consumer_heartbeat import AsyncConsumerHeartbeat
+from .async_offset_coordinator import AsyncOffsetCoordinator
+from ..common.timer import Timer
+from ..common.constant import Constant
+
+
+class AsyncConsumerCoordinator(AsyncOffsetCoordinator):
+
+    def __init__(self, project_name, topic_name, sub_id, consumer_config):
+        super(AsyncConsumerCoordinator, self).__init__(project_name, topic_name, sub_id, consumer_config)
+        self._group_lock = asyncio.Lock()
+        self._consumer_id = None
+        self._version_id = None
+        self._heart_beat = None
+        self._session_timeout = consumer_config.session_timeout
+        self._sync_group_meta = SyncGroupMeta()
+
+    async def start(self):
+        await super(AsyncConsumerCoordinator, self).start()
+        await self.__join_group_and_start_heartbeat()
+
+    async def close(self):
+        await self._offset_manager.close()
+        async with self._group_lock:
+            await self.__leave_group_and_stop_heartbeat()
+        await super(AsyncConsumerCoordinator, self).close()
+        self._logger.info("AsyncConsumerCoordinator close success. key: {}".format(self._uniq_key))
+
+    async def on_shard_change(self, add_shards, del_shards):
+        await self._do_shard_change(add_shards, del_shards)
+        await self._offset_manager.on_shard_release(del_shards)
+        self._sync_group_meta.on_shard_release(del_shards)
+
+    async def on_shard_read_end(self, shard_ids):
+        await super(AsyncConsumerCoordinator, self).on_shard_read_end(shard_ids)
+        self._sync_group_meta.on_shard_read_end(shard_ids)
+
+    async def on_offset_reset(self):
+        if not self._offset_resetting:
+            self._offset_resetting = True
+            try:
+                await self._do_remove_all_shards()
+                self._offset_manager.on_offset_reset()
+            finally:
+                self._offset_resetting = False
+
+    def waiting_shard_assign(self):
+        if self._closed:
+            self._logger.warning("AsyncConsumerCoordinator closed. key: {}".format(self._uniq_key))
+            raise DatahubException("AsyncConsumerCoordinator closed")
+
+        return self._heart_beat is None or self._heart_beat.waiting_shard_assign()
+
+    async def update_shard_info(self):
+        await super(AsyncConsumerCoordinator, self).update_shard_info()
+        async with self._group_lock:
+            if self._heart_beat is None or self._heart_beat.need_rejoin():
+                await self.__leave_group_and_stop_heartbeat()
+                await self.__join_group_and_start_heartbeat()
+            await self.__sync_group()
+
+    async def __join_group_and_start_heartbeat(self):
+        await self.__join_group()
+        self.__start_heartbeat()
+        self._logger.info("Join group and start heartbeat success. key: {}".format(self._uniq_key))
+
+    async def __leave_group_and_stop_heartbeat(self):
+        await self.__stop_heartbeat()
+        await self.__leave_group()
+        self._logger.info("Leave group and stop heartbeat success. key: {}".format(self._uniq_key))
+
+    async def __sync_group(self):
+        if self._sync_group_meta.need_sync_group():
+            release = list(self._sync_group_meta.release_shards)
+            read_end = list(self._sync_group_meta.read_end_shards)
+            try:
+                await self._datahub_client.sync_group(
+                    self._project_name,
+                    self._topic_name,
+                    self._sub_id,
+                    self._consumer_id,
+                    self._version_id,
+                    release,
+                    read_end
+                )
+                self._sync_group_meta.clear_shard_release()
+                self._logger.debug("SyncGroup success. key: {}, release: {}, read end: {}"
+                                   .format(self._uniq_key, release, read_end))
+            except DatahubException as e:
+                self._logger.warning("SyncGroup fail. key: {}, release: {}, read end: {}. {}"
+                                     .format(self._uniq_key, release, read_end, e))
+                raise e
+
+    async def __join_group(self):
+        timer = Timer(Constant.MAX_JOIN_GROUP_TIMEOUT)
+        while not timer.is_expired():
+            try:
+                join_result = await self._datahub_client.join_group(
+                    self._project_name,
+                    self._topic_name,
+                    self._sub_id,
+                    self._session_timeout
+                )
+                self._consumer_id = join_result.consumer_id
+                self._version_id = join_result.version_id
+                self._session_timeout = join_result.session_timeout
+                self._gen_uniq_key(self._consumer_id)
+                self._logger.info("JoinGroup success. key: {}, consumer id: {}, version id: {}, session timeout: {}"
+                                  .format(self._uniq_key, self._consumer_id, self._version_id, self._session_timeout))
+                return
+            except SubscriptionOfflineException as e:
+                self._logger.warning("JoinGroup fail, subscription offline. key:{}. {}".format(self._uniq_key, e))
+                raise e
+            except DatahubException as e:
+                self._logger.warning("JoinGroup fail. retry again. key:{}. {}".format(self._uniq_key, e))
+
+            await asyncio.sleep(min(1, max(timer.deadline_time - Timer.get_curr_time(), 0)))
+
+        raise TimeoutException("JoinGroup timeout. key: {}, elapsedMs: {}".format(self._uniq_key, timer.elapse()))
+
+    async def __leave_group(self):
+        try:
+            await self._datahub_client.leave_group(
+                self._project_name,
+                self._topic_name,
+                self._sub_id,
+                self._consumer_id,
+                self._version_id
+            )
+            self._logger.info("LeaveGroup success. key:{}".format(self._uniq_key))
+        except DatahubException as e:
+            self._logger.warning("LeaveGroup fail. key:{}. {}".format(self._uniq_key, e))
+
+    def __start_heartbeat(self):
+        if not self._heart_beat:
+            self._heart_beat = AsyncConsumerHeartbeat(self, self._sync_group_meta, self._consumer_id, self._version_id,
+                                                      self._session_timeout / 1000)
+            self._logger.info("Start heartbeat success. key:{}".format(self._uniq_key))
+
+    async def __stop_heartbeat(self):
+        if self._heart_beat:
+            await self._heart_beat.close()
+            self._heart_beat = None
+            self._logger.info("Stop heartbeat success. key:{}".format(self._uniq_key))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+import logging
+from .async_offset_coordinator import AsyncOffsetCoordinator
+from .async_consumer_coordinator import AsyncConsumerCoordinator
+from .async_shard_group_reader import AsyncShardGroupReader
+from ..common.config import Utils
+
+
+class AsyncDatahubConsumer:
+    """
+    Asyncio consumer client for datahub, the counterpart of :class:`datahub.client.DatahubConsumer`.
+    Records are fetched by :class:`datahub.AsyncDataHub`, heartbeat and offset commit run as tasks of the event loop.
+    The consumer must be started in the event loop by ``start`` or ``async with``.
+
+    Members:
+        project_name (:class:`string`): project name
+
+        topic_name (:class:`string`): topic name
+
+        sub_id (:class:`string`): subscription id for consume
+
+        consumer_config (:class:`datahub.client.common.ConsumerConfig`): config for consumer client
+
+        shard_ids (:class:`list`): list of `string`: shard list you want to consume.
+                default is None, means allocated automatically by datahub server
+
+        timestamp (:class:`int`): set the start timestamp for consume.
+                default is -1, means start with the subscription offset
+
+    :Example:
+
+    >>> async with AsyncDatahubConsumer(project_name, topic_name, sub_id, consumer_config) as consumer:
+    >>>     async for record in consumer:
+    >>>         print(record.values)
+    """
+
+    def __init__(self, project_name, topic_name, sub_id, consumer_config, shard_ids=None, timestamp=-1):
+        logging.basicConfig(filename=consumer_config.logging_filename, filemode="a",
+                            level=consumer_config.logging_level, format=Utils.FORMAT, datefmt=Utils.DATE_FMT)
+
+        self._closed = False
+        self._timestamp = timestamp
+        if shard_ids:
+            # 指定shard消费
+            self._coordinator = AsyncOffsetCoordinator(project_name, topic_name, sub_id, consumer_config)
+        else:
+            # 协同消费
+            self._coordinator = AsyncConsumerCoordinator(project_name, topic_name, sub_id, consumer_config)
+        self._group_reader = AsyncShardGroupReader(self._coordinator, shard_ids)
+
+    async def start(self):
+        try:
+            await self._coordinator.start()
+            await self._group_reader.start(self._timestamp)
+        except Exception as e:
+            await self._coordinator.close()
+            raise e
+
+    async def close(self):
+        self._closed = True
+        await self._group_reader.close()
+        await self._coordinator.close()
+
+    async def read(self, shard_id=None, timeout=60):
+        return await self._group_reader.read(shard_id, timeout)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._closed:
+            record = await self.read()
+            if record:
+                return record
+        raise StopAsyncIteration
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+import time
+import asyncio
+import logging
+from collections import deque
+from datahub.models import OffsetWithBatchIndex
+from datahub.exceptions import SubscriptionOfflineException, ResourceNotFoundException, \
+    OffsetResetException, InvalidOperationException, DatahubException
+from ..common.timer import Timer
+from ..common.constant import Constant
+from .offset_manager import OffsetRequest
+
+
+class AsyncOffsetManager:
+    """
+    Offset manager of async consumer, the offsets are committed by a task of the event loop
+    """
+
+    def __init__(self, coordinator):
+        self._closed = False
+        self._logger = logging.getLogger(AsyncOffsetManager.__name__)
+
+        self._coordinator = coordinator
+        self._uniq_key = self._coordinator.uniq_key
+        self._timer = Timer(Constant.OFFSET_COMMIT_INTERVAL_TIMEOUT)
+
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._commit_task = None
+        self._offset_meta_map = dict()
+        self._offset_request_queue_map = dict()
+        self._last_offset_map = dict()
+
+    def start(self):
+        self._commit_task = asyncio.ensure_future(self.__commit_offset_task())
+
+    async def close(self):
+        self._closed = True
+        self._wakeup.set()
+        if self._commit_task is not None:
+            await self._commit_task
+            self._commit_task = None
+
+    def set_offset_meta(self, consume_offset_map):
+        for shard_id, consume_offset in consume_offset_map.items():
+            self._offset_meta_map[shard_id] = consume_offset
+            self._offset_request_queue_map[shard_id] = deque()
+
+    async def on_shard_release(self, del_shards):
+        await self.__force_commit_offset(del_shards)
+        for shard_id in del_shards:
+            if shard_id in self._offset_meta_map:
+                self._offset_meta_map.pop(shard_id)
+            if shard_id in self._offset_request_queue_map:
+                self._offset_request_queue_map.pop(shard_id)
+
+    def on_offset_reset(self):
+        self._last_offset_map.clear()
+        self._offset_request_queue_map.clear()
+        self._offset_meta_map.clear()
+
+    def send_record_offset(self, message_key):
+        queue = self._offset_request_queue_map.get(message_key.shard_id)
+        if queue is None:
+            self._logger.warning("Send record offset error. shard_id: {}, key: {}".format(message_key.shard_id, self._uniq_key))
+            raise DatahubException("Send record offset error")
+        queue.append(OffsetRequest(message_key))
+        self._logger.debug("Send record offset success. shard_id: {}, key: {}, offset: {}"
+                           .format(message_key.shard_id, self._uniq_key, message_key.offset.to_string()))
+
+    def is_request_queue_empty(self, shard_ids):
+        for shard_id in shard_ids:
+            requests = self._offset_request_queue_map.get(shard_id)
+            if requests and len(requests) > 0:
+                return False
+        return True
+
+    async def __commit_offset_task(self):
+        self._logger.info("Offset commit task start. key: {}".format(self._uniq_key))
+        while not self._closed:
+            if self._timer.is_expired():
+                try:
+                    await self.__commit_once()
+                except OffsetResetException as e:
+                    self._logger.warning("CommitOffset fail, subscription offset reset. key:{}. last offset map: {}. {}".format(
+                        self._uniq_key, self._last_offset_map, e))
+                except InvalidOperationException as e:
+                    self._logger.warning("CommitOffset fail, subscription session invalid. key:{}. {}".format(self._uniq_key, e))
+                    self._coordinator.on_sub_session_changed()
+                except SubscriptionOfflineException as e:
+                    self._logger.warning("CommitOffset fail, subscription offline. key:{}. {}".format(self._uniq_key, e))
+                    self._coordinator.on_sub_offline()
+                except ResourceNotFoundException as e:
+                    if "NoSuchSubscription" in e.error_code:
+                        self._logger.warning("CommitOffset fail, subscription deleted. key:{}. {}".format(self._uniq_key, e))
+                        self._coordinator.on_sub_deleted()
+                    else:
+                        self._logger.warning("CommitOffset fail. key:{}. NoSuchSubscription: {}".format(self._uniq_key, e))
+                except Exception as e:
+                    self._logger.warning("CommitOffset fail. key:{}. {}".format(self._uniq_key, e))
+                self._timer.reset()
+            else:
+                await self.__wait(min(Constant.OFFSET_CHECK_TIMEOUT, self._timer.deadline_time - Timer.get_curr_time()))
+        try:
+            await self.__commit_once()
+        except Exception as e:
+            self._logger.warning("CommitOffset fail when close. key:{}. {}".format(self._uniq_key, e))
+        self._logger.info("Offset commit task stop. key: {}".format(self._uniq_key))
+
+    async def __wait(self, timeout):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def __commit_once(self):
+        async with self._lock:
+            self.__sync_offsets()
+            await self.__commit_offsets()
+
+    async def __force_commit_offset(self, shard_ids):
+        try:
+            timer = Timer(Constant.FORCE_COMMIT_TIMEOUT)
+            await self.__commit_once()
+            while not timer.is_expired() and not self.is_request_queue_empty(shard_ids):
+                await asyncio.sleep(min(Constant.OFFSET_CHECK_TIMEOUT, max(timer.deadline_time - Timer.get_curr_time(), 0)))
+                await self.__commit_once()
+        except Exception as e:
+            self._logger.warning("Force commit offset fail. key:{}, shard_ids: {}, {}".format(self._uniq_key, shard_ids, e))
+
+    def __sync_offsets(self):
+        for shard_id, request_queue in self._offset_request_queue_map.items():
+            request = None
+            while len(request_queue) > 0 and request_queue[0].is_ready():
+                request = request_queue.popleft()
+
+            if request:
+                meta = self._offset_meta_map.get(shard_id)
+                if not meta:
+                    self._logger.warning("OffsetMeta not found. key:{}, shard_id:{}".format(self._uniq_key, shard_id))
+                    raise DatahubException("OffsetMeta not found")
+                consume_offset = request.message_key.offset
+                self._last_offset_map[shard_id] = OffsetWithBatchIndex(
+                    consume_offset.sequence,
+                    consume_offset.timestamp,
+                    meta.version_id,
+                    meta.session_id,
+                    consume_offset.batch_index
+                )
+                self._logger.debug("Sync offset once success. key: {}, shard_id: {}".format(self._uniq_key, shard_id))
+            elif len(request_queue) > 0:
+                curr_timeout = int(time.time())
+                diff = curr_timeout - request_queue[0].timestamp
+                if diff > Constant.NOT_ACK_WARNING_TIMEOUT:
+                    self._logger.warning("Record not ack for {} s. key:{}, shard_id:{}, currTs:{}, offset:{}"
+                                         .format(diff, self._uniq_key, shard_id, curr_timeout, request_queue[0].message_key.to_string()))
+                    if diff > Constant.NOT_ACK_WARNING_TIMEOUT * 10:
+                        self._coordinator.on_offset_not_ack()
+
+    async def __commit_offsets(self):
+        if len(self._last_offset_map) > 0:
+            offsets = dict(self._last_offset_map)
+            try:
+                await self._coordinator.datahub_client.update_subscription_offset(
+                    self._coordinator.project_name,
+                    self._coordinator.topic_name,
+                    self._coordinator.sub_id,
+                    offsets
+                )
+            except Exception as e:
+                self._logger.warning("Commit offset fail. key: {}, min offset = {}, {}".format(self._uniq_key, self.__get_min_timestamp(offsets), e))
+                raise e
+            self._logger.info("Commit offset success. key: {}, min offset = {}".format(self._uniq_key, self.__get_min_timestamp(offsets)))
+            for shard_id, offset in offsets.items():
+                if self._last_offset_map.get(shard_id) is offset:
+                    self._last_offset_map.pop(shard_id)
+
+    @staticmethod
+    def __get_min_timestamp(offsets):
+        return min(offsets.values(), key=lambda offset: offset.timestamp)
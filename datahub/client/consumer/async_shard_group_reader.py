@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+import asyncio
+import logging
+from datahub.exceptions import *
+from .async_shard_reader import AsyncShardReader
+from .offset_select_strategy import OffsetSelectStrategy
+from ..common.timer import Timer
+from ..common.constant import Constant
+
+
+class AsyncShardGroupReader:
+
+    def __init__(self, coordinator, shard_ids):
+        self._closed = False
+        self._logger = logging.getLogger(AsyncShardGroupReader.__name__)
+
+        self._coordinator = coordinator
+        self._coordinator.assign_shard_list = shard_ids if shard_ids else []
+        self._shard_reader_map = dict()
+        self._select_strategy = OffsetSelectStrategy()
+
+        self._lock = asyncio.Lock()
+        self._coordinator.register_shard_change(self.on_shard_change)
+        self._coordinator.register_remove_all_shards(self.on_remove_all_shards)
+
+    async def start(self, timestamp):
+        await self.__create_shard_reader(self._coordinator.assign_shard_list, timestamp)
+
+    async def close(self):
+        self._closed = True
+        async with self._lock:
+            for reader in self._shard_reader_map.values():
+                reader.close()
+            self._shard_reader_map.clear()
+        self._logger.info("AsyncShardGroupReader close success. key: {}".format(self._coordinator.uniq_key))
+
+    async def on_shard_change(self, add_shards, del_shards):
+        await self.__create_shard_reader(add_shards, -1)
+        await self.__remover_shard_reader(del_shards)
+
+    async def on_remove_all_shards(self):
+        await self.__remove_all_shard_reader()
+
+    async def read(self, shard_id, time_out):
+        if self._closed:
+            self._logger.warning("AsyncShardGroupReader closed when read. key: {}".format(self._coordinator.uniq_key))
+            raise DatahubException("AsyncShardGroupReader closed when read")
+
+        record = None
+        timer = Timer(time_out)
+        while not self._closed and record is None and not timer.is_expired():
+            if self._coordinator.waiting_shard_assign():
+                await self.__wait(timer)
+            else:
+                await self._coordinator.update_shard_info()
+
+                reader = self.__get_next_reader(shard_id)
+                if reader is None:
+                    await self.__wait(timer)
+                else:
+                    record = await self.__read_by_reader(reader, min(1, timer.deadline_time - Timer.get_curr_time()))
+        return record
+
+    async def __wait(self, timer):
+        await asyncio.sleep(max(min(Constant.DELAY_TIMEOUT_FOR_NOT_READY, timer.deadline_time - Timer.get_curr_time()), 0))
+
+    async def __read_by_reader(self, reader, timeout):
+        record = None
+        try:
+            record = await reader.read(timeout)
+            self._select_strategy.after_read(reader.shard_id, record)
+            if record:
+                self._coordinator.send_record_offset(record.record_key)
+                if self._coordinator.auto_ack_offset:
+                    record.record_key.ack()
+        except ShardSealedException as e:  # error_code: 'InvalidShardOperation'
+            self._logger.warning("Read fail. Shard read end. shard_id: {}, key: {}, {}"
+                                 .format(reader.shard_id, self._coordinator.uniq_key, e))
+            await self._coordinator.on_shard_read_end([reader.shard_id])
+        except InvalidCursorException as e:  # error_code: 'InvalidCursor'
+            self._logger.warning("Read fail. Invalid cursor. shard_id: {}, key: {}, {}"
+                                 .format(reader.shard_id, self._coordinator.uniq_key, e))
+            reader.reset_offset()
+        except DatahubException as e:
+            self._logger.warning("Read fail. shard_id: {}, key: {}. DatahubException: {}"
+                                 .format(reader.shard_id, self._coordinator.uniq_key, e))
+            raise e
+        except Exception as e:
+            self._logger.warning("Read fail. shard_id: {}, key: {}. Exception: {}"
+                                 .format(reader.shard_id, self._coordinator.uniq_key, e))
+            raise e
+        return record
+
+    async def __create_shard_reader(self, shard_ids, timestamp=-1):
+        if shard_ids is None or len(shard_ids) == 0:
+            return
+        async with self._lock:
+            try:
+                shard_ids = [shard_id for shard_id in shard_ids if shard_id not in self._shard_reader_map]
+                if len(shard_ids) == 0:
+                    return
+                if any(shard_id not in self._coordinator.shard_meta_map for shard_id in shard_ids):
+                    # the shards may be split or merged after the shard meta updated
+                    await self._coordinator.update_shard_meta(True)
+                shard_meta_map = self._coordinator.shard_meta_map
+                for shard_id in shard_ids:
+                    if shard_meta_map.get(shard_id) is None:
+                        raise InvalidParameterException("Shard not found. key: {}, shard_id: {}".format(self._coordinator.uniq_key, shard_id))
+
+                shards_offset_map = await self.__gen_shards_offset(shard_ids, timestamp)
+                for shard_id in shard_ids:
+                    consume_offset = shards_offset_map.get(shard_id)
+                    reader = AsyncShardReader(self._coordinator, shard_id, consume_offset, self._coordinator.fetch_limit)
+                    self._shard_reader_map[shard_id] = reader
+                    self._select_strategy.add_shard(shard_id)
+                    self._logger.info("AsyncShardReader created. key: {}, shard_id: {}, sequence: {}".format(self._coordinator.uniq_key, shard_id, consume_offset.sequence))
+            except DatahubException as e:
+                self._logger.warning("AsyncShardReader create fail. key: {}, shard_ids: {}, DatahubException: {}".format(self._coordinator.uniq_key, shard_ids, e))
+                raise e
+            except Exception as e:
+                self._logger.warning("AsyncShardReader create fail. key: {}, shard_ids: {}, {}".format(self._coordinator.uniq_key, shard_ids, e))
+                raise e
+
+    async def __remover_shard_reader(self, shard_ids):
+        if shard_ids is None or len(shard_ids) == 0:
+            return
+        async with self._lock:
+            for shard_id in shard_ids:
+                if shard_id in self._shard_reader_map:
+                    self._shard_reader_map.pop(shard_id).close()
+                self._select_strategy.remove_shard(shard_id)
+                self._logger.info("AsyncShardReader removed. key: {}, shard_id: {}".format(self._coordinator.uniq_key, shard_id))
+
+    async def __remove_all_shard_reader(self):
+        async with self._lock:
+            for shard_id in set(self._shard_reader_map.keys()):
+                self._shard_reader_map.pop(shard_id).close()
+                self._select_strategy.remove_shard(shard_id)
+                self._logger.info("AsyncShardReader removed when remove all. key: {}, shard_id: {}".format(self._coordinator.uniq_key, shard_id))
+
+    async def __gen_shards_offset(self, shard_ids, timestamp=-1):
+        offset_map = await self._coordinator.init_and_get_offset(shard_ids)
+        if timestamp != -1:
+            for shard_id in offset_map:
+                offset_map[shard_id].reset_timestamp(timestamp)
+        return offset_map
+
+    def __get_next_reader(self, shard_id):
+        if shard_id:
+            reader = self._shard_reader_map.get(shard_id)
+            if not reader:
+                raise DatahubException("AsyncShardReader not found. key: {}, shard_id: {}".format(self._coordinator.uniq_key, shard_id))
+            return reader
+        next_shard = self._select_strategy.get_next_shard()
+        if next_shard:
+            return self.__get_next_reader(next_shard)
+        if len(self._shard_reader_map) == 0:
+            self._logger.warning("No AsyncShardReader found. May the consumer group in rebalance state. key: {}".format(self._coordinator.uniq_key))
+            return None
+        return next(iter(self._shard_reader_map.values()))
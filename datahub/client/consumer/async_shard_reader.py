@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+import asyncio
+import logging
+from collections import deque
+
+from datahub.exceptions import InvalidParameterException, DatahubException, SeekOutOfRangeException
+from datahub.models import RecordType, CursorType
+from ..common.constant import Constant
+from ..common.offset_meta import ConsumeOffset
+from ..common.timer import Timer
+from .message_key import MessageKey
+
+
+class AsyncShardReader:
+    """
+    Reader of one shard for async consumer. The next batch is fetched while the records of current batch are read.
+    """
+
+    def __init__(self, coordinator, shard_id, offset, fetch_num):
+        self._closed = False
+        self._logger = logging.getLogger(AsyncShardReader.__name__)
+
+        self._coordinator = coordinator
+        self._uniq_key = "{}:{}:{}".format(coordinator.project_name, coordinator.topic_name, coordinator.sub_id)
+        self._shard_id = shard_id
+        self._read_offset = offset
+        self._fetch_num = fetch_num
+        self._has_read_count = 0
+
+        self._cache_records = deque()
+        self._fetch_task = None
+        self._delay_timer = Timer(Constant.DELAY_TIMEOUT_FOR_READ_END)
+        self._delay_timer.reset_deadline()
+
+    def close(self):
+        self._closed = True
+        if self._fetch_task is not None:
+            self._fetch_task.cancel()
+            self._fetch_task = None
+        self._logger.info("AsyncShardReader closed. key: {}, shard_id: {}, read count: {}".format(self._uniq_key, self._shard_id, self._has_read_count))
+
+    async def read(self, timeout):
+        if self._closed:
+            self._logger.warning("AsyncShardReader closed when read. key: {}, shard_id: {}".format(self._uniq_key, self._shard_id))
+            raise DatahubException("AsyncShardReader closed when read")
+
+        record = await self.__read_next(timeout)
+        if record:
+            offset = ConsumeOffset(record.sequence, record.system_time, record.batch_index)
+            offset.next_cursor = self._read_offset.next_cursor
+            record.record_key = MessageKey(self._shard_id, offset)
+            self._has_read_count += 1
+        return record
+
+    def reset_offset(self):
+        if self._fetch_task is not None:
+            self._fetch_task.cancel()
+            self._fetch_task = None
+        self._cache_records.clear()
+        self._read_offset.reset_timestamp(-1)
+
+    @property
+    def shard_id(self):
+        return self._shard_id
+
+    async def __read_next(self, timeout):
+        if not self._cache_records:
+            if self._fetch_task is None:
+                # no data at the end of shard, wait before fetching again
+                if not self._delay_timer.is_expired():
+                    await asyncio.sleep(min(timeout, self._delay_timer.deadline_time - Timer.get_curr_time()))
+                    if self._closed or not self._delay_timer.is_expired():
+                        return None
+                self.__send_next_fetch()
+            fetch_task = self._fetch_task
+            done, _ = await asyncio.wait({fetch_task}, timeout=max(timeout, Constant.MIN_TIMEOUT_WAIT_FETCH))
+            if self._closed or fetch_task is not self._fetch_task or not done:
+                return None
+            self._fetch_task = None
+            try:
+                record_result = fetch_task.result()
+            except Exception as e:
+                self._read_offset.next_cursor = None
+                self._logger.warning("Fetch records fail. shard_id: {}, key: {}, exception: {}".format(self._shard_id, self._uniq_key, e))
+                raise e
+
+            self._read_offset.next_cursor = record_result.next_cursor
+            if record_result.record_count > 0:
+                self._cache_records.extend(record_result.records)
+                self.__send_next_fetch()
+                self._logger.debug("Push to cache with records. shard_id: {}, key: {}, record count: {}"
+                                   .format(self._shard_id, self._uniq_key, record_result.record_count))
+            else:
+                self._delay_timer.reset()
+                return None
+        return self._cache_records.popleft()
+
+    def __send_next_fetch(self):
+        self._fetch_task = asyncio.ensure_future(self.__fetch_records())
+
+    async def __fetch_records(self):
+        cursor = await self.__get_cursor()
+        if not cursor:
+            raise InvalidParameterException("Get cursor is None. shard_id: {}, offset: {}".format(self._shard_id, self._read_offset.to_string()))
+        return await self.__get_records(cursor)
+
+    async def __get_cursor(self):
+        offset = self._read_offset
+        if offset.next_cursor:
+            return offset.next_cursor
+
+        cursor_type, parm = CursorType.OLDEST, -1
+        cursor = None
+        if offset.sequence != -1:
+            cursor_type, parm = CursorType.SEQUENCE, offset.sequence
+            cursor = await self.__get_cursor_once(cursor_type, parm)
+        if not cursor and offset.timestamp != -1:
+            cursor_type, parm = CursorType.SYSTEM_TIME, offset.timestamp
+            cursor = await self.__get_cursor_once(cursor_type, parm)
+        if not cursor:
+            cursor_type, parm = CursorType.OLDEST, -1
+            cursor = await self.__get_cursor_once(cursor_type, parm)
+
+        if not cursor:
+            self._logger.warning("Init cursor failed. key: {}, shard_id: {}, cursor type: {}, parm: {}"
+                                 .format(self._uniq_key, self._shard_id, cursor_type, parm))
+            raise DatahubException("Get cursor fail. key: {}, shard_id: {}".format(self._uniq_key, self._shard_id))
+
+        self._logger.info("Init cursor success. key: {}, shard_id: {}, cursor type: {}, parm: {}, cursor: {}"
+                          .format(self._uniq_key, self._shard_id, cursor_type, parm, cursor))
+        return cursor
+
+    async def __get_cursor_once(self, cursor_type, value):
+        try:
+            cursor_result = await self._coordinator.datahub_client.get_cursor(
+                self._coordinator.project_name, self._coordinator.topic_name, self._shard_id, cursor_type, value)
+            return cursor_result.cursor
+        except SeekOutOfRangeException as e:
+            self._logger.warning("Get cursor fail. key: {}, shard_id: {}, cursor type: {}, value: {}, {}"
+                                 .format(self._uniq_key, self._shard_id, cursor_type, value, e))
+            return None
+
+    async def __get_records(self, cursor):
+        topic_meta = self._coordinator.topic_meta
+        datahub_client = self._coordinator.datahub_client
+
+        if topic_meta.record_type == RecordType.TUPLE:
+            return await datahub_client.get_tuple_records(topic_meta.project_name, topic_meta.topic_name, self._shard_id,
+                                                          topic_meta.record_schema, cursor, self._fetch_num)
+        elif topic_meta.record_type == RecordType.BLOB:
+            return await datahub_client.get_blob_records(topic_meta.project_name, topic_meta.topic_name, self._shard_id,
+                                                         cursor, self._fetch_num)
+        else:
+            self._logger.warning("Invalid record type, should be TUPLE or BLOB!")
+            raise InvalidParameterException("Invalid record type")
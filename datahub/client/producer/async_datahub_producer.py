@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+import logging
+from .async_shard_group_writer import AsyncShardGroupWriter
+from ..common.config import Utils
+from ..common.async_shard_coordinator import AsyncShardCoordinator
+
+
+class AsyncDatahubProducer:
+    """
+    Asyncio producer client for datahub, the counterpart of :class:`datahub.client.DatahubProducer`.
+    Records are sent by :class:`datahub.AsyncDataHub`, ``write_async`` returns an awaitable of
+    :class:`datahub.client.producer.write_result.WriteResult`. The producer must be started in the event loop
+    by ``start`` or ``async with``, the buffered records not flushed are failed when closed.
+
+    Members:
+        project_name (:class:`string`): project name
+
+        topic_name (:class:`string`): topic name
+
+        producer_config (:class:`datahub.client.common.ProducerConfig`): config for producer client
+
+        shard_ids (:class:`list`): list of `string`: shard list you want to producer.
+                default is None, means write to all shards evenly
+
+    :Example:
+
+    >>> async with AsyncDatahubProducer(project_name, topic_name, producer_config) as producer:
+    >>>     future = await producer.write_async(records)
+    >>>     await producer.flush()
+    >>>     result = await future
+    """
+
+    def __init__(self, project_name, topic_name, producer_config, shard_ids=None):
+        logging.basicConfig(filename=producer_config.logging_filename, filemode="a",
+                            level=producer_config.logging_level, format=Utils.FORMAT, datefmt=Utils.DATE_FMT)
+
+        self._coordinator = AsyncShardCoordinator(project_name, topic_name, "", producer_config)
+        self._group_writer = AsyncShardGroupWriter(self._coordinator, shard_ids, producer_config)
+
+    async def start(self):
+        try:
+            await self._coordinator.start()
+            await self._group_writer.start()
+        except Exception as e:
+            await self._group_writer.close()
+            await self._coordinator.close()
+            raise e
+
+    async def close(self):
+        await self._group_writer.close()
+        await self._coordinator.close()
+
+    async def write(self, records):
+        return await self._group_writer.write(records)
+
+    async def write_async(self, records):
+        return await self._group_writer.write_async(records)
+
+    async def flush(self):
+        await self._group_writer.flush()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def topic_meta(self):
+        return self._coordinator.topic_meta
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from datahub.exceptions import DatahubException
+from .record_pack import RecordPack
+from .write_result import WriteResult
+
+
+class AsyncShardWriter:
+    """
+    Writer of one shard for async producer, the record packs are sent in order by a task of the event loop
+    """
+
+    def __init__(self, coordinator, producer_config, shard_id):
+        self._closed = False
+        self._logger = logging.getLogger(AsyncShardWriter.__name__)
+
+        self._coordinator = coordinator
+        self._uniq_key = "{}:{}:{}".format(coordinator.project_name, coordinator.topic_name, coordinator.sub_id)
+        self._shard_id = shard_id
+        self._max_retry_times = producer_config.retry_times
+        self._has_write_count = 0
+
+        self._max_buffer_size = producer_config.max_async_buffer_size
+        self._max_buffer_record_count = producer_config.max_async_buffer_records
+        self._max_buffer_time = producer_config.max_async_buffer_time
+        self._max_record_pack_queue_limit = producer_config.max_record_pack_queue_limit
+
+        self._condition = asyncio.Condition()
+        self._current_record_pack = None
+        self._ready_record_packs = deque()
+        self._sending_pack = None
+        self._send_task = asyncio.ensure_future(self.__send_record_packs())
+
+    async def close(self):
+        self._closed = True
+        sending_pack = self._sending_pack
+        self._send_task.cancel()
+        try:
+            await self._send_task
+        except asyncio.CancelledError:
+            pass
+
+        # the records not sent are failed, or the awaiting writers will never be woken up
+        packs = list(self._ready_record_packs)
+        if sending_pack is not None:
+            packs.append(sending_pack)
+        if self._current_record_pack is not None:
+            packs.append(self._current_record_pack)
+        self._ready_record_packs.clear()
+        self._current_record_pack = None
+        self._sending_pack = None
+        for pack in packs:
+            for future in pack.write_result_futures:
+                if not future.done():
+                    future.set_exception(DatahubException("AsyncShardWriter closed before records sent"))
+        async with self._condition:
+            self._condition.notify_all()
+        self._logger.info("AsyncShardWriter closed. key: {}, shard_id: {}, write count: {}".format(self._uniq_key, self._shard_id, self._has_write_count))
+
+    @property
+    def shard_id(self):
+        return self._shard_id
+
+    async def write(self, records):
+        if self._closed:
+            self._logger.warning("AsyncShardWriter closed when write. key: {}, shard_id: {}".format(self._uniq_key, self._shard_id))
+            raise DatahubException("AsyncShardWriter closed when write")
+
+        await self.__write_once(records)
+        self._logger.debug("Write records success. key: {}, record count: {}".format(self._uniq_key, len(records)))
+
+    async def write_async(self, records):
+        if self._closed:
+            self._logger.warning("AsyncShardWriter closed when write async. key: {}, shard_id: {}".format(self._uniq_key, self._shard_id))
+            raise DatahubException("AsyncShardWriter closed when write async")
+
+        async with self._condition:
+            # wait for sending when too many packs are ready
+            await self._condition.wait_for(lambda: self._closed or len(self._ready_record_packs) < self._max_record_pack_queue_limit)
+            if self._closed:
+                raise DatahubException("AsyncShardWriter closed when write async")
+            result = self.__append_record(records)
+            self._condition.notify_all()
+        return asyncio.wrap_future(result)
+
+    async def flush(self):
+        if self._closed:
+            self._logger.warning("AsyncShardWriter closed when flush. key: {}, shard_id: {}".format(self._uniq_key, self._shard_id))
+            raise DatahubException("AsyncShardWriter closed when flush")
+
+        async with self._condition:
+            self.__merge_current_pack(True)
+            self._condition.notify_all()
+            await self._condition.wait_for(lambda: self._closed or (not self._ready_record_packs and self._sending_pack is None))
+
+    def __append_record(self, records):
+        result = None if self._current_record_pack is None else self._current_record_pack.try_append(records)
+        self.__merge_current_pack(False)
+        if result is None:
+            self._current_record_pack = RecordPack(self._max_buffer_size, self._max_buffer_record_count, self._max_buffer_time)
+            result = self._current_record_pack.try_append(records)
+        return result
+
+    def __merge_current_pack(self, force):
+        if self._current_record_pack is not None and (force or self._current_record_pack.is_ready()):
+            self._ready_record_packs.append(self._current_record_pack)
+            self._current_record_pack = None
+
+    async def __obtain_ready_record_pack(self):
+        async with self._condition:
+            while True:
+                self.__merge_current_pack(False)
+                if self._ready_record_packs:
+                    self._sending_pack = self._ready_record_packs.popleft()
+                    return self._sending_pack
+                timeout = None
+                if self._current_record_pack is not None:
+                    timeout = self._current_record_pack.init_time + self._max_buffer_time - time.time()
+                try:
+                    await asyncio.wait_for(self._condition.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def __send_record_packs(self):
+        while not self._closed:
+            record_pack = await self.__obtain_ready_record_pack()
+            try:
+                await self.__send_record_pack(record_pack)
+            finally:
+                async with self._condition:
+                    self._sending_pack = None
+                    self._condition.notify_all()
+
+    async def __send_record_pack(self, record_pack):
+        records = record_pack.records
+        futures = record_pack.write_result_futures
+        init_time = record_pack.init_time
+
+        try:
+            start_time = time.time()
+            prepared = await self._coordinator.datahub_client.prepare_records_by_shard(
+                self._coordinator.project_name, self._coordinator.topic_name, self._shard_id, records)
+            await self.__write_once(prepared, len(records))
+            end_time = time.time()
+
+            self._logger.debug("write async once success. key: {}, shard_id: {}, records size: {}"
+                               .format(self._uniq_key, self._shard_id, len(records)))
+            result = WriteResult(self._shard_id, end_time - init_time, end_time - start_time)
+            for future in futures:
+                future.set_result(result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._logger.warning("write async once fail. key: {}, shard_id: {}, records size: {}, {}"
+                                 .format(self._uniq_key, self._shard_id, len(records), e))
+            for future in futures:
+                future.set_exception(e)
+
+    async def __write_once(self, records, record_count=None):
+        record_count = len(records) if record_count is None else record_count
+        retry_time = 0
+        while True:
+            try:
+                await self._coordinator.datahub_client.put_records_by_shard(
+                    self._coordinator.project_name, self._coordinator.topic_name, self._shard_id, records)
+                self._has_write_count += record_count
+                return
+            except DatahubException as e:
+                self._logger.warning("Write records fail. key: {}, shard_id: {}, records size: {}, max retry time: {}, this time: {}, DatahubException: {}"
+                                     .format(self._uniq_key, self._shard_id, record_count, self._max_retry_times, retry_time, e))
+                retry_time += 1
+                if retry_time >= self._max_retry_times:
+                    raise e
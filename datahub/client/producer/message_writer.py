@@ -20,18 +20,22 @@
 
 import logging
 from datahub.exceptions import DatahubException
-from ..common.thread_pool import HashThreadPool
+from ..common.constant import Constant
+from ..common.thread_pool import HashThreadPool, ThreadPool
 
 
 class MessageWriter:
 
-    def __init__(self, meta_data, queue_limit_num, threads_num):
+    def __init__(self, meta_data, queue_limit_num, threads_num, prepare_threads_num=Constant.DEFAULT_PREPARE_THREAD_LIMIT):
         self._meta_data = meta_data
         self._logger = logging.getLogger(MessageWriter.__name__)
         self._executor = HashThreadPool(queue_limit_num, threads_num, "MessageWriter")
+        # serialize and compress record packs, compression releases the GIL and runs in parallel with sending
+        self._prepare_executor = ThreadPool(queue_limit_num, prepare_threads_num, "MessageWriterPrepare")
 
     def close(self):
         self._executor.shutdown()
+        self._prepare_executor.shutdown()
 
     def empty(self, key):
         return self._executor.empty(key)
@@ -39,6 +43,9 @@ class MessageWriter:
     def send_task(self, key, task, *args, **kwargs):
         return self._executor.submit(key, task, *args, **kwargs)
 
+    def prepare_task(self, task, *args, **kwargs):
+        return self._prepare_executor.submit(task, *args, **kwargs)
+
     def put_record(self, records):
         topic_meta = self._meta_data.topic_meta
         datahub_client = self._meta_data.datahub_client
@@ -52,6 +59,16 @@ class MessageWriter:
             self._logger.warning("Put records fail. records count: {}, {}".format(len(records), e))
             raise e
 
+    def prepare_record_by_shard(self, shard_id, records):
+        topic_meta = self._meta_data.topic_meta
+        datahub_client = self._meta_data.datahub_client
+
+        try:
+            return datahub_client.prepare_records_by_shard(topic_meta.project_name, topic_meta.topic_name, shard_id, records)
+        except Exception as e:
+            self._logger.warning("Prepare records by shard fail. shard_id: {}, records count: {}, {}".format(shard_id, len(records), e))
+            raise e
+
     def put_record_by_shard(self, shard_id, records):
         topic_meta = self._meta_data.topic_meta
         datahub_client = self._meta_data.datahub_client
@@ -19,7 +19,13 @@
 
 
 import time
+import six
 from concurrent.futures import Future
+from datahub.batch.columnar import ColumnBatch
+from datahub.models import BlobRecord
+
+# bytes of a fixed size field in BinaryRecord
+FIXED_FIELD_SIZE = 8
 
 
 class RecordPack:
@@ -41,6 +47,11 @@ class RecordPack:
         return self._is_ready or time.time() - self._init_time >= self._max_buffer_time
 
     def try_append(self, records):
+        # ColumnBatch can not be merged with other records, it is sent in a pack alone
+        if isinstance(records, ColumnBatch) or isinstance(self._records, ColumnBatch):
+            self._is_ready = True
+            return None if self._write_result_futures else self.__append_records(records, 0)
+
         size = self.__get_total_records_size(records)
         if (self._curr_size + size < self._max_buffer_size and self._curr_count + len(records) <= self._max_buffer_record_count) or self._curr_count == 0:
             return self.__append_records(records, size)
@@ -49,7 +60,10 @@ class RecordPack:
             return None
 
     def __append_records(self, records, size):
-        self._records += records
+        if isinstance(records, ColumnBatch):
+            self._records = records
+        else:
+            self._records += records
         self._curr_size += size
         self._curr_count += len(records)
 
@@ -78,4 +92,17 @@ class RecordPack:
         return self._write_result_futures
 
     def __get_total_records_size(self, records):
-        return sum([len(record.encode_values()) for record in records])
+        return sum([self.__get_record_size(record) for record in records])
+
+    @staticmethod
+    def __get_record_size(record):
+        # estimated from the values as they are, the record is not encoded until the pack is sent
+        if isinstance(record, BlobRecord):
+            return len(record.blob_data)
+        size = 0
+        for value in record.values:
+            if isinstance(value, (six.binary_type, six.text_type)):
+                size += len(value)
+            elif value is not None:
+                size += FIXED_FIELD_SIZE
+        return size
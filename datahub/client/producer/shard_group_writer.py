@@ -22,6 +22,7 @@ import logging
 import threading
 from datahub.models import ShardState
 from datahub.exceptions import DatahubException
+from datahub.batch.columnar import ColumnBatch
 from .shard_writer import ShardWriter
 
 
@@ -96,6 +97,8 @@ class ShardGroupWriter:
         self._logger.info("ShardGroupWriter flush end. key: {}".format(self._coordinator.uniq_key))
 
     def __check_records(self, records):
+        if isinstance(records, ColumnBatch):
+            return
         for record in records:
             if record.shard_id or record.hash_key or record.partition_key:
                 self._logger.warning("Client producer not support put record by special shardId, partitionKey, hashKey. key: {}, shardId: {}, partitionKey: {}, hashKey: {}"
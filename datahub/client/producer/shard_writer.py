@@ -21,9 +21,11 @@
 import logging
 import threading
 import time
+from concurrent.futures import Future
 
 from datahub.exceptions import DatahubException
 from datahub.utils import AtomicLong
+from ..common.constant import Constant
 from ..common.datahub_factory import DatahubFactory
 from .record_pack_queue import RecordPackQueue
 from .write_result import WriteResult
@@ -76,7 +78,7 @@ class ShardWriter:
 
         result = self._record_package_queue.append_record(records)
 
-        if self._task_num.value == 0:
+        if self._task_num.value < Constant.MAX_SHARD_WRITE_TASK_NUM:
             self.__send_next_task()
         return result
 
@@ -96,12 +98,20 @@ class ShardWriter:
         with self._lock:
             pack = self._record_package_queue.obtain_ready_record_pack()
             if pack is not None:
-                if not self._message_writer.send_task(int(self._shard_id), self.__gen_next_write_task, pack):
+                # the pack is prepared while the previous pack of the shard is sending, and sent in order.
+                # the send task is added first, so the prepared pack always has a task to send or fail it
+                prepared = Future()
+                if not self._message_writer.send_task(int(self._shard_id), self.__gen_next_write_task, pack, prepared):
                     # Add task fail when thread pool full
                     self._logger.warning("Send next task fail. key: {}, shard_id: {}, task num: {}"
                                          .format(self._uniq_key, self._shard_id, self._task_num.value))
-                    raise DatahubException("Send next task fail. key: {}, shard_id: {}".format(self._uniq_key, self._shard_id))
+                    exception = DatahubException("Send next task fail. key: {}, shard_id: {}".format(self._uniq_key, self._shard_id))
+                    for future in pack.write_result_futures:
+                        future.set_exception(exception)
+                    raise exception
                 self._task_num.increment_and_get()
+                if not self._message_writer.prepare_task(self.__prepare_record_pack, pack, prepared):
+                    prepared.set_exception(DatahubException("Prepare next task fail. key: {}, shard_id: {}".format(self._uniq_key, self._shard_id)))
                 self._logger.debug("Send next task once. key: {}, shard_id: {}, task_num: {}"
                                    .format(self._uniq_key, self._shard_id, self._task_num.value))
 
@@ -122,14 +132,29 @@ class ShardWriter:
                 self._logger.warning("Write records fail. key: {}, shard_id: {}, records size: {}, {}".format(self._uniq_key, self._shard_id, len(records), e))
                 raise e
 
-    def __gen_next_write_task(self, record_pack):
+    def __prepare_record_pack(self, record_pack, prepared):
+        try:
+            prepared.set_result(self._message_writer.prepare_record_by_shard(self._shard_id, record_pack.records))
+        except Exception as e:
+            prepared.set_exception(e)
+
+    def __gen_next_write_task(self, record_pack, prepared):
         records = record_pack.records
         futures = record_pack.write_result_futures
         init_time = record_pack.init_time
 
+        try:
+            prepared_records = prepared.result()
+        except Exception as e:
+            # nothing is sent, serialize or compress error is not retried
+            self._logger.warning("prepare records fail. key: {}, shard_id: {}, records size: {}, {}"
+                                 .format(self._uniq_key, self._shard_id, len(records), e))
+            self.__set_exception_to_futures(futures, e)
+            return
+
         try:
             start_time = time.time()
-            self.__write_once(records)
+            self.__write_once(prepared_records)
             end_time = time.time()
 
             self._logger.debug("write async once success. key: {}, shard_id: {}, records size: {}"
@@ -23,6 +23,8 @@ from enum import Enum
 
 from .utils import type_assert
 from .implement import DataHubJson, DataHubPB, DataHubBatch
+from .batch.columnar import ColumnBatch
+from .models.params import PutPreparedRecordsRequestParams
 from .models import CompressFormat, RecordSchema, FieldType, CursorType, ConnectorType, ConnectorConfig,\
     ConnectorState, ConnectorOffset, SubscriptionState
 
@@ -66,6 +68,15 @@ class DataHub(object):
     :param compress_format: compress format, default value is NONE.
     :type compress_format: :class:`datahub.models.compress.CompressFormat`
     :param enable_schema_register: enable schema register, only support in batch. default value is True in batch
+    :param integrity_mode: crc check mode of records read in pb and batch, default value is FULL.
+    :type integrity_mode: :class:`datahub.models.IntegrityMode`
+    :param integrity_sample_rate: sample rate of crc check, only valid in SAMPLED mode, default value is 0.1
+    :param compress_policy: adaptive compress policy when put records, default value is None, always compress
+    :type compress_policy: :class:`datahub.models.compress.CompressPolicy`
+    :param pool_maxsize: max connections kept alive for each host, should not be less than the threads using the client, default value is 10
+    :param transport: http transport, default value is REQUESTS. HTTPX multiplexes requests of all threads over HTTP/2
+    :type transport: :class:`datahub.rest.TransportType`
+    :param host_ip: host ip in user agent, default value is None, detected once per process by an udp socket to 8.8.8.8
 
     :Example:
 
@@ -73,6 +84,8 @@ class DataHub(object):
     >>> datahub_pb = DataHub('**your access id**', '**your access key**', '**endpoint**', protocol_type=DatahubProtocolType.PB)
     >>> datahub_batch = DataHub('**your access id**', '**your access key**', '**endpoint**', protocol_type=DatahubProtocolType.BATCH, enable_schema_register=True)
     >>> datahub_lz4 = DataHub('**your access id**', '**your access key**', '**endpoint**', compress_format=CompressFormat.LZ4)
+    >>> datahub_http2 = DataHub('**your access id**', '**your access key**', '**endpoint**', transport=TransportType.HTTPX)
+    >>> datahub_trusted = DataHub('**your access id**', '**your access key**', '**endpoint**', protocol_type=DatahubProtocolType.BATCH, integrity_mode=IntegrityMode.OUTER_ONLY)
     >>>
     >>> project_result = datahub.get_project('datahub_test')
     >>>
@@ -384,7 +397,7 @@ class DataHub(object):
         """
         return self._datahub_impl.put_records(project_name, topic_name, record_list)
 
-    @type_assert(object, str, str, str, list)
+    @type_assert(object, str, str, str, (list, ColumnBatch, PutPreparedRecordsRequestParams))
     def put_records_by_shard(self, project_name, topic_name, shard_id, record_list):
         """
         Put records to specific shard of topic
@@ -392,8 +405,8 @@ class DataHub(object):
         :param project_name: project name
         :param topic_name: topic name
         :param shard_id: shard id
-        :param record_list: record list
-        :type record_list: :class:`list`
+        :param record_list: record list, or ColumnBatch of tuple topic in batch protocol, or records prepared by :meth:`prepare_records_by_shard`
+        :type record_list: :class:`list` or :class:`datahub.batch.columnar.ColumnBatch` or :class:`datahub.models.params.PutPreparedRecordsRequestParams`
         :return: failed records info
         :rtype: :class:`datahub.models.PutRecordsResult`
         :raise: :class:`datahub.exceptions.ResourceNotFoundException` if the project or topic not exists
@@ -406,6 +419,24 @@ class DataHub(object):
         """
         return self._datahub_impl.put_records_by_shard(project_name, topic_name, shard_id, record_list)
 
+    @type_assert(object, str, str, str, (list, ColumnBatch))
+    def prepare_records_by_shard(self, project_name, topic_name, shard_id, record_list):
+        """
+        Serialize and compress records to put to specific shard of topic, the result can be put by :meth:`put_records_by_shard`.
+        It can run in another thread, compression releases the GIL.
+
+        :param project_name: project name
+        :param topic_name: topic name
+        :param shard_id: shard id
+        :param record_list: record list, or ColumnBatch of tuple topic in batch protocol
+        :type record_list: :class:`list` or :class:`datahub.batch.columnar.ColumnBatch`
+        :return: prepared records
+        :rtype: :class:`datahub.models.params.PutPreparedRecordsRequestParams`
+        :raise: :class:`datahub.exceptions.InvalidParameterException` if the record is not well-formed; project_name, topic_name or shard_id is empty
+        :raise: :class:`datahub.exceptions.DatahubException` if not in pb or batch mode
+        """
+        return self._datahub_impl.prepare_records_by_shard(project_name, topic_name, shard_id, record_list)
+
     @type_assert(object, str, str, str, str, int, str)
     def get_blob_records(self, project_name, topic_name, shard_id, cursor, limit_num=0, sub_id=None):
         """
@@ -424,8 +455,8 @@ class DataHub(object):
         """
         return self._datahub_impl.get_blob_records(project_name, topic_name, sub_id, shard_id, cursor, limit_num)
 
-    @type_assert(object, str, str, str, RecordSchema, str, int, str)
-    def get_tuple_records(self, project_name, topic_name, shard_id, record_schema=None, cursor="", limit_num=0, sub_id=None):
+    @type_assert(object, str, str, str, RecordSchema, str, int, str, bool)
+    def get_tuple_records(self, project_name, topic_name, shard_id, record_schema=None, cursor="", limit_num=0, sub_id=None, lazy_decode=False):
         """
         Get records from a topic
 
@@ -437,13 +468,64 @@ class DataHub(object):
         :type record_schema: :class:`datahub.models.RecordSchema`
         :param cursor: the cursor
         :param limit_num: record number need to read
+        :param sub_id: subscription id
+        :param lazy_decode: only for batch protocol, return record views which decode field and attributes on first access
         :return: result include record list, start sequence, record num and next cursor
         :rtype: :class:`datahub.models.GetRecordsResult`
         :raise: :class:`datahub.exceptions.ResourceNotFoundException` if the project or topic or shard not exists
         :raise: :class:`datahub.exceptions.InvalidParameterException` if the cursor is invalid; project_name, topic_name, shard_id, or cursor is empty
         :raise: :class:`datahub.exceptions.DatahubException` if crc is wrong in pb mode
         """
-        return self._datahub_impl.get_tuple_records(project_name, topic_name, sub_id, shard_id, record_schema, cursor, limit_num)
+        return self._datahub_impl.get_tuple_records(project_name, topic_name, sub_id, shard_id, record_schema, cursor, limit_num, lazy_decode)
+
+    @type_assert(object, str, str, str, RecordSchema, str, int, str)
+    def get_tuple_columns(self, project_name, topic_name, shard_id, record_schema, cursor, limit_num=0, sub_id=None):
+        """
+        Get records from a tuple topic and decode them into columns, only for batch protocol and numpy is required
+
+        :param project_name: project name
+        :param topic_name: topic name
+        :param shard_id: shard id
+        :param record_schema: tuple record schema, all records should be written with this schema
+        :type record_schema: :class:`datahub.models.RecordSchema`
+        :param cursor: the cursor
+        :param limit_num: record number need to read
+        :param sub_id: subscription id
+        :return: result include columns, start sequence, record num and next cursor
+        :rtype: :class:`datahub.models.GetBatchColumnsResult`
+        :raise: :class:`datahub.exceptions.ResourceNotFoundException` if the project or topic or shard not exists
+        :raise: :class:`datahub.exceptions.InvalidParameterException` if the cursor is invalid; project_name, topic_name, shard_id, cursor or record_schema is empty
+        :raise: :class:`datahub.exceptions.DatahubException` if crc is wrong, numpy is not installed or not in batch protocol
+        """
+        return self._datahub_impl.get_tuple_columns(project_name, topic_name, sub_id, shard_id, record_schema, cursor, limit_num)
+
+    @type_assert(object, str, str, RecordSchema, bytes)
+    def register_compress_dictionary(self, project_name, topic_name, record_schema, dict_data):
+        """
+        Register a zstd dictionary for a schema version of the topic, only for batch protocol and zstandard is required.
+        Records of the schema are compressed with the dictionary in ZSTD, and the dictionary should be registered by
+        consumers before reading them.
+
+        :param project_name: project name
+        :param topic_name: topic name
+        :param record_schema: tuple record schema registered in the topic
+        :type record_schema: :class:`datahub.models.RecordSchema`
+        :param dict_data: dictionary data, can be trained by :meth:`datahub.batch.batch_serializer.BatchSerializer.train_dictionary`
+        :return: version id of the schema
+        :raise: :class:`datahub.exceptions.ResourceNotFoundException` if the schema not exists in the topic
+        :raise: :class:`datahub.exceptions.DatahubException` if zstandard is not installed or not in batch protocol
+        """
+        return self._datahub_impl.register_compress_dictionary(project_name, topic_name, record_schema, dict_data)
+
+    def get_connection_metrics(self):
+        """
+        Get the connection reuse metrics of the http connection pools
+
+        :return: dict of counters, requests: connections got from pools, created: new connections,
+            reused: requests served by kept alive connections, discarded: connections closed because the pool is full,
+            which is not counted by ``TransportType.HTTPX``
+        """
+        return self._datahub_impl.get_connection_metrics()
 
     @type_assert(object, str, str, str)
     def get_metering_info(self, project_name, topic_name, shard_id):
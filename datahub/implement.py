@@ -17,16 +17,19 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import functools
 import time
 import urllib3
 
 from .batch.schema_registry_client import SchemaRegistryClient
+from .batch.columnar import ColumnBatch
 from .models.params import *
 from .models.results import *
+from .models.integrity import IntegrityChecker, IntegrityMode, DEFAULT_INTEGRITY_SAMPLE_RATE
 from .auth import AliyunAccount
 from .exceptions import InvalidParameterException, InvalidOperationException
 from .models import ShardState, OffsetBase, SubscriptionState, FieldType, OffsetWithSession
-from .rest import Path
+from .rest import Path, HTTPMethod
 from .rest import RestClient
 from .utils import check_project_name_valid, check_topic_name_valid, check_type, check_positive, \
     to_text, ErrorMessage, check_empty, check_negative
@@ -34,6 +37,29 @@ from .utils import check_project_name_valid, check_topic_name_valid, check_type,
 urllib3.disable_warnings()
 
 
+class ApiRequest(object):
+    """
+    Http method, url and arguments of an api request, the response is parsed by ``parse(content, headers)``.
+    Requests are built by the protocol client, sent by RestClient in sync client and by AsyncRestClient in async client.
+    ``cpu_bound`` marks the parsing that is worth to run out of the event loop in async client.
+    """
+
+    __slots__ = ('method', 'url', 'kwargs', 'parse', 'cpu_bound')
+
+    def __init__(self, method, url, parse, cpu_bound=False, **kwargs):
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self.parse = parse
+        self.cpu_bound = cpu_bound
+
+
+def _parse_text_content(result_class, **kwargs):
+    def parse(content, headers):
+        return result_class.parse_content(to_text(content), headers=headers, **kwargs)
+    return parse
+
+
 class DataHubJson(object):
     """
     Datahub json client
@@ -46,7 +72,30 @@ class DataHubJson(object):
             self._account = AliyunAccount(access_id=access_id, access_key=access_key, security_token=security_token, credential=credential)
         self._endpoint = endpoint
         self._compress_format = compress_format
+        self._integrity_checker = IntegrityChecker(kwargs.pop('integrity_mode', IntegrityMode.FULL),
+                                                   kwargs.pop('integrity_sample_rate', DEFAULT_INTEGRITY_SAMPLE_RATE))
         self._rest_client = RestClient(self._account, self._endpoint, **kwargs)
+        self._schema_register = None
+
+    @property
+    def account(self):
+        return self._account
+
+    @property
+    def rest_client(self):
+        return self._rest_client
+
+    @property
+    def compress_format(self):
+        return self._compress_format
+
+    @property
+    def integrity_checker(self):
+        return self._integrity_checker
+
+    @property
+    def schema_register(self):
+        return self._schema_register
 
     def list_project(self):
         url = Path.PROJECTS
@@ -122,18 +171,7 @@ class DataHubJson(object):
                             record_schema)
 
     def get_topic(self, project_name, topic_name):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-
-        url = Path.TOPIC % (project_name, topic_name)
-
-        content, headers = self._rest_client.get(url)
-
-        result = GetTopicResult.parse_content(to_text(content), headers=headers, project_name=project_name,
-                                              topic_name=topic_name)
-        return result
+        return self._send_request(self.build_get_topic_request(project_name, topic_name))
 
     def update_topic(self, project_name, topic_name, life_cycle, comment):
         if check_empty(project_name):
@@ -203,17 +241,7 @@ class DataHubJson(object):
         raise DatahubException(ErrorMessage.WAIT_SHARD_TIMEOUT)
 
     def list_shard(self, project_name, topic_name):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-
-        url = Path.SHARDS % (project_name, topic_name)
-
-        content, headers = self._rest_client.get(url)
-
-        result = ListShardResult.parse_content(content, headers=headers)
-        return result
+        return self._send_request(self.build_list_shard_request(project_name, topic_name))
 
     def merge_shard(self, project_name, topic_name, shard_id, adj_shard_id):
         if check_empty(project_name):
@@ -272,52 +300,33 @@ class DataHubJson(object):
         return result
 
     def get_cursor(self, project_name, topic_name, shard_id, cursor_type, param=-1):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-        if check_empty(shard_id):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'shard_id')
-        if not check_type(cursor_type, CursorType):
-            raise InvalidParameterException(ErrorMessage.INVALID_TYPE % ('cursor_type', CursorType.__name__))
-        if CursorType.SYSTEM_TIME == cursor_type and param < 0:
-            raise InvalidParameterException(ErrorMessage.MISSING_SYSTEM_TIME)
-        elif CursorType.SEQUENCE == cursor_type and param < 0:
-            raise InvalidParameterException(ErrorMessage.MISSING_SEQUENCE)
-
-        url = Path.SHARD % (project_name, topic_name, shard_id)
-        request_param = GetCursorRequestParams(cursor_type, param)
-
-        content, headers = self._rest_client.post(url, data=request_param.content())
-
-        result = GetCursorResult.parse_content(content, headers=headers)
-        return result
+        return self._send_request(self.build_get_cursor_request(project_name, topic_name, shard_id, cursor_type, param))
 
     def put_records(self, project_name, topic_name, record_list):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+        return self._send_request(self.build_put_records_request(project_name, topic_name, record_list))
 
-        url = Path.SHARDS % (project_name, topic_name)
+    def put_records_by_shard(self, project_name, topic_name, shard_id, record_list):
+        raise DatahubException('put_records_by_shard api only support pb mode')
 
-        request_param = PutRecordsRequestParams(record_list)
+    def prepare_records_by_shard(self, project_name, topic_name, shard_id, record_list):
+        raise DatahubException('prepare_records_by_shard api only support pb mode')
 
-        content, headers = self._rest_client.post(url, data=request_param.content(), headers=request_param.extra_headers(),
-                                         compress_format=self._compress_format)
+    def get_blob_records(self, project_name, topic_name, sub_id, shard_id, cursor, limit_num):
+        return self._send_request(self.build_get_records_request(project_name, topic_name, sub_id, shard_id, cursor,
+                                                                 limit_num))
 
-        result = PutRecordsResult.parse_content(content, headers=headers)
+    def get_tuple_records(self, project_name, topic_name, sub_id, shard_id, record_schema, cursor, limit_num, lazy_decode=False):
+        return self._send_request(self.build_get_records_request(project_name, topic_name, sub_id, shard_id, cursor,
+                                                                 limit_num, record_schema, lazy_decode))
 
-        return result
+    def get_tuple_columns(self, project_name, topic_name, sub_id, shard_id, record_schema, cursor, limit_num):
+        raise DatahubException('get_tuple_columns api only support batch mode')
 
-    def put_records_by_shard(self, project_name, topic_name, shard_id, record_list):
-        raise DatahubException('put_records_by_shard api only support pb mode')
-
-    def get_blob_records(self, project_name, topic_name, sub_id, shard_id, cursor, limit_num):
-        return self.__get_records(project_name, topic_name, sub_id, shard_id, cursor, limit_num)
+    def register_compress_dictionary(self, project_name, topic_name, record_schema, dict_data):
+        raise DatahubException('register_compress_dictionary api only support batch mode')
 
-    def get_tuple_records(self, project_name, topic_name, sub_id, shard_id, record_schema, cursor, limit_num):
-        return self.__get_records(project_name, topic_name, sub_id, shard_id, cursor, limit_num, record_schema)
+    def get_connection_metrics(self):
+        return self._rest_client.connection_metrics.metrics
 
     def get_metering_info(self, project_name, topic_name, shard_id):
         if check_empty(project_name):
@@ -488,128 +497,29 @@ class DataHubJson(object):
         return result
 
     def init_and_get_subscription_offset(self, project_name, topic_name, sub_id, shard_ids):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-        if check_empty(sub_id):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'sub_id')
-        if check_empty(shard_ids):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'shard_ids')
-
-        if isinstance(shard_ids, six.string_types):
-            shard_ids = [shard_ids]
-        if not check_type(shard_ids, list):
-            raise InvalidParameterException(ErrorMessage.INVALID_TYPE % ('shard_ids', list.__name__))
-
-        url = Path.OFFSETS % (project_name, topic_name, sub_id)
-        request_param = InitAndGetSubscriptionOffsetParams(shard_ids)
-
-        content, headers = self._rest_client.post(url, data=request_param.content())
-
-        result = InitAndGetSubscriptionOffsetResult.parse_content(content, headers=headers)
-        return result
+        return self._send_request(self.build_init_and_get_subscription_offset_request(project_name, topic_name, sub_id,
+                                                                                      shard_ids))
 
     def get_subscription_offset(self, project_name, topic_name, sub_id, shard_ids=None):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-        if check_empty(sub_id):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'sub_id')
-
-        if isinstance(shard_ids, six.string_types):
-            shard_ids = [shard_ids]
-
-        url = Path.OFFSETS % (project_name, topic_name, sub_id)
-        request_param = GetSubscriptionOffsetParams(shard_ids)
-
-        content, headers = self._rest_client.post(url, data=request_param.content())
-
-        result = GetSubscriptionOffsetResult.parse_content(content, headers=headers)
-        return result
+        return self._send_request(self.build_get_subscription_offset_request(project_name, topic_name, sub_id, shard_ids))
 
     def update_subscription_offset(self, project_name, topic_name, sub_id, offsets):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-        if check_empty(sub_id):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'sub_id')
-        if not check_type(offsets, dict):
-            raise InvalidParameterException(ErrorMessage.INVALID_TYPE % ('offsets', dict.__name__))
-
-        for (k, v) in offsets.items():
-            if isinstance(v, dict):
-                offsets[k] = OffsetWithSession.from_dict(v)
-
-        url = Path.OFFSETS % (project_name, topic_name, sub_id)
-        request_param = UpdateSubscriptionOffsetParams(offsets)
-
-        content, headers = self._rest_client.put(url, data=request_param.content())
-
-        result = UpdateSubscriptionOffsetResult.parse_content(content, headers=headers)
-        return result
+        return self._send_request(self.build_update_subscription_offset_request(project_name, topic_name, sub_id, offsets))
 
     def join_group(self, project_name, topic_name, consumer_group, session_timeout):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-        if consumer_group is None or len(consumer_group) == 0:
-            raise InvalidParameterException("Consumer group format is invalid")
-
-        url = Path.SUBSCRIPTION % (project_name, topic_name, consumer_group)
-        request_param = JoinGroupParams(session_timeout)
-
-        content, headers = self._rest_client.post(url, data=request_param.content())
-        result = JoinGroupResult.parse_content(content, headers=headers)
-        return result
+        return self._send_request(self.build_join_group_request(project_name, topic_name, consumer_group, session_timeout))
 
     def heart_beat(self, project_name, topic_name, consumer_group, consumer_id, version_id, hold_shard_list, read_end_shard_list):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-        if consumer_group is None or len(consumer_group) == 0:
-            raise InvalidParameterException("Consumer group format is invalid")
-
-        if hold_shard_list is None:
-            raise InvalidParameterException("Hold shard list is none")
-
-        url = Path.SUBSCRIPTION % (project_name, topic_name, consumer_group)
-        request_param = HeartBeatParams(consumer_id, version_id, hold_shard_list, read_end_shard_list)
-        content, headers = self._rest_client.post(url, data=request_param.content())
-        result = HeartBeatResult.parse_content(content, headers=headers)
-        return result
+        return self._send_request(self.build_heart_beat_request(project_name, topic_name, consumer_group, consumer_id,
+                                                                version_id, hold_shard_list, read_end_shard_list))
 
     def sync_group(self, project_name, topic_name, consumer_group, consumer_id, version_id, release_shard_list, read_end_shard_list):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-        if consumer_group is None or len(consumer_group) == 0:
-            raise InvalidParameterException("Consumer group format is invalid")
-
-        url = Path.SUBSCRIPTION % (project_name, topic_name, consumer_group)
-        request_param = SyncGroupParams(consumer_id, version_id, release_shard_list, read_end_shard_list)
-        content, headers = self._rest_client.post(url, data=request_param.content())
-        result = SyncGroupResult.parse_content(content, headers=headers)
-        return result
+        return self._send_request(self.build_sync_group_request(project_name, topic_name, consumer_group, consumer_id,
+                                                                version_id, release_shard_list, read_end_shard_list))
 
     def leave_group(self, project_name, topic_name, consumer_group, consumer_id, version_id):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-        if consumer_group is None or len(consumer_group) == 0:
-            raise InvalidParameterException("Consumer group format is invalid")
-
-        url = Path.SUBSCRIPTION % (project_name, topic_name, consumer_group)
-        request_param = LeaveGroupParams(consumer_id, version_id)
-        content, headers = self._rest_client.post(url, data=request_param.content())
-        result = LeaveGroupResult.parse_content(content, headers=headers)
-        return result
+        return self._send_request(self.build_leave_group_request(project_name, topic_name, consumer_group, consumer_id,
+                                                                 version_id))
 
     def list_topic_schema(self, project_name, topic_name, page_number=-1, page_size=-1):
         if check_empty(project_name):
@@ -763,6 +673,147 @@ class DataHubJson(object):
         return result
 
     def reset_subscription_offset(self, project_name, topic_name, sub_id, offsets):
+        return self._send_request(self.build_reset_subscription_offset_request(project_name, topic_name, sub_id, offsets))
+
+    # =======================================================
+    # request builder, the requests are sent by sync and async client
+    # =======================================================
+
+    def build_get_topic_request(self, project_name, topic_name):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+
+        url = Path.TOPIC % (project_name, topic_name)
+
+        return ApiRequest(HTTPMethod.GET, url, _parse_text_content(GetTopicResult, project_name=project_name,
+                                                                    topic_name=topic_name))
+
+    def build_list_shard_request(self, project_name, topic_name):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+
+        url = Path.SHARDS % (project_name, topic_name)
+
+        return ApiRequest(HTTPMethod.GET, url, ListShardResult.parse_content)
+
+    def build_get_cursor_request(self, project_name, topic_name, shard_id, cursor_type, param=-1):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+        if check_empty(shard_id):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'shard_id')
+        if not check_type(cursor_type, CursorType):
+            raise InvalidParameterException(ErrorMessage.INVALID_TYPE % ('cursor_type', CursorType.__name__))
+        if CursorType.SYSTEM_TIME == cursor_type and param < 0:
+            raise InvalidParameterException(ErrorMessage.MISSING_SYSTEM_TIME)
+        elif CursorType.SEQUENCE == cursor_type and param < 0:
+            raise InvalidParameterException(ErrorMessage.MISSING_SEQUENCE)
+
+        url = Path.SHARD % (project_name, topic_name, shard_id)
+        request_param = GetCursorRequestParams(cursor_type, param)
+
+        return ApiRequest(HTTPMethod.POST, url, GetCursorResult.parse_content, data=request_param.content())
+
+    def build_put_records_request(self, project_name, topic_name, record_list):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+
+        url = Path.SHARDS % (project_name, topic_name)
+        request_param = PutRecordsRequestParams(record_list)
+
+        return ApiRequest(HTTPMethod.POST, url, PutRecordsResult.parse_content, data=request_param.content(),
+                          headers=request_param.extra_headers(), compress_format=self._compress_format)
+
+    def build_put_records_by_shard_request(self, project_name, topic_name, shard_id, prepared_records):
+        raise DatahubException('put_records_by_shard api only support pb mode')
+
+    def build_get_records_request(self, project_name, topic_name, sub_id, shard_id, cursor, limit_num, record_schema=None,
+                                  lazy_decode=False):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+        if check_empty(shard_id):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'shard_id')
+        if check_empty(cursor):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'cursor')
+        if check_type(cursor, GetCursorResult):
+            raise InvalidParameterException(ErrorMessage.INVALID_TYPE % ('cursor', 'str'))
+        if sub_id is not None:
+            raise InvalidOperationException("Json protocol not support this method")
+
+        url = Path.SHARD % (project_name, topic_name, shard_id)
+        request_param = GetRecordsRequestParams(cursor, limit_num)
+
+        return ApiRequest(HTTPMethod.POST, url,
+                          functools.partial(GetRecordsResult.parse_content, record_schema=record_schema),
+                          cpu_bound=True, data=request_param.content(), headers=request_param.extra_headers(),
+                          compress_format=self._compress_format)
+
+    def build_init_and_get_subscription_offset_request(self, project_name, topic_name, sub_id, shard_ids):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+        if check_empty(sub_id):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'sub_id')
+        if check_empty(shard_ids):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'shard_ids')
+
+        if isinstance(shard_ids, six.string_types):
+            shard_ids = [shard_ids]
+        if not check_type(shard_ids, list):
+            raise InvalidParameterException(ErrorMessage.INVALID_TYPE % ('shard_ids', list.__name__))
+
+        url = Path.OFFSETS % (project_name, topic_name, sub_id)
+        request_param = InitAndGetSubscriptionOffsetParams(shard_ids)
+
+        return ApiRequest(HTTPMethod.POST, url, InitAndGetSubscriptionOffsetResult.parse_content,
+                          data=request_param.content())
+
+    def build_get_subscription_offset_request(self, project_name, topic_name, sub_id, shard_ids=None):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+        if check_empty(sub_id):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'sub_id')
+
+        if isinstance(shard_ids, six.string_types):
+            shard_ids = [shard_ids]
+
+        url = Path.OFFSETS % (project_name, topic_name, sub_id)
+        request_param = GetSubscriptionOffsetParams(shard_ids)
+
+        return ApiRequest(HTTPMethod.POST, url, GetSubscriptionOffsetResult.parse_content, data=request_param.content())
+
+    def build_update_subscription_offset_request(self, project_name, topic_name, sub_id, offsets):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+        if check_empty(sub_id):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'sub_id')
+        if not check_type(offsets, dict):
+            raise InvalidParameterException(ErrorMessage.INVALID_TYPE % ('offsets', dict.__name__))
+
+        for (k, v) in offsets.items():
+            if isinstance(v, dict):
+                offsets[k] = OffsetWithSession.from_dict(v)
+
+        url = Path.OFFSETS % (project_name, topic_name, sub_id)
+        request_param = UpdateSubscriptionOffsetParams(offsets)
+
+        return ApiRequest(HTTPMethod.PUT, url, UpdateSubscriptionOffsetResult.parse_content, data=request_param.content())
+
+    def build_reset_subscription_offset_request(self, project_name, topic_name, sub_id, offsets):
         if check_empty(project_name):
             raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
         if check_empty(topic_name):
@@ -781,15 +832,61 @@ class DataHubJson(object):
         url = Path.OFFSETS % (project_name, topic_name, sub_id)
         request_param = ResetSubscriptionOffsetParams(offsets)
 
-        content, headers = self._rest_client.put(url, data=request_param.content())
+        return ApiRequest(HTTPMethod.PUT, url, ResetSubscriptionOffsetResult.parse_content, data=request_param.content())
 
-        result = ResetSubscriptionOffsetResult.parse_content(content, headers=headers)
-        return result
+    def build_join_group_request(self, project_name, topic_name, consumer_group, session_timeout):
+        self.__check_consumer_group(project_name, topic_name, consumer_group)
+
+        url = Path.SUBSCRIPTION % (project_name, topic_name, consumer_group)
+        request_param = JoinGroupParams(session_timeout)
+
+        return ApiRequest(HTTPMethod.POST, url, JoinGroupResult.parse_content, data=request_param.content())
+
+    def build_heart_beat_request(self, project_name, topic_name, consumer_group, consumer_id, version_id, hold_shard_list,
+                                 read_end_shard_list):
+        self.__check_consumer_group(project_name, topic_name, consumer_group)
+        if hold_shard_list is None:
+            raise InvalidParameterException("Hold shard list is none")
+
+        url = Path.SUBSCRIPTION % (project_name, topic_name, consumer_group)
+        request_param = HeartBeatParams(consumer_id, version_id, hold_shard_list, read_end_shard_list)
+
+        return ApiRequest(HTTPMethod.POST, url, HeartBeatResult.parse_content, data=request_param.content())
+
+    def build_sync_group_request(self, project_name, topic_name, consumer_group, consumer_id, version_id, release_shard_list,
+                                 read_end_shard_list):
+        self.__check_consumer_group(project_name, topic_name, consumer_group)
+
+        url = Path.SUBSCRIPTION % (project_name, topic_name, consumer_group)
+        request_param = SyncGroupParams(consumer_id, version_id, release_shard_list, read_end_shard_list)
+
+        return ApiRequest(HTTPMethod.POST, url, SyncGroupResult.parse_content, data=request_param.content())
+
+    def build_leave_group_request(self, project_name, topic_name, consumer_group, consumer_id, version_id):
+        self.__check_consumer_group(project_name, topic_name, consumer_group)
+
+        url = Path.SUBSCRIPTION % (project_name, topic_name, consumer_group)
+        request_param = LeaveGroupParams(consumer_id, version_id)
+
+        return ApiRequest(HTTPMethod.POST, url, LeaveGroupResult.parse_content, data=request_param.content())
 
     # =======================================================
     # private function
     # =======================================================
 
+    def _send_request(self, api_request):
+        content, headers = self._rest_client.request(api_request.method, api_request.url, **api_request.kwargs)
+        return api_request.parse(content, headers=headers)
+
+    @staticmethod
+    def __check_consumer_group(project_name, topic_name, consumer_group):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+        if consumer_group is None or len(consumer_group) == 0:
+            raise InvalidParameterException("Consumer group format is invalid")
+
     def __is_shard_load_completed(self, project_name, topic_name):
         shards = self.list_shard(project_name, topic_name)
         for shard in shards.shards:
@@ -827,30 +924,6 @@ class DataHubJson(object):
         result = CreateTopicResult.parse_content(content, headers=headers)
         return result
 
-    def __get_records(self, project_name, topic_name, sub_id, shard_id, cursor, limit_num, record_schema=None):
-        if check_empty(project_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
-        if check_empty(topic_name):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-        if check_empty(shard_id):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'shard_id')
-        if check_empty(cursor):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'cursor')
-        if check_type(cursor, GetCursorResult):
-            raise InvalidParameterException(ErrorMessage.INVALID_TYPE % ('cursor', 'str'))
-        if sub_id is not None:
-            raise InvalidOperationException("Json protocol not support this method")
-
-        url = Path.SHARD % (project_name, topic_name, shard_id)
-
-        request_param = GetRecordsRequestParams(cursor, limit_num)
-
-        content, headers = self._rest_client.post(url, data=request_param.content(), headers=request_param.extra_headers(),
-                                                  compress_format=self._compress_format)
-
-        result = GetRecordsResult.parse_content(content, headers=headers, record_schema=record_schema)
-
-        return result
 
 
 class DataHubPB(DataHubJson):
@@ -861,54 +934,59 @@ class DataHubPB(DataHubJson):
     def __init__(self, access_id, access_key, endpoint=None, compress_format=None, enable_schema_register=False, credential=None, **kwargs):
         super().__init__(access_id, access_key, endpoint, compress_format, enable_schema_register, credential=credential, **kwargs)
 
-    def put_records(self, project_name, topic_name, record_list):
+    def put_records_by_shard(self, project_name, topic_name, shard_id, record_list):
+        if not isinstance(record_list, PutPreparedRecordsRequestParams):
+            record_list = self.prepare_records_by_shard(project_name, topic_name, shard_id, record_list)
+        return self._send_request(self.build_put_records_by_shard_request(project_name, topic_name, shard_id, record_list))
+
+    def prepare_records_by_shard(self, project_name, topic_name, shard_id, record_list):
         if check_empty(project_name):
             raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
         if check_empty(topic_name):
             raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+        if check_empty(shard_id):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'shard_id')
 
         if record_list is None or len(record_list) == 0:
             raise InvalidParameterException("Record list is null or empty")
+        if isinstance(record_list, ColumnBatch):
+            raise DatahubException('put ColumnBatch api only support batch mode')
 
-        url = Path.SHARDS % (project_name, topic_name)
+        url = Path.SHARD % (project_name, topic_name, shard_id)
 
         request_param = PutPBRecordsRequestParams(record_list)
+        headers = request_param.extra_headers()
+        data, compress_headers = self._rest_client.compress_content(request_param.content(), self._compress_format,
+                                                                    self._rest_client.endpoint + url)
+        headers.update(compress_headers)
+        return PutPreparedRecordsRequestParams(data, headers, len(record_list))
 
-        content, headers = self._rest_client.post(url, data=request_param.content(), headers=request_param.extra_headers(),
-                                                  compress_format=self._compress_format)
-
-        result = PutPBRecordsResult.parse_content(content, headers=headers)
-
-        return result
-
-    def put_records_by_shard(self, project_name, topic_name, shard_id, record_list):
+    def build_put_records_request(self, project_name, topic_name, record_list):
         if check_empty(project_name):
             raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
         if check_empty(topic_name):
             raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
-        if check_empty(shard_id):
-            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'shard_id')
 
         if record_list is None or len(record_list) == 0:
             raise InvalidParameterException("Record list is null or empty")
 
-        url = Path.SHARD % (project_name, topic_name, shard_id)
-
+        url = Path.SHARDS % (project_name, topic_name)
         request_param = PutPBRecordsRequestParams(record_list)
 
-        content, headers = self._rest_client.post(url, data=request_param.content(), headers=request_param.extra_headers(),
-                                                  compress_format=self._compress_format)
+        return ApiRequest(HTTPMethod.POST, url, PutPBRecordsResult.parse_content, data=request_param.content(),
+                          headers=request_param.extra_headers(), compress_format=self._compress_format)
 
-        result = PutRecordsByShardResult.parse_content(content, headers=headers)
-        return result
+    def build_put_records_by_shard_request(self, project_name, topic_name, shard_id, prepared_records):
+        if check_empty(project_name) or check_empty(topic_name) or check_empty(shard_id):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name, topic_name or shard_id')
 
-    def get_blob_records(self, project_name, topic_name, sub_id, shard_id, cursor, limit_num):
-        return self.__get_records(project_name, topic_name, sub_id, shard_id, cursor, limit_num)
+        url = Path.SHARD % (project_name, topic_name, shard_id)
 
-    def get_tuple_records(self, project_name, topic_name, sub_id, shard_id, record_schema, cursor, limit_num):
-        return self.__get_records(project_name, topic_name, sub_id, shard_id, cursor, limit_num, record_schema)
+        return ApiRequest(HTTPMethod.POST, url, PutRecordsByShardResult.parse_content, data=prepared_records.content(),
+                          headers=prepared_records.extra_headers(), compress_format=None)
 
-    def __get_records(self, project_name, topic_name, sub_id, shard_id, cursor, limit_num, record_schema=None):
+    def build_get_records_request(self, project_name, topic_name, sub_id, shard_id, cursor, limit_num, record_schema=None,
+                                  lazy_decode=False):
         if check_empty(project_name):
             raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
         if check_empty(topic_name):
@@ -921,12 +999,11 @@ class DataHubPB(DataHubJson):
         url = Path.SHARD % (project_name, topic_name, shard_id)
         request_param = GetPBRecordsRequestParams(cursor, limit_num)
 
-        content, headers = self._rest_client.post(url, data=request_param.content(), headers=request_param.extra_headers(sub_id),
-                                                  compress_format=self._compress_format)
-
-        result = GetPBRecordsResult.parse_content(content, headers=headers, record_schema=record_schema)
-
-        return result
+        return ApiRequest(HTTPMethod.POST, url,
+                          functools.partial(GetPBRecordsResult.parse_content, record_schema=record_schema,
+                                            integrity_checker=self._integrity_checker),
+                          cpu_bound=True, data=request_param.content(), headers=request_param.extra_headers(sub_id),
+                          compress_format=self._compress_format)
 
 
 class DataHubBatch(DataHubJson):
@@ -938,10 +1015,12 @@ class DataHubBatch(DataHubJson):
         super().__init__(access_id, access_key, endpoint, compress_format, enable_schema_register, credential=credential, **kwargs)
         self._schema_register = SchemaRegistryClient(self) if enable_schema_register else None
 
-    def put_records(self, project_name, topic_name, record_list):
-        raise DatahubException("This method is not supported for batch client, please use put_records_by_shard")
-
     def put_records_by_shard(self, project_name, topic_name, shard_id, record_list):
+        if not isinstance(record_list, PutPreparedRecordsRequestParams):
+            record_list = self.prepare_records_by_shard(project_name, topic_name, shard_id, record_list)
+        return self._send_request(self.build_put_records_by_shard_request(project_name, topic_name, shard_id, record_list))
+
+    def prepare_records_by_shard(self, project_name, topic_name, shard_id, record_list):
         if check_empty(project_name):
             raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
         if check_empty(topic_name):
@@ -952,21 +1031,54 @@ class DataHubBatch(DataHubJson):
         if record_list is None or len(record_list) == 0:
             raise InvalidParameterException("Record list is null or empty")
 
-        url = Path.SHARD % (project_name, topic_name, shard_id)
         request_param = PutBatchRecordsRequestParams(record_list, project_name, topic_name, self._compress_format,
-                                                     self._schema_register)
-        content, headers = self._rest_client.post(url, data=request_param.content(), headers=request_param.extra_headers())
+                                                     self._schema_register, self._rest_client.compress_policy)
+        return PutPreparedRecordsRequestParams(request_param.content(), request_param.extra_headers(), len(record_list))
 
-        result = PutRecordsByShardResult.parse_content(content, headers=headers)
+    def get_tuple_columns(self, project_name, topic_name, sub_id, shard_id, record_schema, cursor, limit_num):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+        if check_empty(shard_id):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'shard_id')
+        if check_empty(cursor):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'cursor')
+        if record_schema is None:
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'record_schema')
+
+        url = Path.SHARD % (project_name, topic_name, shard_id)
+        request_param = GetBatchRecordsRequestParams(cursor, limit_num)
+
+        content, headers = self._rest_client.post(url, data=request_param.content(), headers=request_param.extra_headers(sub_id),
+                                                  compress_format=self._compress_format)
+        result = GetBatchColumnsResult.parse_content(content, headers=headers, record_schema=record_schema,
+                                                     integrity_checker=self._integrity_checker)
         return result
 
-    def get_blob_records(self, project_name, topic_name, sub_id, shard_id, cursor, limit_num):
-        return self.__get_records(project_name, topic_name, sub_id, shard_id, cursor, limit_num)
+    def register_compress_dictionary(self, project_name, topic_name, record_schema, dict_data):
+        if check_empty(project_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
+        if check_empty(topic_name):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'topic_name')
+        if self._schema_register is None:
+            raise DatahubException('register_compress_dictionary api requires schema register enabled')
+        return self._schema_register.register_dictionary(project_name, topic_name, record_schema, dict_data)
+
+    def build_put_records_request(self, project_name, topic_name, record_list):
+        raise DatahubException("This method is not supported for batch client, please use put_records_by_shard")
 
-    def get_tuple_records(self, project_name, topic_name, sub_id, shard_id, record_schema, cursor, limit_num):
-        return self.__get_records(project_name, topic_name, sub_id, shard_id, cursor, limit_num, record_schema)
+    def build_put_records_by_shard_request(self, project_name, topic_name, shard_id, prepared_records):
+        if check_empty(project_name) or check_empty(topic_name) or check_empty(shard_id):
+            raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name, topic_name or shard_id')
 
-    def __get_records(self, project_name, topic_name, sub_id, shard_id, cursor, limit_num, record_schema=None):
+        url = Path.SHARD % (project_name, topic_name, shard_id)
+
+        return ApiRequest(HTTPMethod.POST, url, PutRecordsByShardResult.parse_content, data=prepared_records.content(),
+                          headers=prepared_records.extra_headers())
+
+    def build_get_records_request(self, project_name, topic_name, sub_id, shard_id, cursor, limit_num, record_schema=None,
+                                  lazy_decode=False):
         if check_empty(project_name):
             raise InvalidParameterException(ErrorMessage.PARAMETER_EMPTY % 'project_name')
         if check_empty(topic_name):
@@ -979,9 +1091,11 @@ class DataHubBatch(DataHubJson):
         url = Path.SHARD % (project_name, topic_name, shard_id)
         request_param = GetBatchRecordsRequestParams(cursor, limit_num)
 
-        content, headers = self._rest_client.post(url, data=request_param.content(), headers=request_param.extra_headers(sub_id),
-                                                  compress_format=self._compress_format)
-        result = GetBatchRecordsResult.parse_content(content, headers=headers, record_schema=record_schema,
-                                                     project_name=project_name, topic_name=topic_name, init_schema=record_schema,
-                                                     schema_register=self._schema_register if record_schema else None)
-        return result
+        # batch records are decoded and the schema register may send sync requests when parsing
+        return ApiRequest(HTTPMethod.POST, url,
+                          functools.partial(GetBatchRecordsResult.parse_content, record_schema=record_schema,
+                                            project_name=project_name, topic_name=topic_name, init_schema=record_schema,
+                                            schema_register=self._schema_register if record_schema else None,
+                                            lazy_decode=lazy_decode, integrity_checker=self._integrity_checker),
+                          cpu_bound=True, data=request_param.content(), headers=request_param.extra_headers(sub_id),
+                          compress_format=self._compress_format)
@@ -21,6 +21,7 @@ from .schema import Field, RecordSchema, FieldType
 from .record import RecordType, Record, BlobRecord, TupleRecord, FailedRecord
 from .cursor import CursorType
 from .compress import CompressFormat
+from .integrity import IntegrityMode
 from .shard import ShardState, Shard, ShardContext, ShardBase
 from .connector import ConnectorConfig, ConnectorShardStatus, AuthMode, ConnectorState, PartitionMode, \
     OdpsConnectorConfig, DatabaseConnectorConfig, EsConnectorConfig, FcConnectorConfig, OssConnectorConfig, \
@@ -21,7 +21,7 @@
 from __future__ import absolute_import
 
 import abc
-import struct
+import threading
 import zlib
 from enum import Enum
 
@@ -30,32 +30,53 @@ import six
 
 from ..exceptions import DatahubException
 
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+DEFAULT_ZSTD_LEVEL = 3
+DEFAULT_ZSTD_DICT_SIZE = 16 * 1024
+DEFAULT_MIN_COMPRESS_SIZE = 1024
+DEFAULT_COMPRESS_SAMPLE_SIZE = 4096
+DEFAULT_MAX_COMPRESS_RATIO = 0.9
+DEFAULT_COMPRESS_RATIO_WEIGHT = 0.2
+DEFAULT_COMPRESS_PROBE_INTERVAL = 64
+
 
 class CompressFormat(Enum):
     """
-    CompressFormat enum class, there are: ``NONE``, ``LZ4``, ``ZLIB``, ``DEFLATE``
+    CompressFormat enum class, there are: ``NONE``, ``LZ4``, ``ZLIB``, ``DEFLATE``, ``ZSTD``
+
+    ZSTD requires the ``zstandard`` package, the level can be changed by ``get_compressor(CompressFormat.ZSTD).level``
     """
     NONE = ''
     DEFLATE = 'deflate'
     LZ4 = 'lz4'
     ZLIB = 'zlib'
+    ZSTD = 'zstd'
 
     def get_index(self):
         return {
             CompressFormat.NONE: 0,
             CompressFormat.DEFLATE: 1,
             CompressFormat.LZ4: 2,
-            CompressFormat.ZLIB: 3
+            CompressFormat.ZLIB: 3,
+            CompressFormat.ZSTD: 4
         }[self]
 
     @staticmethod
     def get_compress(index):
-        return {
-            0: CompressFormat.NONE,
-            1: CompressFormat.DEFLATE,
-            2: CompressFormat.LZ4,
-            3: CompressFormat.ZLIB
-        }[index]
+        try:
+            return {
+                0: CompressFormat.NONE,
+                1: CompressFormat.DEFLATE,
+                2: CompressFormat.LZ4,
+                3: CompressFormat.ZLIB,
+                4: CompressFormat.ZSTD
+            }[index]
+        except KeyError:
+            raise DatahubException("Unknown compress index: {}".format(index))
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -101,8 +122,10 @@ class Lz4Compressor(Compressor):
         return lz4.block.compress(data, store_size=False)
 
     def decompress(self, data, raw_size=-1):
-        size_header = struct.pack('<I', raw_size)
-        return lz4.block.decompress(size_header + data)
+        # data is a raw lz4 block without size header, pass the size directly instead of copying data after a header
+        if raw_size < 0:
+            raise DatahubException("Lz4 decompress requires the raw size of data")
+        return lz4.block.decompress(data, uncompressed_size=raw_size)
 
     def compress_format(self):
         return CompressFormat.LZ4
@@ -125,35 +148,231 @@ class ZlibCompressor(Compressor):
 
 class DeflateCompressor(Compressor):
     """
-    Deflate compressor
+    Deflate compressor, raw deflate stream without zlib header and checksum
     """
 
     def compress(self, data):
-        return data
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush()
 
     def decompress(self, data, raw_size=-1):
-        return data
+        return zlib.decompress(data, -zlib.MAX_WBITS, raw_size if raw_size > 0 else zlib.DEF_BUF_SIZE)
 
     def compress_format(self):
         return CompressFormat.DEFLATE
 
 
+class ZstdCompressor(Compressor):
+    """
+    Zstd compressor, compress with the dictionary if it is given.
+    The frame written with a dictionary holds the dictionary id, it is decompressed by the registered dictionary.
+    """
+
+    def __init__(self, level=DEFAULT_ZSTD_LEVEL, dictionary=None):
+        self._level = level
+        self._dictionary = dictionary
+        # zstd compressor and decompressor are not thread safe
+        self._local = threading.local()
+
+    @property
+    def level(self):
+        return self._level
+
+    @level.setter
+    def level(self, value):
+        self._level = value
+        self._local = threading.local()
+
+    @property
+    def dictionary(self):
+        return self._dictionary
+
+    def compress(self, data):
+        compressor = getattr(self._local, 'compressor', None)
+        if compressor is None:
+            compressor = zstd.ZstdCompressor(level=self._level, dict_data=self._dictionary)
+            self._local.compressor = compressor
+        return compressor.compress(data)
+
+    def decompress(self, data, raw_size=-1):
+        dict_id = zstd.get_frame_parameters(data).dict_id
+        if dict_id and (self._dictionary is None or dict_id != self._dictionary.dict_id()):
+            return get_zstd_dict_compressor(dict_id).decompress(data, raw_size)
+        decompressor = getattr(self._local, 'decompressor', None)
+        if decompressor is None:
+            decompressor = zstd.ZstdDecompressor(dict_data=self._dictionary)
+            self._local.decompressor = decompressor
+        return decompressor.decompress(data, max_output_size=max(raw_size, 0))
+
+    def compress_format(self):
+        return CompressFormat.ZSTD
+
+
 none_compressor = NoneCompressor()
 lz4_compressor = Lz4Compressor()
 zlib_compressor = ZlibCompressor()
 deflate_compressor = DeflateCompressor()
+zstd_compressor = ZstdCompressor()
 
 _compressor_dict = {
     CompressFormat.NONE: none_compressor,
     CompressFormat.DEFLATE: deflate_compressor,
     CompressFormat.LZ4: lz4_compressor,
-    CompressFormat.ZLIB: zlib_compressor
+    CompressFormat.ZLIB: zlib_compressor,
+    CompressFormat.ZSTD: zstd_compressor
 }
 
 
+class CompressPolicy(object):
+    """
+    Adaptive compress policy, decide whether a payload is worth compressing
+
+    A payload is not compressed if it is smaller than ``min_size``. The moving compression ratio (compressed / raw)
+    is tracked for each key (topic or shard), payloads of a key whose ratio is above ``max_ratio`` are sent
+    uncompressed, and compressed again every ``probe_interval`` payloads to follow the change of data.
+    The first ``sample_size`` bytes of a large payload are compressed to estimate the ratio if the key is unknown.
+
+    The decisions are counted in ``metrics``.
+    """
+
+    METRIC_NAMES = ('compressed', 'not_smaller', 'skipped_small', 'skipped_sampled', 'skipped_ratio', 'probed',
+                    'raw_bytes', 'compressed_bytes')
+
+    def __init__(self, min_size=DEFAULT_MIN_COMPRESS_SIZE, sample_size=DEFAULT_COMPRESS_SAMPLE_SIZE,
+                 max_ratio=DEFAULT_MAX_COMPRESS_RATIO, ratio_weight=DEFAULT_COMPRESS_RATIO_WEIGHT,
+                 probe_interval=DEFAULT_COMPRESS_PROBE_INTERVAL):
+        self._min_size = min_size
+        self._sample_size = sample_size
+        self._max_ratio = max_ratio
+        self._ratio_weight = ratio_weight
+        self._probe_interval = probe_interval
+        self._ratios = dict()           # key --> [moving ratio, skipped count]
+        self._metrics = dict((name, 0) for name in CompressPolicy.METRIC_NAMES)
+        self._lock = threading.Lock()
+
+    @property
+    def min_size(self):
+        return self._min_size
+
+    @property
+    def sample_size(self):
+        return self._sample_size
+
+    @property
+    def max_ratio(self):
+        return self._max_ratio
+
+    @property
+    def metrics(self):
+        """
+        Snapshot of decision counters, and raw/compressed bytes of compressed payloads
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+    def get_ratio(self, key):
+        """
+        Moving compression ratio of the key, None if unknown
+        """
+        with self._lock:
+            state = self._ratios.get(key)
+            return state[0] if state else None
+
+    def compress(self, compressor, data, key=None):
+        """
+        Compress data if it is worth, return the compressed data, or None if data should be sent uncompressed
+        """
+        raw_size = len(data)
+        if raw_size < self._min_size:
+            self.__count('skipped_small')
+            return None
+
+        with self._lock:
+            state = self._ratios.get(key)
+            if state is not None and state[0] > self._max_ratio:
+                state[1] += 1
+                if state[1] < self._probe_interval:
+                    self._metrics['skipped_ratio'] += 1
+                    return None
+                state[1] = 0
+                self._metrics['probed'] += 1
+
+        if state is None and raw_size > self._sample_size:
+            sample_ratio = len(compressor.compress(data[:self._sample_size])) / float(self._sample_size)
+            if sample_ratio > self._max_ratio:
+                self.__update_ratio(key, sample_ratio)
+                self.__count('skipped_sampled')
+                return None
+
+        compressed = compressor.compress(data)
+        self.__update_ratio(key, len(compressed) / float(raw_size))
+        if len(compressed) >= raw_size:
+            self.__count('not_smaller')
+            return None
+        with self._lock:
+            self._metrics['compressed'] += 1
+            self._metrics['raw_bytes'] += raw_size
+            self._metrics['compressed_bytes'] += len(compressed)
+        return compressed
+
+    def __count(self, name):
+        with self._lock:
+            self._metrics[name] += 1
+
+    def __update_ratio(self, key, ratio):
+        with self._lock:
+            state = self._ratios.get(key)
+            if state is None:
+                self._ratios[key] = [ratio, 0]
+            else:
+                state[0] += (ratio - state[0]) * self._ratio_weight
+
+
+_zstd_dict_compressor_dict = dict()         # dict id --> ZstdCompressor with the dictionary
+_zstd_dict_lock = threading.Lock()
+
+
+def train_zstd_dictionary(samples, dict_size=DEFAULT_ZSTD_DICT_SIZE):
+    """
+    Train a zstd dictionary from the sample payloads, return the dictionary data
+    """
+    _check_zstd()
+    try:
+        return zstd.train_dictionary(dict_size, [bytes(sample) for sample in samples]).as_bytes()
+    except zstd.ZstdError as e:
+        raise DatahubException("Train zstd dictionary fail. {}".format(e))
+
+
+def register_zstd_dictionary(dict_data, level=DEFAULT_ZSTD_LEVEL):
+    """
+    Register the dictionary for decompress, return the ZstdCompressor with the dictionary
+    """
+    _check_zstd()
+    dictionary = zstd.ZstdCompressionDict(dict_data)
+    dict_id = dictionary.dict_id()
+    with _zstd_dict_lock:
+        if dict_id not in _zstd_dict_compressor_dict:
+            _zstd_dict_compressor_dict[dict_id] = ZstdCompressor(level, dictionary)
+        return _zstd_dict_compressor_dict[dict_id]
+
+
+def get_zstd_dict_compressor(dict_id):
+    compressor = _zstd_dict_compressor_dict.get(dict_id)
+    if compressor is None:
+        raise DatahubException("Zstd dictionary {} not found, please register it first".format(dict_id))
+    return compressor
+
+
+def _check_zstd():
+    if zstd is None:
+        raise DatahubException("Zstd compress requires zstandard, please install it by 'pip install zstandard'")
+
+
 def get_compressor(compress_format):
     try:
         compress_format = CompressFormat(compress_format) if compress_format else CompressFormat.NONE
     except ValueError as e:
         raise DatahubException(e)
+    if compress_format == CompressFormat.ZSTD:
+        _check_zstd()
     return _compressor_dict.get(compress_format, None)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import absolute_import
+
+import random
+from enum import Enum
+
+from ..exceptions import InvalidParameterException
+
+
+class IntegrityMode(Enum):
+    """
+    Crc check mode of records read from datahub, there are: ``FULL``, ``OUTER_ONLY``, ``SAMPLED``, ``OFF``
+
+    FULL: check the crc of the pb frame and the crc of every batch in it
+
+    OUTER_ONLY: check the crc of the pb frame only, the batch crc covers the same bytes
+
+    SAMPLED: check all crc of a response with the sample rate
+
+    OFF: never check crc
+    """
+    FULL = 'full'
+    OUTER_ONLY = 'outer_only'
+    SAMPLED = 'sampled'
+    OFF = 'off'
+
+
+DEFAULT_INTEGRITY_SAMPLE_RATE = 0.1
+
+
+class IntegrityChecker(object):
+    """
+    Decide which crc should be checked for one response according to the integrity mode
+    """
+
+    __slots__ = ('_mode', '_sample_rate')
+
+    def __init__(self, mode=IntegrityMode.FULL, sample_rate=DEFAULT_INTEGRITY_SAMPLE_RATE):
+        try:
+            self._mode = IntegrityMode(mode) if mode else IntegrityMode.FULL
+        except ValueError as e:
+            raise InvalidParameterException(e)
+        if not 0 <= sample_rate <= 1:
+            raise InvalidParameterException('Integrity sample rate should be in [0, 1], got %s' % sample_rate)
+        self._sample_rate = sample_rate
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def sample_rate(self):
+        return self._sample_rate
+
+    def check_response(self):
+        """
+        Return (check outer frame crc, check inner batch crc) for one response
+        """
+        if self._mode == IntegrityMode.FULL:
+            return True, True
+        if self._mode == IntegrityMode.OUTER_ONLY:
+            return True, False
+        if self._mode == IntegrityMode.SAMPLED:
+            check = random.random() < self._sample_rate
+            return check, check
+        return False, False
+
+
+full_integrity_checker = IntegrityChecker()
@@ -23,14 +23,15 @@ import abc
 import json
 
 import six
-from ..proto.proto_utils import encode_proto
+from ..proto.proto_utils import encode_proto, encode_put_records_request, encode_put_binary_records_request
 
 from ..batch.batch_serializer import BatchSerializer
+from ..batch.columnar import ColumnBatch
 from ..batch.utils import SchemaObject
 from ..models import CursorType, RecordType, RecordSchema
-from ..proto.datahub_pb2 import PutRecordsRequest, GetRecordsRequest, PutBinaryRecordsRequest
+from ..proto.datahub_pb2 import GetRecordsRequest
 from ..rest import ContentType, Headers
-from ..utils import pb_message_wrap
+from ..utils import pb_message_wrap, json_dumps
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -373,7 +374,7 @@ class PutRecordsRequestParams(RequestParams):
         self._record_list = value
 
     def content(self):
-        return json.dumps({
+        return json_dumps({
             "Action": PutRecordsRequestParams.action,
             "Records": [record.to_json() for record in self._record_list]
         })
@@ -384,12 +385,7 @@ class PutPBRecordsRequestParams(PutRecordsRequestParams):
     Protobuf Request params of put records api
     """
     def content(self):
-        pb_put_record_request = {
-            'records': []
-        }
-        for record in self._record_list:
-            pb_put_record_request['records'].append(record.to_pb_record_entry())
-        pb_data = encode_proto(PutRecordsRequest, pb_put_record_request)
+        pb_data = encode_put_records_request([record.encode_pb_record_entry() for record in self._record_list])
         return pb_message_wrap(pb_data)
 
     @staticmethod
@@ -400,26 +396,54 @@ class PutPBRecordsRequestParams(PutRecordsRequestParams):
         }
 
 
+class PutPreparedRecordsRequestParams(RequestParams):
+    """
+    Request params of put records by shard, the content is serialized and compressed in advance
+    """
+
+    __slots__ = ('_data', '_headers', '_record_count')
+
+    def __init__(self, data, headers, record_count):
+        self._data = data
+        self._headers = headers
+        self._record_count = record_count
+
+    @property
+    def record_count(self):
+        return self._record_count
+
+    def content(self):
+        return self._data
+
+    def extra_headers(self):
+        return self._headers
+
+    def __len__(self):
+        return self._record_count
+
+
 class PutBatchRecordsRequestParams(PutRecordsRequestParams):
     """
     Batch Request params of put records api
     """
 
-    def __init__(self, record_list, project_name, topic_name, compress_type, schema_register):
+    def __init__(self, record_list, project_name, topic_name, compress_type, schema_register, compress_policy=None):
         super().__init__(record_list)
         self._project_name = project_name
         self._topic_name = topic_name
         self._compress_type = compress_type
         self._schema_register = schema_register
+        self._compress_policy = compress_policy
 
     def content(self):
         schema_object = SchemaObject(self._project_name, self._topic_name, self._schema_register)
-        record_data = BatchSerializer.serialize(self._compress_type, schema_object, self._record_list)
-        batch_put_record_request = {
-            'records': [{'data': record_data}]
-        }
-        batch_data = encode_proto(PutBinaryRecordsRequest, batch_put_record_request)
-        return pb_message_wrap(batch_data)
+        if isinstance(self._record_list, ColumnBatch):
+            record_data = BatchSerializer.serialize_columns(self._compress_type, schema_object, self._record_list,
+                                                            self._compress_policy)
+        else:
+            record_data = BatchSerializer.serialize(self._compress_type, schema_object, self._record_list,
+                                                    self._compress_policy)
+        return pb_message_wrap(encode_put_binary_records_request(record_data))
 
     @staticmethod
     def extra_headers():
@@ -19,9 +19,9 @@
 
 from __future__ import absolute_import
 
-import re
 import abc
 import base64
+import binascii
 from enum import Enum
 
 import six
@@ -29,7 +29,58 @@ import six
 from . import types as _types
 from .schema import RecordSchema, FieldType
 from ..exceptions import InvalidParameterException
-from ..utils import ErrorMessage, indent, to_str, bool_to_str, to_binary
+from ..proto.proto_utils import encode_record_entry
+from ..utils import ErrorMessage, indent, to_str, bool_to_str, double_to_str, to_binary
+
+
+MAX_WIRE_SCHEMA_CACHE_SIZE = 1024
+
+
+class WireSchema(object):
+    """
+    Precompiled converters of a record schema, shared by all TupleRecord built from wire with the schema
+    """
+
+    __slots__ = ('_schema', '_field_list', '_name_indices', '_converters')
+
+    def __init__(self, schema):
+        self._schema = schema
+        self._field_list = list(schema.field_list)
+        if len(self._field_list) == 0:
+            raise InvalidParameterException(ErrorMessage.MISSING_TUPLE_RECORD_SCHEMA)
+        self._name_indices = dict((field.name, index) for index, field in enumerate(self._field_list))
+        self._converters = [_types.get_wire_converter(field) for field in self._field_list]
+
+    @property
+    def schema(self):
+        return self._schema
+
+    @property
+    def field_list(self):
+        return self._field_list
+
+    @property
+    def name_indices(self):
+        return self._name_indices
+
+    @property
+    def converters(self):
+        return self._converters
+
+
+_wire_schema_cache = dict()
+
+
+def get_wire_schema(schema):
+    wire_schema = _wire_schema_cache.get(id(schema))
+    # the cache holds the schema, so the id is not reused, schema may be changed by add_field
+    if wire_schema is None or wire_schema.schema is not schema \
+            or len(wire_schema.field_list) != len(schema.field_list):
+        wire_schema = WireSchema(schema)
+        if len(_wire_schema_cache) >= MAX_WIRE_SCHEMA_CACHE_SIZE:
+            _wire_schema_cache.clear()
+        _wire_schema_cache[id(schema)] = wire_schema
+    return wire_schema
 
 
 class RecordType(Enum):
@@ -167,6 +218,10 @@ class Record(object):
     def encode_pb_record_data(self):
         pass
 
+    @abc.abstractmethod
+    def encode_pb_values(self):
+        pass
+
     def to_json(self):
         data = {
             "Data": self.encode_values(),
@@ -203,6 +258,13 @@ class Record(object):
             }
         return pb_record_entry
 
+    def encode_pb_record_entry(self):
+        """
+        Serialize the record to protobuf RecordEntry bytes directly
+        """
+        return encode_record_entry(self._shard_id, self._hash_key, self._partition_key, self._attributes,
+                                   self.encode_pb_values())
+
     def __repr__(self):
         return to_str(self.to_json())
 
@@ -220,13 +282,17 @@ class BlobRecord(Record):
         if blob_data:
             self._blob_data = to_binary(blob_data)
         elif values is not None:
+            # base64 values read by json protocol are decoded on the first access of blob_data
             self._values = values
-            self._blob_data = base64.b64decode(self._values)
+            self._blob_data = None
         else:
             raise InvalidParameterException(ErrorMessage.MISSING_BLOB_RECORD_DATA)
 
     @property
     def blob_data(self):
+        if self._blob_data is None:
+            # a2b_base64 reads ascii str directly, b64decode would encode it to bytes first
+            self._blob_data = binascii.a2b_base64(self._values)
         return self._blob_data
 
     def get_type(self):
@@ -238,13 +304,16 @@ class BlobRecord(Record):
         return self._values
 
     def decode_values(self):
-        return self._blob_data
+        return self.blob_data
 
     def encode_pb_record_data(self):
         return {
-            'data': [{'value': self._blob_data}]
+            'data': [{'value': self.blob_data}]
         }
 
+    def encode_pb_values(self):
+        return [self.blob_data]
+
 
 class TupleRecord(Record):
     """
@@ -340,16 +409,13 @@ class TupleRecord(Record):
 
     def encode_values(self):
         new_values = []
-        index = 0
-        for val in self._values:
-            if FieldType.BOOLEAN == self._field_list[index].type:
+        for field, val in zip(self._field_list, self._values):
+            if FieldType.BOOLEAN == field.type:
                 new_values.append(bool_to_str(val))
-            elif FieldType.DOUBLE == self._field_list[index].type:
-                double_str = re.sub(r'0+e', 'e', '%.16e' % val) if val is not None else None
-                new_values.append(to_str(double_str))
+            elif FieldType.DOUBLE == field.type:
+                new_values.append(double_to_str(val))
             else:
                 new_values.append(to_str(val))
-            index += 1
         return new_values
 
     def decode_values(self):
@@ -368,6 +434,30 @@ class TupleRecord(Record):
             index += 1
         return pb_record_data
 
+    def encode_pb_values(self):
+        return [to_binary(bool_to_str(val)) if FieldType.BOOLEAN == field.type else to_binary(val)
+                for field, val in zip(self._field_list, self._values)]
+
+    @classmethod
+    def from_wire(cls, schema, values):
+        """
+        Build record from the field values read from server, values are bytes, text or decoded values.
+        The values are already validated by server, so they are only converted by the precompiled
+        converters of schema, without type inference and range check.
+        """
+        wire_schema = get_wire_schema(schema)
+        record = cls.__new__(cls)
+        Record.__init__(record)
+        record._field_list = wire_schema.field_list
+        record._name_indices = wire_schema.name_indices
+        try:
+            record._values = [converter(value) for converter, value in zip(wire_schema.converters, values)]
+        except (TypeError, ValueError) as e:
+            raise InvalidParameterException(e)
+        if len(record._values) < len(record._field_list):
+            record._values.extend([None] * (len(record._field_list) - len(record._values)))
+        return record
+
     def _set_values(self, values):
         for index, value in enumerate(values):
             if index >= len(self._field_list):
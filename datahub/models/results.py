@@ -20,22 +20,24 @@
 from __future__ import absolute_import
 
 import abc
-import json
 
 import six
 
 from datahub.exceptions import DatahubException
 from .connector import ConnectorType, ConnectorState, get_connector_builder_by_type, \
     ConnectorShardStatus, ShardStatusEntry
+from .integrity import full_integrity_checker
 from .record import FailedRecord, BlobRecord, TupleRecord, RecordType
 from .schema import RecordSchema
 from .shard import Shard, ShardBase, ShardContext
 from .subscription import Subscription, OffsetWithBatchIndex
 from ..batch.batch_serializer import BatchSerializer
+from ..batch.columnar import ColumnarDeserializer
 from ..batch.utils import SchemaObject
-from ..proto.datahub_pb2 import GetRecordsResponse, PutRecordsResponse, GetBinaryRecordsResponse
+from ..proto.datahub_pb2 import PutRecordsResponse, GetBinaryRecordsResponse
+from ..proto.proto_utils import decode_get_records_response
 from ..rest import Headers
-from ..utils import to_text, unwrap_pb_frame
+from ..utils import to_text, unwrap_pb_frame, json_loads
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -105,7 +107,7 @@ class ListProjectResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         return cls(content['ProjectNames'], headers.get(Headers.REQUEST_ID, ''))
 
     def to_json(self):
@@ -171,7 +173,7 @@ class GetProjectResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         return cls(kwargs['project_name'], content['Comment'], content['CreateTime'], content['LastModifyTime'], headers.get(Headers.REQUEST_ID, ''))
 
     def to_json(self):
@@ -246,7 +248,7 @@ class ListTopicResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         return cls(content['TopicNames'], headers.get(Headers.REQUEST_ID, ''))
 
     def to_json(self):
@@ -372,7 +374,7 @@ class GetTopicResult(Result):
         project_name = kwargs['project_name'] if 'project_name' in kwargs else ''
         topic_name = kwargs['topic_name'] if 'topic_name' in kwargs else ''
 
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         comment = content.get('Comment', '')
         shard_count = content.get('ShardCount', 0)
         life_cycle = content.get('Lifecycle', 0)
@@ -483,7 +485,7 @@ class ListShardResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         shards = [Shard.from_dict(item) for item in content['Shards']]
         protocol = content['Protocol']
         interval = content['Interval']
@@ -517,7 +519,7 @@ class MergeShardResult(ShardBase, Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         return cls(content['ShardId'], content['BeginHashKey'], content['EndHashKey'], headers.get(Headers.REQUEST_ID, ''))
 
     def to_json(self):
@@ -548,7 +550,7 @@ class SplitShardResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         new_shards = [ShardBase.from_dict(item) for item in content['NewShards']]
         return cls(new_shards, headers.get(Headers.REQUEST_ID, ''))
 
@@ -617,7 +619,7 @@ class GetCursorResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         return cls(content['Cursor'], content['RecordTime'], content['Sequence'], headers.get(Headers.REQUEST_ID, ''))
 
     def to_json(self):
@@ -663,7 +665,7 @@ class PutRecordsResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         failed_records = [
             FailedRecord(item['Index'], item['ErrorCode'], item['ErrorMessage'])
             for item in content['FailedRecords']
@@ -765,7 +767,7 @@ class GetRecordsResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
 
         records = []
         for item in content['Records']:
@@ -774,7 +776,7 @@ class GetRecordsResult(Result):
                 record = BlobRecord(values=data)
             else:
                 record_schema = kwargs['record_schema']
-                record = TupleRecord(schema=record_schema, values=data)
+                record = TupleRecord.from_wire(record_schema, data)
             if 'Attributes' in item:
                 record.attributes = item['Attributes']
             record.sequence = item['Sequence']
@@ -798,32 +800,26 @@ class GetPBRecordsResult(GetRecordsResult):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        crc, compute_crc, pb_str = unwrap_pb_frame(content)
+        check_outer, check_inner = kwargs.get('integrity_checker', full_integrity_checker).check_response()
+        crc, compute_crc, pb_str = unwrap_pb_frame(content, check_outer)
         if crc != compute_crc:
             raise DatahubException('Parse pb response body fail, error: crc check error. crc: %s, compute crc: %s'
                                    % (crc, compute_crc))
 
-        pb_get_record_response = GetRecordsResponse()
-        pb_get_record_response.ParseFromString(pb_str)
-        next_cursor = pb_get_record_response.next_cursor
-        record_count = pb_get_record_response.record_count
-        start_sequence = pb_get_record_response.start_sequence
+        response = decode_get_records_response(pb_str)
+        record_schema = kwargs['record_schema']
         records = []
-        for pb_record in pb_get_record_response.records:
-            record_schema = kwargs['record_schema']
+        for values, attributes, sequence, system_time in response.records():
             if record_schema:
-                values = [bp_field_data.value for bp_field_data in pb_record.data.data]
-                record = TupleRecord(schema=record_schema)
-                record._set_values(values)
+                record = TupleRecord.from_wire(record_schema, values)
             else:
-                record = BlobRecord(blob_data=pb_record.data.data[0].value)
-            record._attributes = {
-                attribute.key: attribute.value for attribute in pb_record.attributes.attributes
-            }
-            record.system_time = pb_record.system_time
-            record.sequence = pb_record.sequence
+                record = BlobRecord(blob_data=values[0])
+            record._attributes = attributes
+            record.system_time = system_time
+            record.sequence = sequence
             records.append(record)
-        return cls(next_cursor, record_count, start_sequence, records, headers.get(Headers.REQUEST_ID, ''))
+        return cls(response.next_cursor, response.record_count, response.start_sequence, records,
+                   headers.get(Headers.REQUEST_ID, ''))
 
 
 class GetBatchRecordsResult(GetRecordsResult):
@@ -833,7 +829,8 @@ class GetBatchRecordsResult(GetRecordsResult):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        crc, compute_crc, pb_str = unwrap_pb_frame(content)
+        check_outer, check_inner = kwargs.get('integrity_checker', full_integrity_checker).check_response()
+        crc, compute_crc, pb_str = unwrap_pb_frame(content, check_outer)
         if crc != compute_crc:
             raise DatahubException('Parse pb response body fail, error: crc check error. crc: %s, compute crc: %s'
                                    % (crc, compute_crc))
@@ -842,6 +839,7 @@ class GetBatchRecordsResult(GetRecordsResult):
         topic_name = kwargs['topic_name']
         init_schema = kwargs['init_schema']
         schema_register = kwargs['schema_register']
+        lazy_decode = kwargs.get('lazy_decode', False)
 
         pb_get_record_response = GetBinaryRecordsResponse()
         pb_get_record_response.ParseFromString(pb_str)
@@ -853,7 +851,7 @@ class GetBatchRecordsResult(GetRecordsResult):
         for i in range(pb_get_record_response.record_count):
             pb_record = pb_get_record_response.records[i]
             byte_data = pb_record.data
-            records_list = BatchSerializer.deserialize(init_schema, schema_object, byte_data)
+            records_list = BatchSerializer.deserialize(init_schema, schema_object, byte_data, lazy_decode, check_inner)
             index, records_len = 0, len(records_list)
             for record in records_list:
                 record.system_time = pb_record.system_time
@@ -866,6 +864,68 @@ class GetBatchRecordsResult(GetRecordsResult):
         return cls(next_cursor, record_count, start_sequence, total_records_list, headers.get(Headers.REQUEST_ID, ''))
 
 
+class GetBatchColumnsResult(Result):
+    """
+    Columnar Result of get records api, only for batch protocol
+
+    Members:
+        next_cursor (:class:`str`): next cursor
+
+        record_count (:class:`int`): record count
+
+        start_seq (:class:`int`): start sequence
+
+        columns (:class:`datahub.batch.columnar.ColumnBatch`): records in columns
+    """
+
+    __slots__ = ('_next_cursor', '_record_count', '_start_seq', '_columns')
+
+    def __init__(self, next_cursor, record_count, start_seq, columns, request_id):
+        super().__init__(request_id)
+        self._next_cursor = next_cursor
+        self._record_count = record_count
+        self._start_seq = start_seq
+        self._columns = columns
+
+    @property
+    def next_cursor(self):
+        return self._next_cursor
+
+    @property
+    def record_count(self):
+        return self._record_count
+
+    @property
+    def start_seq(self):
+        return self._start_seq
+
+    @property
+    def columns(self):
+        return self._columns
+
+    @classmethod
+    def parse_content(cls, content, headers, **kwargs):
+        check_outer, check_inner = kwargs.get('integrity_checker', full_integrity_checker).check_response()
+        crc, compute_crc, pb_str = unwrap_pb_frame(content, check_outer)
+        if crc != compute_crc:
+            raise DatahubException('Parse pb response body fail, error: crc check error. crc: %s, compute crc: %s'
+                                   % (crc, compute_crc))
+
+        pb_get_record_response = GetBinaryRecordsResponse()
+        pb_get_record_response.ParseFromString(pb_str)
+        raw_buffers = [BatchSerializer.convert_byte_to_raw_buffer(pb_record.data, check_inner) for pb_record in pb_get_record_response.records]
+        columns = ColumnarDeserializer.deserialize(kwargs['record_schema'], raw_buffers)
+        return cls(pb_get_record_response.next_cursor, columns.record_count, pb_get_record_response.start_sequence,
+                   columns, headers.get(Headers.REQUEST_ID, ''))
+
+    def to_json(self):
+        return {
+            'NextCursor': self._next_cursor,
+            'RecordCount': self._record_count,
+            'StartSeq': self._start_seq
+        }
+
+
 class GetMeteringInfoResult(Result):
     """
     Result of get metering info api;
@@ -901,7 +961,7 @@ class GetMeteringInfoResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         return cls(content['ActiveTime'], content['Storage'], headers.get(Headers.REQUEST_ID, ''))
 
     def to_json(self):
@@ -944,7 +1004,7 @@ class ListConnectorResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         return cls(content['Connectors'], content['Connectors'], headers.get(Headers.REQUEST_ID, ''))
 
     def to_json(self):
@@ -977,7 +1037,7 @@ class CreateConnectorResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         return cls(content.get('ConnectorId', ''), headers.get(Headers.REQUEST_ID, ''))
 
     def to_json(self):
@@ -1134,7 +1194,7 @@ class GetConnectorResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         cluster_addr = content.get('ClusterAddress', '')
         connector_id = content.get('ConnectorId', '')
         connector_type = ConnectorType(content['Type'])
@@ -1189,7 +1249,7 @@ class GetConnectorShardStatusResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         shard_status_infos = {}
         if 'ShardStatusInfos' in content:
             for (k, v) in content.get('ShardStatusInfos', {}).items():
@@ -1313,7 +1373,7 @@ class InitAndGetSubscriptionOffsetResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         offsets = {}
         for (k, v) in content['Offsets'].items():
             offsets.update({
@@ -1356,7 +1416,7 @@ class GetSubscriptionOffsetResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         offsets = {}
         for (k, v) in content['Offsets'].items():
             offsets.update({
@@ -1447,7 +1507,7 @@ class GetConnectorDoneTimeResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         done_time = content.get('DoneTime', 0)
         time_zone = content.get('TimeZone', '')
         time_window = content.get('TimeWindow', 0)
@@ -1485,7 +1545,7 @@ class CreateSubscriptionResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         return cls(content['SubId'], headers.get(Headers.REQUEST_ID, ''))
 
     def to_json(self):
@@ -1527,7 +1587,7 @@ class GetSubscriptionResult(Subscription, Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         topic_name = content.get('TopicName', '')
         sub_id = content.get('SubId', '')
         comment = content.get('Comment', '')
@@ -1572,7 +1632,7 @@ class ListSubscriptionResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         subscriptions = [Subscription.from_dict(item) for item in content['Subscriptions']]
         return cls(content['TotalCount'], subscriptions, headers.get(Headers.REQUEST_ID, ''))
 
@@ -1661,7 +1721,7 @@ class JoinGroupResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         consumer_id = content.get("ConsumerId", 0)
         version_id = content.get("VersionId", 0)
         session_timeout = content.get("SessionTimeout", 0)
@@ -1714,7 +1774,7 @@ class HeartBeatResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         plan_version = content.get("PlanVersion", 0)
         shard_list = content.get("ShardList", [])
         total_plan = content.get("TotalPlan", "")
@@ -1815,7 +1875,7 @@ class ListTopicSchemaResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         page_number = content.get("PageNumber", 0)
         page_size = content.get("PageSize", 0)
         page_count = content.get("PageCount", 0)
@@ -1881,7 +1941,7 @@ class GetTopicSchemaResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         version_id = content.get("VersionId", 0)
         create_time = content.get("CreateTime", 0)
         creator = content.get("Creator", 0)
@@ -1918,7 +1978,7 @@ class RegisterTopicSchemaResult(Result):
 
     @classmethod
     def parse_content(cls, content, headers, **kwargs):
-        content = json.loads(to_text(content))
+        content = json_loads(content)
         version_id = content.get("VersionId", 0)
         return cls(version_id, headers.get(Headers.REQUEST_ID, ''))
 
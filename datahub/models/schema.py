@@ -142,6 +142,7 @@ class RecordSchema(object):
     def __init__(self, field_list=None):
         self._field_list = field_list if field_list else []
         self._field_dict = {}
+        self._cache_key = None
 
         duplicates = set()
         for field in self._field_list:
@@ -157,10 +158,21 @@ class RecordSchema(object):
     def field_list(self):
         return self._field_list
 
+    @property
+    def cache_key(self):
+        """
+        Key of the objects cached for the schema, like the codec of binary records.
+        Schemas of the same fields have the same key, it is computed once until a field is added.
+        """
+        if self._cache_key is None:
+            self._cache_key = self.to_json_string()
+        return self._cache_key
+
     def add_field(self, field):
         if field.name not in self._field_dict:
             self._field_list.append(field)
             self._field_dict[field.name] = field
+            self._cache_key = None
         else:
             raise InvalidParameterException('Field name %s already exists' % field.name)
 
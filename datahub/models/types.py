@@ -337,3 +337,66 @@ def validate_value(value, field):
     result = _validate_builtin_value(value, datahub_type)
     datahub_type.validate_value(result)
     return result
+
+
+#####################################################################
+# below is converters of value read from server, which is already validated by server
+#####################################################################
+
+def _wire_to_int(value):
+    return int(value)
+
+
+def _wire_to_float(value):
+    return float(value)
+
+
+def _wire_to_decimal(value):
+    return decimal.Decimal(utils.to_text(value) if isinstance(value, (bytearray, six.binary_type)) else value)
+
+
+def _wire_to_bool(value):
+    if isinstance(value, bool_builtins):
+        return value
+    text = utils.to_text(value).lower()
+    if 'true' == text:
+        return True
+    elif 'false' == text:
+        return False
+    raise ValueError('can not cast to [%s] bool' % value)
+
+
+_wire_converters_dict = {
+    FieldType.TINYINT: _wire_to_int,
+    FieldType.SMALLINT: _wire_to_int,
+    FieldType.INTEGER: _wire_to_int,
+    FieldType.BIGINT: _wire_to_int,
+    FieldType.FLOAT: _wire_to_float,
+    FieldType.DOUBLE: _wire_to_float,
+    FieldType.STRING: utils.to_text,
+    FieldType.TIMESTAMP: _wire_to_int,
+    FieldType.BOOLEAN: _wire_to_bool,
+    FieldType.DECIMAL: _wire_to_decimal
+}
+
+
+def get_wire_converter(field):
+    """
+    Get the converter of field from wire value (bytes, text or decoded value) to python value,
+    it casts the value like validate_value but skips the type inference and range check
+    """
+    converter = _wire_converters_dict[field.type]
+    if field.type == FieldType.STRING:
+        return converter
+
+    if field.allow_null:
+        def convert(value):
+            if value is None or value == b'' or value == '':
+                return None
+            return converter(value)
+    else:
+        def convert(value):
+            if value is None:
+                raise InvalidParameterException('Field %s can not be none' % field.name)
+            return converter(value)
+    return convert
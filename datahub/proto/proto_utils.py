@@ -19,7 +19,10 @@
 
 """Protobuf serialization, replaces cprotobuf.internal.encode_data."""
 
+from google.protobuf.internal import api_implementation
+
 from datahub.proto.datahub_pb2 import (
+    GetRecordsResponse,
     PutRecordsRequest,
     PutBinaryRecordsRequest,
     GetRecordsRequest,
@@ -90,6 +93,372 @@ def _build_binary_record_entry(msg, d):
         msg.data = d['data']
 
 
+# Hand-written encoder of PutRecordsRequest, it writes the same bytes as protobuf without building messages.
+# Tags of length-delimited fields: (field number << 3) | 2
+_TAG_1 = b'\x0a'
+_TAG_2 = b'\x12'
+_TAG_3 = b'\x1a'
+_TAG_6 = b'\x32'
+_TAG_8 = b'\x42'
+_TAG_9 = b'\x4a'
+_EMPTY_FIELD_DATA = _TAG_1 + b'\x00'
+_SMALL_VARINT = [bytes(bytearray([i])) for i in range(128)]
+
+
+def _encode_varint(value):
+    if value < 128:
+        return _SMALL_VARINT[value]
+    buf = bytearray()
+    while value >= 128:
+        buf.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buf.append(value)
+    return bytes(buf)
+
+
+def _encode_bytes_field(tag, value):
+    return tag + _encode_varint(len(value)) + value
+
+
+def _to_bytes(value):
+    return value.encode('utf-8') if isinstance(value, str) else bytes(value)
+
+
+def encode_record_entry(shard_id, hash_key, partition_key, attributes, values):
+    """
+    Serialize a RecordEntry, values is the list of field value bytes, None value is written as empty FieldData
+    """
+    parts = []
+    if shard_id:
+        parts.append(_encode_bytes_field(_TAG_1, _to_bytes(shard_id)))
+    if hash_key:
+        parts.append(_encode_bytes_field(_TAG_2, _to_bytes(hash_key)))
+    if partition_key:
+        parts.append(_encode_bytes_field(_TAG_3, _to_bytes(partition_key)))
+    if attributes:
+        attribute_data = b''.join([
+            _encode_bytes_field(_TAG_1, _encode_bytes_field(_TAG_1, _to_bytes(k)) + _encode_bytes_field(_TAG_2, _to_bytes(v)))
+            for k, v in attributes.items()
+        ])
+        parts.append(_encode_bytes_field(_TAG_8, attribute_data))
+    record_data = b''.join([
+        _EMPTY_FIELD_DATA if value is None else _encode_bytes_field(_TAG_1, _encode_bytes_field(_TAG_1, value))
+        for value in values
+    ])
+    parts.append(_encode_bytes_field(_TAG_9, record_data))
+    return b''.join(parts)
+
+
+def encode_put_records_request(record_entries):
+    """
+    Serialize a PutRecordsRequest from the serialized RecordEntry list
+    """
+    return b''.join([_encode_bytes_field(_TAG_1, entry) for entry in record_entries])
+
+
+def encode_put_binary_records_request(batch_data):
+    """
+    Serialize a PutBinaryRecordsRequest of one BinaryRecordEntry, the batch data is copied only once
+    """
+    data_size = len(batch_data)
+    entry_size = 1 + len(_encode_varint(data_size)) + data_size
+    return b''.join([_TAG_1, _encode_varint(entry_size), _TAG_6, _encode_varint(data_size), batch_data])
+
+
+# Hand-written streaming decoder of GetRecordsResponse, records are decoded from the wire bytes one at a time
+# without building the protobuf message tree.
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH_DELIMITED = 2
+_WIRE_FIXED32 = 5
+_INT64_SIGN = 1 << 63
+_INT64_MOD = 1 << 64
+
+
+def _decode_varint(buffer, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 128:
+            return result, pos
+        shift += 7
+
+
+def _decode_int64(buffer, pos):
+    value, pos = _decode_varint(buffer, pos)
+    if value >= _INT64_SIGN:
+        value -= _INT64_MOD
+    return value, pos
+
+
+def _decode_tag(buffer, pos):
+    tag = buffer[pos]
+    if tag < 128:
+        return tag, pos + 1
+    return _decode_varint(buffer, pos)
+
+
+def _skip_field(buffer, pos, wire_type):
+    if wire_type == _WIRE_VARINT:
+        return _decode_varint(buffer, pos)[1]
+    if wire_type == _WIRE_LENGTH_DELIMITED:
+        length, pos = _decode_varint(buffer, pos)
+        return pos + length
+    if wire_type == _WIRE_FIXED64:
+        return pos + 8
+    if wire_type == _WIRE_FIXED32:
+        return pos + 4
+    raise ValueError('Unsupported wire type: %d' % wire_type)
+
+
+def _decode_string_pair(buffer, pos, end):
+    key, value = '', ''
+    while pos < end:
+        tag, pos = _decode_tag(buffer, pos)
+        if tag == 0x0a or tag == 0x12:
+            length, pos = _decode_varint(buffer, pos)
+            text = buffer[pos:pos + length].decode('utf-8')
+            pos += length
+            if tag == 0x0a:
+                key = text
+            else:
+                value = text
+        else:
+            pos = _skip_field(buffer, pos, tag & 0x07)
+    return key, value
+
+
+def _decode_attributes(buffer, pos, end):
+    attributes = {}
+    while pos < end:
+        tag, pos = _decode_tag(buffer, pos)
+        if tag != 0x0a:
+            pos = _skip_field(buffer, pos, tag & 0x07)
+            continue
+        length, pos = _decode_varint(buffer, pos)
+        pair_end = pos + length
+        # fast path: StringPair only holds key and value in order with one byte lengths
+        key_length = buffer[pos + 1] if length >= 4 else 0
+        value_pos = pos + 2 + key_length
+        if length >= 4 and buffer[pos] == 0x0a and key_length < 128 and value_pos + 2 <= pair_end \
+                and buffer[value_pos] == 0x12 and value_pos + 2 + buffer[value_pos + 1] == pair_end:
+            attributes[buffer[pos + 2:value_pos].decode('utf-8')] = buffer[value_pos + 2:pair_end].decode('utf-8')
+        else:
+            key, value = _decode_string_pair(buffer, pos, pair_end)
+            attributes[key] = value
+        pos = pair_end
+    return attributes
+
+
+def _decode_field_data(buffer, pos, end):
+    value = b''
+    while pos < end:
+        tag, pos = _decode_tag(buffer, pos)
+        if tag == 0x0a:
+            length, pos = _decode_varint(buffer, pos)
+            value = buffer[pos:pos + length]
+            pos += length
+        else:
+            pos = _skip_field(buffer, pos, tag & 0x07)
+    return value
+
+
+def _decode_record_data(buffer, pos, end):
+    values = []
+    append = values.append
+    while pos < end:
+        tag, pos = _decode_tag(buffer, pos)
+        if tag != 0x0a:
+            pos = _skip_field(buffer, pos, tag & 0x07)
+            continue
+        length = buffer[pos]
+        if length < 128:
+            pos += 1
+        else:
+            length, pos = _decode_varint(buffer, pos)
+        field_end = pos + length
+        if pos == field_end:
+            append(b'')
+            continue
+        # fast path: FieldData only holds the value with a one byte length
+        if buffer[pos] == 0x0a and buffer[pos + 1] < 128 and pos + 2 + buffer[pos + 1] == field_end:
+            append(buffer[pos + 2:field_end])
+        else:
+            append(_decode_field_data(buffer, pos, field_end))
+        pos = field_end
+    return values
+
+
+def decode_record_entry(buffer, pos, end):
+    """
+    Decode a serialized RecordEntry in buffer[pos:end], return (values, attributes, sequence, system_time),
+    values is the list of field value bytes
+    """
+    values = []
+    attributes = {}
+    sequence = 0
+    system_time = 0
+    while pos < end:
+        tag = buffer[pos]
+        if tag >= 128:
+            tag, pos = _decode_varint(buffer, pos)
+        else:
+            pos += 1
+        if tag == 0x4a or tag == 0x42:
+            length = buffer[pos]
+            if length < 128:
+                pos += 1
+            else:
+                length, pos = _decode_varint(buffer, pos)
+            if tag == 0x4a:
+                values = _decode_record_data(buffer, pos, pos + length)
+            else:
+                attributes = _decode_attributes(buffer, pos, pos + length)
+            pos += length
+        elif tag == 0x30:
+            sequence, pos = _decode_int64(buffer, pos)
+        elif tag == 0x38:
+            system_time, pos = _decode_int64(buffer, pos)
+        else:
+            pos = _skip_field(buffer, pos, tag & 0x07)
+    return values, attributes, sequence, system_time
+
+
+class GetRecordsResponseDecoder(object):
+    """
+    Streaming decoder of serialized GetRecordsResponse.
+    The response fields are read once on init, records are only located and are decoded one at a time by records().
+    """
+
+    def __init__(self, pb_str):
+        self._buffer = bytes(pb_str) if isinstance(pb_str, (memoryview, bytearray)) else pb_str
+        self._next_cursor = ''
+        self._record_count = 0
+        self._start_sequence = 0
+        self._latest_sequence = 0
+        self._latest_time = 0
+        self._record_spans = []
+        self.__scan()
+
+    @property
+    def next_cursor(self):
+        return self._next_cursor
+
+    @property
+    def record_count(self):
+        return self._record_count
+
+    @property
+    def start_sequence(self):
+        return self._start_sequence
+
+    @property
+    def latest_sequence(self):
+        return self._latest_sequence
+
+    @property
+    def latest_time(self):
+        return self._latest_time
+
+    def __len__(self):
+        return len(self._record_spans)
+
+    def records(self):
+        """
+        Yield (values, attributes, sequence, system_time) of each record
+        """
+        buffer = self._buffer
+        for start, end in self._record_spans:
+            yield decode_record_entry(buffer, start, end)
+
+    def __scan(self):
+        buffer = self._buffer
+        pos, end = 0, len(buffer)
+        try:
+            while pos < end:
+                tag, pos = _decode_tag(buffer, pos)
+                if tag == 0x22:
+                    length, pos = _decode_varint(buffer, pos)
+                    self._record_spans.append((pos, pos + length))
+                    pos += length
+                elif tag == 0x0a:
+                    length, pos = _decode_varint(buffer, pos)
+                    self._next_cursor = buffer[pos:pos + length].decode('utf-8')
+                    pos += length
+                elif tag == 0x10:
+                    self._record_count, pos = _decode_int64(buffer, pos)
+                elif tag == 0x18:
+                    self._start_sequence, pos = _decode_int64(buffer, pos)
+                elif tag == 0x28:
+                    self._latest_sequence, pos = _decode_int64(buffer, pos)
+                elif tag == 0x30:
+                    self._latest_time, pos = _decode_int64(buffer, pos)
+                else:
+                    pos = _skip_field(buffer, pos, tag & 0x07)
+        except IndexError:
+            pos = end + 1
+        if pos != end:
+            raise ValueError('Truncated GetRecordsResponse')
+
+
+class _GetRecordsResponseMessage(object):
+    """
+    GetRecordsResponse parsed by the protobuf runtime, with the same interface as GetRecordsResponseDecoder
+    """
+
+    def __init__(self, pb_str):
+        self._response = GetRecordsResponse()
+        self._response.ParseFromString(pb_str)
+
+    @property
+    def next_cursor(self):
+        return self._response.next_cursor
+
+    @property
+    def record_count(self):
+        return self._response.record_count
+
+    @property
+    def start_sequence(self):
+        return self._response.start_sequence
+
+    @property
+    def latest_sequence(self):
+        return self._response.latest_sequence
+
+    @property
+    def latest_time(self):
+        return self._response.latest_time
+
+    def __len__(self):
+        return len(self._response.records)
+
+    def records(self):
+        for pb_record in self._response.records:
+            yield ([field_data.value for field_data in pb_record.data.data],
+                   {attribute.key: attribute.value for attribute in pb_record.attributes.attributes},
+                   pb_record.sequence, pb_record.system_time)
+
+
+# The C (upb) runtime parses the whole message faster than the python decoder walks it,
+# the streaming decoder only pays off with the pure python runtime.
+STREAMING_DECODE = api_implementation.Type() == 'python'
+
+
+def decode_get_records_response(pb_str, streaming=None):
+    """
+    Decode serialized GetRecordsResponse, records are yielded by records() of the returned object
+    """
+    if streaming is None:
+        streaming = STREAMING_DECODE
+    if streaming:
+        return GetRecordsResponseDecoder(pb_str)
+    return _GetRecordsResponseMessage(pb_str)
+
+
 def encode_proto(proto_class, d):
     """Serialize a dict to protobuf bytes, replacing cprotobuf encode_data."""
     if proto_class == GetRecordsRequest:
@@ -19,22 +19,29 @@
 
 from __future__ import absolute_import
 
-import json
 import logging
 import platform
 import socket
+import threading
 from enum import Enum
 from string import Template
 
 import requests
 import six
 from requests.adapters import HTTPAdapter
+from six.moves import queue
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
 from .exceptions import exception_handler, DatahubException
 from .models.compress import CompressFormat, get_compressor
-from .utils import gen_rfc822_date, to_text, to_binary
+from .utils import gen_rfc822_date, to_text, to_binary, json_loads
 from .version import __version__, __datahub_client_version__
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 logger = logging.getLogger('datahub.rest')
 logger.setLevel(logging.INFO)
 if not logger.handlers:
@@ -105,7 +112,7 @@ class CommonResponseResult(object):
             try:
                 self._status_code = resp.status_code
                 self._request_id = resp.headers[Headers.REQUEST_ID]
-                content = json.loads(to_text(content))
+                content = json_loads(content)
                 self._error_code = content['ErrorCode']
                 self._error_msg = content['ErrorMessage']
             except Exception:
@@ -130,6 +137,255 @@ class CommonResponseResult(object):
         return self._error_msg
 
 
+class ConnectionMetrics(object):
+    """
+    Counters of the http connection pools of a client, reused = requests - created.
+    Discarded connections are closed after request because the pool is full, they should be rare if the pool
+    is large enough for the threads using the client.
+    """
+
+    METRIC_NAMES = ('requests', 'created', 'discarded')
+
+    def __init__(self):
+        self._metrics = dict((name, 0) for name in ConnectionMetrics.METRIC_NAMES)
+        self._lock = threading.Lock()
+
+    @property
+    def metrics(self):
+        """
+        Snapshot of the counters, with the reused connection count
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics['reused'] = max(metrics['requests'] - metrics['created'], 0)
+        return metrics
+
+    def incr(self, name):
+        with self._lock:
+            self._metrics[name] += 1
+
+
+def _metric_pool_class(pool_class, connection_metrics):
+    class MetricQueue(pool_class.QueueCls):
+        def put(self, item, block=True, timeout=None):
+            try:
+                pool_class.QueueCls.put(self, item, block, timeout)
+            except queue.Full:
+                connection_metrics.incr('discarded')
+                raise
+
+    class MetricConnectionPool(pool_class):
+        QueueCls = MetricQueue
+
+        def _get_conn(self, timeout=None):
+            connection_metrics.incr('requests')
+            return super(MetricConnectionPool, self)._get_conn(timeout)
+
+        def _new_conn(self):
+            connection_metrics.incr('created')
+            return super(MetricConnectionPool, self)._new_conn()
+
+    return MetricConnectionPool
+
+
+class MetricHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter counting the connection reuse of its pools into connection metrics.
+    The body is read without decoding the Content-Encoding, which is decompressed by RestClient.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['_connection_metrics']
+
+    def __init__(self, connection_metrics, **kwargs):
+        # set before super init, which calls init_poolmanager
+        self._connection_metrics = connection_metrics
+        super(MetricHTTPAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(MetricHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _metric_pool_class(HTTPConnectionPool, self._connection_metrics),
+            'https': _metric_pool_class(HTTPSConnectionPool, self._connection_metrics)
+        }
+
+    def send(self, request, stream=False, **kwargs):
+        # urllib3 decodes deflate and zstd by itself, the raw body is read before requests decodes it
+        response = super(MetricHTTPAdapter, self).send(request, stream=True, **kwargs)
+        response._content = response.raw.read(decode_content=False)
+        response._content_consumed = True
+        return response
+
+
+class TransportType(Enum):
+    """
+    Http transport of RestClient, there are:
+        ``REQUESTS``: HTTP/1.1 by requests, a connection serves one request at a time.
+        ``HTTPX``: HTTP/2 by httpx, concurrent requests are multiplexed over a few connections, httpx[http2] is required.
+        HTTP/2 is negotiated on https endpoints, http endpoints fall back to HTTP/1.1.
+    """
+    REQUESTS = 'requests'
+    HTTPX = 'httpx'
+
+
+class RequestsTransport(object):
+    """
+    Transport by requests session, the connection pools are counted in connection metrics
+    """
+
+    def __init__(self, retry_times, pool_connections, pool_maxsize, proxies, stream, conn_timeout, read_timeout):
+        self._proxies = proxies
+        self._stream = stream
+        self._timeout = (conn_timeout, read_timeout)
+
+        self._session = requests.Session()
+        self._session.headers.update({Headers.ACCEPT_ENCODING: ''})
+
+        # mount adapters with retry times
+        self._connection_metrics = ConnectionMetrics()
+        adapter = MetricHTTPAdapter(self._connection_metrics, pool_connections=pool_connections,
+                                    pool_maxsize=pool_maxsize, max_retries=retry_times)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    @property
+    def connection_metrics(self):
+        return self._connection_metrics
+
+    @property
+    def proxies(self):
+        return self._proxies
+
+    @proxies.setter
+    def proxies(self, value):
+        # proxies are passed to every send
+        self._proxies = value
+
+    def prepare(self, method, url, headers, data):
+        req = requests.Request(method.value, url, headers=headers, data=data)
+        return self._session.prepare_request(req)
+
+    def send(self, prepared_req):
+        return self._session.send(prepared_req,
+                                  stream=self._stream,
+                                  timeout=self._timeout,
+                                  proxies=self._proxies,
+                                  verify=False)
+
+    def close(self):
+        self._session.close()
+
+
+class HttpxPreparedRequest(object):
+    """
+    Httpx request with the members used by request signing and logging
+    """
+
+    __slots__ = ('_request', )
+
+    def __init__(self, request):
+        self._request = request
+
+    @property
+    def request(self):
+        return self._request
+
+    @property
+    def method(self):
+        return self._request.method
+
+    @property
+    def url(self):
+        return str(self._request.url)
+
+    @property
+    def path_url(self):
+        return to_text(self._request.url.raw_path)
+
+    @property
+    def headers(self):
+        return self._request.headers
+
+    @property
+    def body(self):
+        return self._request.content
+
+
+class HttpxTransport(object):
+    """
+    Transport by httpx client with HTTP/2, requests of all threads are multiplexed over the connections
+    """
+
+    def __init__(self, retry_times, pool_maxsize, proxies, conn_timeout, read_timeout, http2=True):
+        if httpx is None:
+            raise DatahubException('httpx is not installed, please install httpx[http2] to use HTTPX transport')
+
+        self._retry_times = retry_times
+        self._limits = httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        self._timeout = httpx.Timeout(read_timeout, connect=conn_timeout)
+        self._http2 = http2
+        self._proxies = proxies
+        self._connection_metrics = ConnectionMetrics()
+        self._client = self._new_client()
+
+    def _new_client(self):
+        client_class, transport_class = self._httpx_classes()
+
+        def new_transport(proxy=None):
+            return transport_class(http2=self._http2, verify=False, retries=self._retry_times, limits=self._limits,
+                                   proxy=proxy)
+
+        mounts = dict(('%s://' % scheme, new_transport(proxy)) for scheme, proxy in six.iteritems(self._proxies or {}))
+        return client_class(transport=new_transport(), mounts=mounts or None, timeout=self._timeout,
+                            headers={Headers.ACCEPT_ENCODING: ''})
+
+    @staticmethod
+    def _httpx_classes():
+        return httpx.Client, httpx.HTTPTransport
+
+    @property
+    def connection_metrics(self):
+        # created connections are counted by the trace of httpcore, the connections closed by the pool are not
+        # traced, so discarded is always 0
+        return self._connection_metrics
+
+    def _trace(self, event_name, info):
+        if event_name.endswith('connect_tcp.complete'):
+            self._connection_metrics.incr('created')
+
+    @property
+    def proxies(self):
+        return self._proxies
+
+    @proxies.setter
+    def proxies(self, value):
+        # proxies are mounted as transports of the client, a new client is built with the new proxies
+        self._proxies = value
+        client, self._client = self._client, self._new_client()
+        self._close_client(client)
+
+    def prepare(self, method, url, headers, data):
+        content = to_binary(data) if data is not None else None
+        return HttpxPreparedRequest(self._client.build_request(method.value, url, headers=headers, content=content,
+                                                               extensions={'trace': self._trace}))
+
+    def send(self, prepared_req):
+        self._connection_metrics.incr('requests')
+        # httpx decodes deflate and zstd by itself, the raw body is read and decompressed by RestClient
+        resp = self._client.send(prepared_req.request, stream=True)
+        try:
+            resp._content = b''.join(resp.iter_raw())
+        finally:
+            resp.close()
+        return resp
+
+    def close(self):
+        self._close_client(self._client)
+
+    @staticmethod
+    def _close_client(client):
+        client.close()
+
+
 def get_host_ip():
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     ip = '0.0.0.0'
@@ -143,10 +399,29 @@ def get_host_ip():
     return ip
 
 
-def default_user_agent(use_client):
+_user_agent_cache = {}
+_user_agent_lock = threading.Lock()
+
+
+def default_user_agent(use_client, host_ip=None):
+    """
+    User agent of the client, computed once per process for each ``use_client`` and ``host_ip``.
+    The host ip is detected by an udp socket only when ``host_ip`` is not given.
+    """
+    key = (bool(use_client), host_ip)
+    user_agent = _user_agent_cache.get(key)
+    if user_agent is None:
+        with _user_agent_lock:
+            user_agent = _user_agent_cache.get(key)
+            if user_agent is None:
+                user_agent = _user_agent_cache[key] = _build_user_agent(use_client, host_ip)
+    return user_agent
+
+
+def _build_user_agent(use_client, host_ip):
     os_version = platform.platform()
     py_version = platform.python_version()
-    ip_addr = get_host_ip()
+    ip_addr = host_ip if host_ip is not None else get_host_ip()
     ua_template = Template('$pydatahub_version $python_version $os_version $ip_addr')
     return ua_template.safe_substitute(pydatahub_version=('pyclient/%s' if use_client else 'pydatahub/%s') % __version__,
                                        python_version='python/%s' % py_version,
@@ -160,32 +435,35 @@ class RestClient(object):
 
     def __init__(self, account, endpoint, user_agent=None, proxies=None, stream=False, retry_times=3, conn_timeout=5,
                  read_timeout=120, pool_connections=10, pool_maxsize=10, exception_handler_=exception_handler,
-                 use_client=False):
+                 use_client=False, compress_policy=None, transport=TransportType.REQUESTS, host_ip=None):
         if endpoint.endswith('/'):
             endpoint = endpoint[:-1]
         self._account = account
         self._endpoint = endpoint
-        self._user_agent = user_agent or default_user_agent(use_client)
+        self._user_agent = user_agent or default_user_agent(use_client, host_ip)
+        self._header_template = self.__build_header_template()
         self._proxies = proxies
         self._stream = stream
         self._retry_times = retry_times
         self._conn_timeout = conn_timeout
         self._read_timeout = read_timeout
+        self._compress_policy = compress_policy
 
-        self._session = requests.Session()
-        self._session.headers.update({Headers.ACCEPT_ENCODING: ''})
-
-        # mount adapters with retry times
-        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
-                              max_retries=self._retry_times)
-        self._session.mount('http://', adapter)
-        self._session.mount('https://', adapter)
+        self._transport = self._new_transport(transport, pool_connections, pool_maxsize)
 
         # exception handler
         self._exception_handler = exception_handler_
 
     def __del__(self):
-        self._session.close()
+        if hasattr(self, '_transport'):
+            self._transport.close()
+
+    def _new_transport(self, transport, pool_connections, pool_maxsize):
+        if transport == TransportType.HTTPX:
+            return HttpxTransport(self._retry_times, pool_maxsize, self._proxies, self._conn_timeout,
+                                  self._read_timeout)
+        return RequestsTransport(self._retry_times, pool_connections, pool_maxsize, self._proxies,
+                                 self._stream, self._conn_timeout, self._read_timeout)
 
     @property
     def endpoint(self):
@@ -212,6 +490,7 @@ class RestClient(object):
     @user_agent.setter
     def user_agent(self, value):
         self._user_agent = value
+        self._header_template = self.__build_header_template()
 
     @property
     def proxies(self):
@@ -220,34 +499,59 @@ class RestClient(object):
     @proxies.setter
     def proxies(self, value):
         self._proxies = value
+        self._transport.proxies = value
+
+    @property
+    def compress_policy(self):
+        return self._compress_policy
+
+    @compress_policy.setter
+    def compress_policy(self, value):
+        self._compress_policy = value
+
+    @property
+    def transport(self):
+        return self._transport
+
+    @property
+    def connection_metrics(self):
+        return self._transport.connection_metrics
 
     @staticmethod
     def is_ok(resp):
         """
         return True if status code < 400
         """
-        return resp.ok
+        return resp.status_code < 400
 
-    def __common_headers(self):
-        headers = {
+    def __build_header_template(self):
+        return {
             Headers.CLIENT_VERSION: __datahub_client_version__,
             Headers.USER_AGENT: self._user_agent,
-            Headers.CONTENT_TYPE: ContentType.HTTP_JSON.value,
-            Headers.DATE: gen_rfc822_date()
+            Headers.CONTENT_TYPE: ContentType.HTTP_JSON.value
         }
+
+    def __common_headers(self):
+        headers = self._header_template.copy()
+        headers[Headers.DATE] = gen_rfc822_date()
         if self._account.security_token:
             headers[Headers.SECURITY_TOKEN] = self._account.security_token
         return headers
 
-    @staticmethod
-    def __compress_content(content, compress_format):
+    def compress_content(self, content, compress_format, url):
+        """
+        Compress the request content, return the content to send and the compress headers
+        """
         compressor = get_compressor(compress_format)
         if compressor:
-            compressed = compressor.compress(to_binary(content))
+            if self._compress_policy is None:
+                compressed = compressor.compress(to_binary(content))
+            else:
+                compressed = self._compress_policy.compress(compressor, to_binary(content), url)
             compress_headers = {
                 Headers.ACCEPT_ENCODING: compress_format.value
             }
-            if len(compressed) < len(content):
+            if compressed is not None and len(compressed) < len(content):
                 compress_headers[Headers.RAW_SIZE] = to_text(len(content))
                 compress_headers[Headers.CONTENT_ENCODING] = compress_format.value
                 return compressed, compress_headers
@@ -258,49 +562,51 @@ class RestClient(object):
     @staticmethod
     def __decompress_response(response):
         content_encoding = response.headers.get(Headers.CONTENT_ENCODING, '')
-        raw_size = int(response.headers.get(Headers.RAW_SIZE, '0'))
+        raw_size = int(response.headers.get(Headers.RAW_SIZE, '-1'))
         compressor = get_compressor(content_encoding)
 
         if compressor:
             return compressor.decompress(to_binary(response.content), raw_size)
         return response.content
 
-    def request(self, method, url, compress_format=CompressFormat.NONE, **kwargs):
+    def _prepare_request(self, method, url, compress_format, **kwargs):
+        """
+        Build the signed request of transport, shared by the sync and async requests
+        """
         url = "%s%s" % (self._endpoint, url)
 
         # Construct user agent without handling the letter case.
         headers = self.__common_headers()
-        extra_headers = kwargs.get('headers', {})
-        extra_headers = dict((k, str(v)) for k, v in six.iteritems(extra_headers))
-        headers.update(extra_headers)
+        extra_headers = kwargs.get('headers')
+        if extra_headers:
+            for k, v in six.iteritems(extra_headers):
+                headers[k] = v if isinstance(v, str) else str(v)
 
-        # Compress content and set headers
+        # Compress content and set headers, the content is compressed in advance if compress format is None
         if 'data' in kwargs:
-            data, compress_headers = RestClient.__compress_content(kwargs['data'], compress_format)
-            headers.update(compress_headers)
-            kwargs['data'] = data
+            data = kwargs['data']
+            if compress_format is not None:
+                data, compress_headers = self.compress_content(data, compress_format, url)
+                headers.update(compress_headers)
+                kwargs['data'] = data
             headers[Headers.CONTENT_LENGTH] = to_text(len(data))
 
-        kwargs['headers'] = headers
-
-        req = requests.Request(method.value, url, **kwargs)
-        prepared_req = self._session.prepare_request(req)
+        prepared_req = self._transport.prepare(method, url, headers, kwargs.get('data'))
 
         self._account.sign_request(prepared_req)
 
-        logger.debug('full request url: %s\nrequest headers:\n%s\nrequest body:\n%s'
-                     % (prepared_req.url, prepared_req.headers, prepared_req.body))
+        logger.debug('full request url: %s\nrequest headers:\n%s\nrequest body:\n%s',
+                     prepared_req.url, prepared_req.headers, prepared_req.body)
+        return prepared_req
 
-        resp = self._session.send(prepared_req,
-                                  stream=self._stream,
-                                  timeout=(self._conn_timeout, self._read_timeout),
-                                  proxies=self._proxies,
-                                  verify=False)
-
-        logger.debug('response.status_code: %d' % resp.status_code)
-        logger.debug('response.headers: \n%s' % resp.headers)
+    def _handle_response(self, resp):
+        """
+        Decompress the response content and raise the error of server, shared by the sync and async requests
+        """
+        logger.debug('response.status_code: %d', resp.status_code)
+        logger.debug('response.headers: \n%s', resp.headers)
         if not self._stream:
-            logger.debug('response.content: %s\n' % resp.content)
+            logger.debug('response.content: %s\n', resp.content)
 
         content = RestClient.__decompress_response(resp)
 
@@ -309,7 +615,7 @@ class RestClient(object):
             status_code = resp.status_code
             request_id = resp.headers.get(Headers.REQUEST_ID, '')
             try:
-                content_data = json.loads(to_text(content))
+                content_data = json_loads(content)
                 error_code = content_data['ErrorCode']
                 error_msg = content_data.get('ErrorMessage', '')
                 error_detail = content_data.get('ErrorDetail', '')
@@ -324,6 +630,11 @@ class RestClient(object):
 
         return content, resp.headers
 
+    def request(self, method, url, compress_format=CompressFormat.NONE, **kwargs):
+        prepared_req = self._prepare_request(method, url, compress_format, **kwargs)
+        resp = self._transport.send(prepared_req)
+        return self._handle_response(resp)
+
     def get(self, url, **kwargs):
         return self.request(HTTPMethod.GET, url, **kwargs)
 
@@ -338,3 +649,4 @@ class RestClient(object):
 
     def delete(self, url, **kwargs):
         return self.request(HTTPMethod.DELETE, url, **kwargs)
+
@@ -18,6 +18,7 @@
 # under the License.
 
 from .codec import *
+from .json_codec import *
 from .constants import *
 from .converters import *
 from .validator import *
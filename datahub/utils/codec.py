@@ -24,10 +24,10 @@ import struct
 from base64 import b64encode
 from hashlib import sha1
 
-import crcmod.predefined
 import six
 
 from .converters import to_binary, to_str
+from .crc import crc32c
 
 
 def hmac_sha1(secret, data):
@@ -40,15 +40,14 @@ def hmac_sha1(secret, data):
 
 
 def pb_message_wrap(pb_data):
-    crc32c = crcmod.predefined.mkCrcFun('crc-32c')
-    crc = crc32c(to_binary(pb_data)) & 0xffffffff
+    crc = crc32c(to_binary(pb_data))
     return to_binary('DHUB') + struct.pack('>I', crc) + struct.pack('>I', len(pb_data)) + pb_data
 
 
-def unwrap_pb_frame(pb_frame):
-    crc32c = crcmod.predefined.mkCrcFun('crc-32c')
+def unwrap_pb_frame(pb_frame, check_crc=True):
     binary = to_binary(pb_frame)
     crc = binary[4:8]
     pb_str = pb_frame[12:] if six.PY3 else to_str(pb_frame[12:])
-    compute_crc = struct.pack('>I', crc32c(pb_str) & 0xffffffff)
+    # the crc is trusted without computing if no need to check
+    compute_crc = struct.pack('>I', crc32c(pb_str)) if check_crc else crc
     return crc, compute_crc, pb_str
@@ -19,7 +19,7 @@
 
 from __future__ import absolute_import, print_function
 
-import datetime
+import time
 
 import six
 
@@ -34,8 +34,19 @@ def indent(text, n_spaces):
                      for it in text.split('\n'))
 
 
+_rfc822_date_cache = (None, None)
+
+
 def gen_rfc822_date():
-    date_str = datetime.datetime.utcnow().strftime(GMT_FORMAT)
+    """
+    RFC822 date of now, the formatted date is cached for the current second
+    """
+    global _rfc822_date_cache
+    now = int(time.time())
+    second, date_str = _rfc822_date_cache
+    if second != now:
+        date_str = time.strftime(GMT_FORMAT, time.gmtime(now))
+        _rfc822_date_cache = (now, date_str)
     return date_str
 
 
@@ -65,3 +76,13 @@ def to_str(text, encoding='utf-8'):
 
 def bool_to_str(value):
     return to_str(None) if value is None else to_str(value).lower()
+
+
+def double_to_str(value):
+    """
+    Format double as '%.16e' with the trailing zeros of mantissa removed, such as 1.5 -> '1.5e+00'
+    """
+    if value is None:
+        return None
+    mantissa, sep, exponent = ('%.16e' % value).partition('e')
+    return mantissa.rstrip('0') + sep + exponent
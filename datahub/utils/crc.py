@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+logger = logging.getLogger('datahub.crc')
+
+CRC32C_POLY = 0x82F63B78  # reflected Castagnoli polynomial
+
+
+def _crc32c_package():
+    import crc32c
+    return crc32c.crc32c
+
+
+def _google_crc32c():
+    import google_crc32c
+    if google_crc32c.implementation != 'c':
+        raise ImportError('google_crc32c C extension is not available')
+
+    def crc32c(data):
+        return google_crc32c.value(data if isinstance(data, bytes) else bytes(data))
+    return crc32c
+
+
+def _crcmod():
+    # only use crcmod with its C extension, the pure python implementation is no faster than the table fallback
+    from crcmod import _crcfunext
+    import crcmod.predefined
+    return crcmod.predefined.mkCrcFun('crc-32c')
+
+
+def _make_table():
+    table = []
+    for index in range(256):
+        crc = index
+        for _ in range(8):
+            crc = (crc >> 1) ^ CRC32C_POLY if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+def _table():
+    table = _make_table()
+
+    def crc32c(data):
+        crc = 0xffffffff
+        for byte in bytearray(data):
+            crc = table[(crc ^ byte) & 0xff] ^ (crc >> 8)
+        return crc ^ 0xffffffff
+    return crc32c
+
+
+# backend name --> factory of crc32c function, in order of preference
+_crc32c_backend_dict = {
+    'crc32c': _crc32c_package,
+    'google_crc32c': _google_crc32c,
+    'crcmod': _crcmod,
+    'table': _table
+}
+CRC32C_BACKENDS = ['crc32c', 'google_crc32c', 'crcmod', 'table']
+
+_crc32c_func_cache = dict()
+_crc32c_lock = threading.Lock()
+
+
+def get_crc32c_function(backend):
+    """
+    Get the crc32c function of the backend, raise ImportError if the backend is not available
+    """
+    if backend not in _crc32c_backend_dict:
+        raise ValueError('Unknown crc32c backend {}, should be one of {}'.format(backend, CRC32C_BACKENDS))
+    func = _crc32c_func_cache.get(backend)
+    if func is None:
+        with _crc32c_lock:
+            func = _crc32c_func_cache.get(backend)
+            if func is None:
+                func = _crc32c_backend_dict[backend]()
+                _crc32c_func_cache[backend] = func
+    return func
+
+
+def available_crc32c_backends():
+    backends = []
+    for backend in CRC32C_BACKENDS:
+        try:
+            get_crc32c_function(backend)
+            backends.append(backend)
+        except ImportError:
+            pass
+    return backends
+
+
+def _select_backend():
+    for backend in CRC32C_BACKENDS:
+        try:
+            return backend, get_crc32c_function(backend)
+        except ImportError:
+            pass
+    raise ImportError('No crc32c backend is available')
+
+
+_backend, _crc32c = _select_backend()
+logger.debug("Use crc32c backend: {}".format(_backend))
+
+
+def crc32c_backend():
+    return _backend
+
+
+def crc32c(data):
+    """
+    Compute crc32c of bytes-like data with the fastest available backend, the result is unsigned 32 bits
+    """
+    return _crc32c(data) & 0xffffffff
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from __future__ import absolute_import
+
+import json
+
+from ..exceptions import InvalidParameterException
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+
+class JsonBackend(object):
+    """
+    Json backend, name is the module name, dumps/loads are the serialize/deserialize functions
+    """
+
+    def __init__(self, name, dumps, loads):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+
+# in order of preference, the first installed one is selected at import, others can be set by set_json_backend
+_json_backends = []
+if orjson:
+    _json_backends.append(JsonBackend('orjson', orjson.dumps, orjson.loads))
+if ujson:
+    _json_backends.append(JsonBackend('ujson', ujson.dumps, ujson.loads))
+# the standard json of python3 has C speedups and is faster than simplejson, which is only used if selected
+_json_backends.append(JsonBackend('json', json.dumps, json.loads))
+if simplejson:
+    _json_backends.append(JsonBackend('simplejson', simplejson.dumps, simplejson.loads))
+
+_json_backend = _json_backends[0]
+
+
+def get_json_backends():
+    return [backend.name for backend in _json_backends]
+
+
+def get_json_backend():
+    return _json_backend.name
+
+
+def set_json_backend(name):
+    global _json_backend
+    for backend in _json_backends:
+        if backend.name == name:
+            _json_backend = backend
+            return
+    raise InvalidParameterException('Json backend %s is not installed, installed: %s'
+                                    % (name, ', '.join(get_json_backends())))
+
+
+def json_dumps(obj):
+    """
+    Serialize obj to json by the selected backend, it returns ascii str or utf-8 bytes (orjson).
+    Fall back to the standard json if the backend can not serialize obj, such as int over 64 bits
+    """
+    try:
+        return _json_backend.dumps(obj)
+    except (TypeError, ValueError, OverflowError):
+        return json.dumps(obj)
+
+
+def json_loads(content):
+    """
+    Deserialize json str or bytes by the selected backend, fall back to the standard json on failure
+    """
+    try:
+        return _json_backend.loads(content)
+    except (TypeError, ValueError, OverflowError):
+        return json.loads(content)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# 'License'); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# 'AS IS' BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import asyncio
+import sys
+import threading
+from unittest import mock
+
+sys.path.append('./')
+
+import requests
+
+from datahub import DataHub, AsyncDataHub, DatahubProtocolType
+from datahub.auth import AliyunAccount
+from datahub.exceptions import InvalidOperationException, InvalidParameterException
+from datahub.models import BlobRecord, CompressFormat, CursorType, FieldType, RecordSchema
+from datahub.models.compress import zstd
+from datahub.models.results import GetBatchRecordsResult, GetPBRecordsResult, GetRecordsResult
+from datahub.rest import Headers, RestClient, httpx
+from unittest_util import gen_compressed_response, run_with_fixture_server
+
+record_schema = RecordSchema.from_lists(
+    ['bigint_field', 'string_field', 'double_field', 'bool_field', 'time_field'],
+    [FieldType.BIGINT, FieldType.STRING, FieldType.DOUBLE, FieldType.BOOLEAN, FieldType.TIMESTAMP])
+
+
+class TestAsyncDataHub:
+
+    def test_async_get_records(self):
+        if httpx is None:
+            return
+        cursor = '20000000000000000000000000fb0021'
+
+        async def get_records(endpoint, protocol_type):
+            async with AsyncDataHub('access_id', 'access_key', endpoint, protocol_type=protocol_type) as dh:
+                cursor_results = await asyncio.gather(
+                    *[dh.get_cursor('cursor', 'success', '0', CursorType.OLDEST) for _ in range(10)])
+                assert all(result.cursor == '20000000000000000000000000000000' for result in cursor_results)
+                result = await dh.get_tuple_records('get', 'tuple', '0', record_schema, cursor, 10)
+                metrics = dh._rest_client.connection_metrics.metrics
+                assert metrics['requests'] == 11
+                assert 1 <= metrics['created'] <= 10
+                return result
+
+        def test(endpoint):
+            for protocol_type, result_class in ((DatahubProtocolType.JSON, GetRecordsResult),
+                                                (DatahubProtocolType.PB, GetPBRecordsResult)):
+                parse_content = result_class.parse_content
+                parse_threads = []
+
+                def parse_out_of_loop(*args, **kwargs):
+                    parse_threads.append(threading.current_thread())
+                    return parse_content(*args, **kwargs)
+
+                with mock.patch.object(result_class, 'parse_content', side_effect=parse_out_of_loop):
+                    result = asyncio.run(get_records(endpoint, protocol_type))
+                # the records read are parsed in the executor
+                assert len(parse_threads) == 1 and parse_threads[0] is not threading.current_thread()
+                dh = DataHub('access_id', 'access_key', endpoint, protocol_type=protocol_type)
+                expect = dh.get_tuple_records('get', 'tuple', '0', record_schema, cursor, 10)
+                assert result.next_cursor == expect.next_cursor
+                assert result.record_count == expect.record_count > 0
+                assert [record.values for record in result.records] == [record.values for record in expect.records]
+                assert [record.attributes for record in result.records] == \
+                       [record.attributes for record in expect.records]
+
+        captured = run_with_fixture_server(test)
+        assert len(captured) == 24
+
+    def test_async_get_batch_records(self):
+        if httpx is None:
+            return
+        cursor = '20000000000000000000000000fb0021'
+        parse_content = GetBatchRecordsResult.parse_content
+        parse_threads = []
+
+        def parse_out_of_loop(*args, **kwargs):
+            parse_threads.append(threading.current_thread())
+            return parse_content(*args, **kwargs)
+
+        async def get_records(endpoint):
+            async with AsyncDataHub('access_id', 'access_key', endpoint, protocol_type=DatahubProtocolType.BATCH,
+                                    enable_schema_register=False) as dh:
+                return await dh.get_blob_records('get', 'blob_batch', '0', cursor, 10)
+
+        def test(endpoint):
+            with mock.patch.object(GetBatchRecordsResult, 'parse_content', side_effect=parse_out_of_loop):
+                result = asyncio.run(get_records(endpoint))
+            # batch records are decoded in the executor, not in the thread of event loop
+            assert len(parse_threads) == 1 and parse_threads[0] is not threading.current_thread()
+            dh = DataHub('access_id', 'access_key', endpoint, protocol_type=DatahubProtocolType.BATCH)
+            expect = dh.get_blob_records('get', 'blob_batch', '0', cursor, 10)
+            assert result.record_count == expect.record_count > 0
+            assert [record.blob_data for record in result.records] == [record.blob_data for record in expect.records]
+
+        run_with_fixture_server(test)
+
+    def test_async_put_records(self):
+        if httpx is None:
+            return
+        records = [BlobRecord(blob_data=b'datahub async test ' * 100) for _ in range(10)]
+        compress_content = RestClient.compress_content
+        compress_threads = []
+
+        def compress_out_of_loop(*args, **kwargs):
+            compress_threads.append(threading.current_thread())
+            return compress_content(*args, **kwargs)
+
+        async def put_records(endpoint):
+            async with AsyncDataHub('access_id', 'access_key', endpoint, compress_format=CompressFormat.LZ4) as dh:
+                result = await dh.put_records('put', 'success', records)
+                assert result.failed_record_count == 0
+                try:
+                    await dh.put_records('put', 'invalid_state', records)
+                except Exception as e:
+                    return e
+
+        def test(endpoint):
+            with mock.patch.object(RestClient, 'compress_content', new=compress_out_of_loop):
+                e = asyncio.run(put_records(endpoint))
+            # the records are serialized and compressed in the executor, not in the thread of event loop
+            assert len(compress_threads) == 2 and threading.current_thread() not in compress_threads
+            try:
+                DataHub('access_id', 'access_key', endpoint).put_records('put', 'invalid_state', records)
+            except Exception as expect:
+                assert type(e) is type(expect)
+                assert e.error_code == expect.error_code == 'InvalidShardOperation'
+            else:
+                assert False
+
+        captured = run_with_fixture_server(test)
+
+        # the request is compressed and signed the same as sync client
+        method, path, headers, content = captured[0]
+        assert headers[Headers.CONTENT_ENCODING] == CompressFormat.LZ4.value
+        authorization = headers.pop(Headers.AUTHORIZATION)
+        prepared_req = requests.Request(method, 'http://endpoint' + path, headers=headers, data=content).prepare()
+        AliyunAccount(access_id='access_id', access_key='access_key').sign_request(prepared_req)
+        assert prepared_req.headers[Headers.AUTHORIZATION] == authorization
+
+    def test_async_compressed_response(self):
+        if httpx is None:
+            return
+        content = b'{"Cursor": "20000000000000000000000000000000", "RecordTime": 0, "Sequence": 0}'
+
+        async def get_cursor(endpoint):
+            async with AsyncDataHub('access_id', 'access_key', endpoint) as dh:
+                return await dh.get_cursor('project', 'topic', '0', CursorType.OLDEST)
+
+        for compress_format in (CompressFormat.DEFLATE, CompressFormat.LZ4, CompressFormat.ZLIB, CompressFormat.ZSTD):
+            if compress_format == CompressFormat.ZSTD and zstd is None:
+                continue
+            results = []
+            run_with_fixture_server(lambda endpoint: results.append(asyncio.run(get_cursor(endpoint))),
+                                    gen_compressed_response(compress_format, content))
+            assert [result.cursor for result in results] == ['20000000000000000000000000000000']
+
+    def test_async_invalid_param(self):
+        if httpx is None:
+            return
+
+        async def invalid_param():
+            dh = AsyncDataHub('access_id', 'access_key', 'http://endpoint')
+            try:
+                await dh.get_cursor('', 'topic', '0', CursorType.OLDEST)
+                assert False
+            except InvalidParameterException:
+                pass
+            try:
+                await dh.get_blob_records('project', 'topic', '0', 'cursor', 10, sub_id='sub_id')
+                assert False
+            except InvalidOperationException:
+                pass
+            try:
+                await dh.join_group('project', 'topic', '', 60000)
+                assert False
+            except InvalidParameterException:
+                pass
+            await dh.close()
+
+        asyncio.run(invalid_param())
+
+
+if __name__ == '__main__':
+    test = TestAsyncDataHub()
+    test.test_async_get_records()
+    test.test_async_get_batch_records()
+    test.test_async_put_records()
+    test.test_async_compressed_response()
+    test.test_async_invalid_param()
@@ -20,8 +20,13 @@
 import json
 import os
 import sys
+from collections import OrderedDict
+from unittest import mock
 
+from datahub.batch import record_codec
+from datahub.batch.batch_builder import BatchBuilder
 from datahub.batch.batch_serializer import BatchSerializer
+from datahub.batch.lazy_tuple_record import LazyTupleRecord
 from datahub.batch.schema_registry_client import SchemaRegistryClient
 from datahub.batch.utils import SchemaObject
 
@@ -30,10 +35,13 @@ sys.path.append('./')
 from httmock import HTTMock
 
 from datahub import DataHub, DatahubProtocolType
-from datahub.exceptions import ResourceNotFoundException, InvalidParameterException,\
+from datahub.exceptions import DatahubException, ResourceNotFoundException, InvalidParameterException,\
     LimitExceededException, ShardSealedException, InvalidCursorException
-from datahub.models import RecordSchema, FieldType, BlobRecord, TupleRecord, CompressFormat
+from datahub.models import RecordSchema, Field, FieldType, BlobRecord, TupleRecord, CompressFormat, IntegrityMode
+from datahub.models.integrity import IntegrityChecker
+from datahub.models.results import GetBatchRecordsResult
 from datahub.proto.datahub_pb2 import GetRecordsRequest, PutBinaryRecordsRequest
+from datahub.proto.proto_utils import encode_proto, encode_put_binary_records_request
 from datahub.utils import unwrap_pb_frame, to_binary
 from unittest_util import gen_batch_mock_api, _TESTS_PATH
 
@@ -667,6 +675,168 @@ class TestRecord:
         else:
             raise Exception('get data record success with unexisted shard id!')
 
+    def test_serialize_tuple_record_with_none_value(self):
+        record_schema = RecordSchema.from_lists(
+            ['bigint_field', 'string_field', 'long_string_field', 'double_field', 'bool_field'],
+            [FieldType.BIGINT, FieldType.STRING, FieldType.STRING, FieldType.DOUBLE, FieldType.BOOLEAN])
+
+        records = []
+        record0 = TupleRecord(schema=record_schema, values=[1, None, 'a' * 20, None, True])
+        record0.attributes = {'key': 'value'}
+        records.append(record0)
+        record1 = TupleRecord(schema=record_schema, values=[None, 'yc1', None, 10.01, None])
+        records.append(record1)
+
+        schema_object = SchemaObject('project', 'topic', None)
+        byte_data = BatchSerializer.serialize(CompressFormat.NONE, schema_object, records)
+        record_list = BatchSerializer.deserialize(record_schema, schema_object, byte_data)
+
+        assert len(record_list) == 2
+        assert record_list[0].values == (1, None, 'a' * 20, None, True)
+        assert record_list[0].attributes == {'key': 'value'}
+        assert record_list[1].values == (None, 'yc1', None, 10.01, None)
+
+    def test_get_tuple_record_batch_lazy_decode(self):
+        project_name = 'get'
+        topic_name = 'tuple_batch'
+        shard_id = '0'
+        limit_num = 10
+        cursor = '20000000000000000000000000fb0021'
+        record_schema = RecordSchema.from_lists(
+            ['bigint_field', 'string_field', 'double_field', 'bool_field', 'time_field'],
+            [FieldType.BIGINT, FieldType.STRING, FieldType.DOUBLE, FieldType.BOOLEAN, FieldType.TIMESTAMP])
+
+        with HTTMock(gen_batch_mock_api(lambda request: None)):
+            get_result = dh_batch.get_tuple_records(project_name, topic_name, shard_id, record_schema, cursor, limit_num,
+                                                    lazy_decode=True)
+
+        assert get_result.record_count == 3
+        record = get_result.records[0]
+        assert isinstance(record, LazyTupleRecord)
+        assert record.system_time == 1660270781252
+        assert record.get_value('string_field') == 'yc1'
+        assert record.get_value(0) == 1
+        assert record.values == (1, 'yc1', 10.01, True, 253402271999000000)
+        assert record.attributes == {"key": "value"}
+        assert get_result.records[2].get_value('bigint_field') == 9223372036854775807
+
+    def test_lazy_tuple_record(self):
+        record_schema = RecordSchema.from_lists(
+            ['bigint_field', 'string_field', 'long_string_field', 'double_field', 'bool_field'],
+            [FieldType.BIGINT, FieldType.STRING, FieldType.STRING, FieldType.DOUBLE, FieldType.BOOLEAN])
+
+        record0 = TupleRecord(schema=record_schema, values=[1, None, 'a' * 20, None, True])
+        record0.attributes = {'key': 'value'}
+        schema_object = SchemaObject('project', 'topic', None)
+        byte_data = BatchSerializer.serialize(CompressFormat.NONE, schema_object, [record0])
+        record = BatchSerializer.deserialize(record_schema, schema_object, byte_data, lazy_decode=True)[0]
+
+        assert record.get_value('long_string_field') == 'a' * 20
+        assert record.get_value(1) is None
+        assert record.get_attribute('key') == 'value'
+        record.put_attribute('key2', 'value2')
+        assert record.attributes == {'key': 'value', 'key2': 'value2'}
+
+        record.set_value('bigint_field', 2)
+        assert record.values == (2, None, 'a' * 20, None, True)
+        try:
+            record.get_value('unknown_field')
+        except InvalidParameterException:
+            pass
+        else:
+            raise Exception('get unknown field success with lazy record!')
+    def test_batch_builder(self):
+        record_schema = RecordSchema.from_lists(['bigint_field', 'string_field'], [FieldType.BIGINT, FieldType.STRING])
+        schema_object = SchemaObject('project', 'topic', None)
+        records = [TupleRecord(schema=record_schema, values=[index, 'a' * index]) for index in range(100)]
+
+        batch_builder = BatchBuilder(CompressFormat.LZ4, init_size=64)
+        raw_size = 0
+        for record in records:
+            binary_record = BatchSerializer.convert_to_binary_record(record, schema_object)
+            batch_builder.append(binary_record)
+            raw_size += binary_record.record_size
+            assert batch_builder.raw_size == raw_size
+        assert batch_builder.record_count == 100
+
+        byte_data = batch_builder.seal()
+        assert isinstance(byte_data, bytearray)
+        assert byte_data == BatchSerializer.serialize(CompressFormat.LZ4, schema_object, records)
+        expect = encode_proto(PutBinaryRecordsRequest, {'records': [{'data': bytes(byte_data)}]})
+        assert encode_put_binary_records_request(byte_data) == expect
+        record_list = BatchSerializer.deserialize(record_schema, schema_object, byte_data)
+        assert [record.values for record in record_list] == [record.values for record in records]
+
+        try:
+            batch_builder.append(binary_record)
+        except DatahubException:
+            pass
+        else:
+            raise Exception('append record to sealed batch success!')
+
+    def test_record_codec_cache(self):
+        record_schema = RecordSchema.from_lists(['bigint_field', 'string_field'], [FieldType.BIGINT, FieldType.STRING])
+        codec = record_codec.get_record_codec(record_schema)
+        with mock.patch.object(RecordSchema, 'to_json_string', side_effect=AssertionError('schema is serialized')):
+            assert record_codec.get_record_codec(record_schema) is codec
+        same_schema = RecordSchema.from_lists(['bigint_field', 'string_field'], [FieldType.BIGINT, FieldType.STRING])
+        assert record_codec.get_record_codec(same_schema) is codec
+
+        record_schema.add_field(Field('double_field', FieldType.DOUBLE))
+        assert record_codec.get_record_codec(record_schema) is not codec
+
+        # the least recently used codec is evicted
+        schemas = [RecordSchema.from_lists(['field_%d' % index], [FieldType.BIGINT]) for index in range(3)]
+        with mock.patch.object(record_codec, '_codec_cache', OrderedDict()), \
+                mock.patch.object(record_codec, 'MAX_CODEC_CACHE_SIZE', 2):
+            codecs = [record_codec.get_record_codec(schema) for schema in schemas[:2]]
+            assert record_codec.get_record_codec(schemas[0]) is codecs[0]
+            record_codec.get_record_codec(schemas[2])
+            assert record_codec.get_record_codec(schemas[0]) is codecs[0]
+            assert record_codec.get_record_codec(schemas[1]) is not codecs[1]
+
+    def test_get_record_with_integrity_mode(self):
+        with open(os.path.join(_TESTS_PATH, '../fixtures', 'projects.get.topics.blob_batch.shards.0.bin'), 'rb') as f:
+            content = bytearray(f.read())
+        content[4] ^= 0xff
+        kwargs = dict(project_name='get', topic_name='blob_batch', init_schema=None, schema_register=None)
+
+        try:
+            GetBatchRecordsResult.parse_content(bytes(content), {}, **kwargs)
+        except DatahubException:
+            pass
+        else:
+            raise Exception('get record success with error crc!')
+
+        get_result = GetBatchRecordsResult.parse_content(bytes(content), {}, integrity_checker=IntegrityChecker(IntegrityMode.OFF), **kwargs)
+        assert get_result.record_count == 3
+        assert get_result.records[0].blob_data == b'datatest-0'
+
+        assert IntegrityChecker(IntegrityMode.FULL).check_response() == (True, True)
+        assert IntegrityChecker(IntegrityMode.OUTER_ONLY).check_response() == (True, False)
+        assert IntegrityChecker('sampled', 0).check_response() == (False, False)
+        assert IntegrityChecker(IntegrityMode.SAMPLED, 1).check_response() == (True, True)
+        try:
+            IntegrityChecker('unknown')
+        except InvalidParameterException:
+            pass
+        else:
+            raise Exception('create integrity checker success with unknown mode!')
+
+    def test_put_prepared_record_batch_success(self):
+        records = [BlobRecord(blob_data=b'data-%d' % index) for index in range(10)]
+        prepared = dh_batch.prepare_records_by_shard('put', 'success', '0', records)
+        assert len(prepared) == 10
+
+        def check(request):
+            assert request.url == 'http://endpoint/projects/put/topics/success/shards/0'
+            assert request.body == prepared.content()
+            assert request.headers['Content-Type'] == 'application/x-binary'
+
+        with HTTMock(gen_batch_mock_api(check)):
+            dh_batch.put_records_by_shard('put', 'success', '0', prepared)
+
+
 if __name__ == '__main__':
     test = TestRecord()
 
@@ -690,3 +860,11 @@ if __name__ == '__main__':
     test.test_get_record_with_unexisted_project_name()
     test.test_get_record_with_unexisted_topic_name()
     test.test_get_record_with_unexisted_shard_id()
+
+    test.test_serialize_tuple_record_with_none_value()
+    test.test_get_tuple_record_batch_lazy_decode()
+    test.test_lazy_tuple_record()
+    test.test_batch_builder()
+    test.test_record_codec_cache()
+    test.test_get_record_with_integrity_mode()
+    test.test_put_prepared_record_batch_success()
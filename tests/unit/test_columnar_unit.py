@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# 'License'); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# 'AS IS' BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import sys
+from decimal import Decimal
+
+import pytest
+
+from datahub.batch.batch_serializer import BatchSerializer
+from datahub.batch.columnar import ColumnarDeserializer, ColumnBatch
+from datahub.batch.schema_registry_client import SchemaRegistryClient
+from datahub.batch.utils import SchemaObject
+
+sys.path.append('./')
+
+from httmock import HTTMock
+
+from datahub import DataHub, DatahubProtocolType
+from datahub.exceptions import InvalidParameterException
+from datahub.models import RecordSchema, FieldType, TupleRecord, CompressFormat
+from datahub.proto.datahub_pb2 import PutBinaryRecordsRequest
+from datahub.utils import unwrap_pb_frame
+from unittest_util import gen_batch_mock_api
+
+np = pytest.importorskip('numpy')
+
+dh_batch = DataHub('access_id', 'access_key', 'http://endpoint', protocol_type=DatahubProtocolType.BATCH, compress_format=CompressFormat.NONE)
+schema_register = SchemaRegistryClient(dh_batch)
+
+
+class TestColumnar:
+
+    def test_get_tuple_columns_success(self):
+        record_schema = RecordSchema.from_lists(
+            ['bigint_field', 'string_field', 'double_field', 'bool_field', 'time_field'],
+            [FieldType.BIGINT, FieldType.STRING, FieldType.DOUBLE, FieldType.BOOLEAN, FieldType.TIMESTAMP])
+
+        with HTTMock(gen_batch_mock_api(lambda request: None)):
+            get_result = dh_batch.get_tuple_columns('get', 'tuple_batch', '0', record_schema, '20000000000000000000000000fb0021', 10)
+
+        assert get_result.next_cursor == '300062f5b8bd00000000000000160001'
+        assert get_result.record_count == 3
+        assert get_result.start_seq == 22
+        columns = get_result.columns
+        assert columns['bigint_field'].values.dtype == np.int64
+        assert columns['bigint_field'].values.tolist() == [1, -9223372036854775808, 9223372036854775807]
+        assert columns['time_field'].values.tolist() == [253402271999000000, -62135798400000000, 1455869335000000]
+        assert columns['double_field'].values.tolist() == [10.01, 10.01, 10.01]
+        assert columns['bool_field'].values.tolist() == [True, True, True]
+        assert columns['string_field'].offsets.tolist() == [0, 3, 6, 9]
+        assert columns['string_field'].data.tobytes() == b'yc1yc1yc1'
+        assert columns[1].to_list() == ['yc1', 'yc1', 'yc1']
+
+    def test_deserialize_columns_with_null(self):
+        record_schema = RecordSchema.from_lists(
+            ['tinyint_field', 'smallint_field', 'integer_field', 'float_field', 'string_field', 'decimal_field'],
+            [FieldType.TINYINT, FieldType.SMALLINT, FieldType.INTEGER, FieldType.FLOAT, FieldType.STRING, FieldType.DECIMAL])
+        records = [
+            TupleRecord(schema=record_schema, values=[-1, 300, -70000, 1.5, 'a' * 20, Decimal('1.23')]),
+            TupleRecord(schema=record_schema, values=[None, None, None, None, None, None]),
+            TupleRecord(schema=record_schema, values=[127, -300, 70000, -2.5, 'short', Decimal('-99999999999.1')]),
+        ]
+        schema_object = SchemaObject('project', 'topic', None)
+        raw_buffers = [BatchSerializer.convert_byte_to_raw_buffer(BatchSerializer.serialize(CompressFormat.LZ4, schema_object, records)),
+                       BatchSerializer.convert_byte_to_raw_buffer(BatchSerializer.serialize(CompressFormat.NONE, schema_object, records[:1]))]
+        columns = ColumnarDeserializer.deserialize(record_schema, raw_buffers)
+
+        assert columns.record_count == 4
+        assert columns['tinyint_field'].validity.tolist() == [True, False, True, True]
+        assert columns['tinyint_field'].values.tolist() == [-1, 0, 127, -1]
+        assert columns['smallint_field'].values.tolist() == [300, 0, -300, 300]
+        assert columns['integer_field'].values.tolist() == [-70000, 0, 70000, -70000]
+        assert columns['float_field'].values.tolist() == [1.5, 0, -2.5, 1.5]
+        assert columns['string_field'].to_list() == ['a' * 20, None, 'short', 'a' * 20]
+        assert columns['decimal_field'].to_list() == [Decimal('1.23'), None, Decimal('-99999999999.1'), Decimal('1.23')]
+
+        try:
+            columns['unknown_field']
+        except InvalidParameterException:
+            pass
+        else:
+            raise Exception('get unknown column success!')
+
+    def test_put_tuple_columns_success(self):
+        record_schema = RecordSchema.from_lists(
+            ['bigint_field', 'string_field', 'double_field', 'bool_field', 'time_field'],
+            [FieldType.BIGINT, FieldType.STRING, FieldType.DOUBLE, FieldType.BOOLEAN, FieldType.TIMESTAMP])
+        columns = ColumnBatch.from_dict(record_schema, {
+            'bigint_field': np.array([1, -9223372036854775808, 9223372036854775807]),
+            'string_field': ['yc1', None, 'a' * 20],
+            'double_field': np.array([10.01, 10.01, np.nan]),
+            'bool_field': np.ma.masked_array([True, False, True], mask=[False, True, False]),
+            'time_field': np.array([253402271999000000, np.nan, 1455869335000000])
+        })
+
+        def check(request):
+            if isinstance(request.body, bytes):
+                assert request.url == 'http://endpoint/projects/put/topics/success/shards/0'
+                crc, compute_crc, pb_str = unwrap_pb_frame(request.body)
+                assert crc == compute_crc
+                pb_put_record_request = PutBinaryRecordsRequest()
+                pb_put_record_request.ParseFromString(pb_str)
+                pb_record_data = pb_put_record_request.records[0].data
+
+                schema_object = SchemaObject('put', 'success', schema_register)
+                with HTTMock(gen_batch_mock_api(lambda request: None)):
+                    record_list = BatchSerializer.deserialize(record_schema, schema_object, pb_record_data)
+                assert len(record_list) == 3
+                assert record_list[0].values == (1, 'yc1', 10.01, True, 253402271999000000)
+                assert record_list[1].values == (-9223372036854775808, None, 10.01, None, None)
+                assert record_list[2].values[:2] == (9223372036854775807, 'a' * 20)
+                assert np.isnan(record_list[2].values[2])
+
+        with HTTMock(gen_batch_mock_api(check)):
+            dh_batch.put_records_by_shard('put', 'success', '0', columns)
+
+    def test_serialize_columns_same_as_records(self):
+        record_schema = RecordSchema.from_lists(
+            ['tinyint_field', 'smallint_field', 'integer_field', 'float_field', 'string_field', 'decimal_field'],
+            [FieldType.TINYINT, FieldType.SMALLINT, FieldType.INTEGER, FieldType.FLOAT, FieldType.STRING, FieldType.DECIMAL])
+        values = [[-1, 300, -70000, 1.5, 'a' * 20, Decimal('1.23')],
+                  [None, None, None, None, None, None],
+                  [127, -300, 70000, -2.5, '', Decimal('-99999999999.1')]]
+        columns = ColumnBatch.from_dict(record_schema, dict(
+            (field.name, [value[index] for value in values]) for index, field in enumerate(record_schema.field_list)))
+        records = [TupleRecord(schema=record_schema, values=value) for value in values]
+
+        schema_object = SchemaObject('project', 'topic', None)
+        assert BatchSerializer.serialize_columns(CompressFormat.LZ4, schema_object, columns) == \
+            BatchSerializer.serialize(CompressFormat.LZ4, schema_object, records)
+
+    def test_columns_with_invalid_value(self):
+        record_schema = RecordSchema.from_lists(
+            ['tinyint_field', 'time_field', 'string_field'],
+            [FieldType.TINYINT, FieldType.TIMESTAMP, FieldType.STRING], allow_nulls=[True, True, False])
+
+        invalid_columns = [
+            {'tinyint_field': np.array([1, 128]), 'time_field': [1, 2], 'string_field': ['a', 'b']},
+            {'tinyint_field': [1, 2], 'time_field': np.array([1, 253402271999000001]), 'string_field': ['a', 'b']},
+            {'tinyint_field': [1, 2], 'time_field': [1, 2], 'string_field': ['a', None]},
+            {'tinyint_field': [1, 2], 'time_field': [1, 2], 'string_field': ['a']},
+            {'tinyint_field': [1, 2], 'time_field': [1, 2]},
+            {'tinyint_field': [1, 2], 'time_field': [1, 2], 'string_field': ['a', 'b'], 'unknown_field': [1, 2]},
+        ]
+        for data in invalid_columns:
+            try:
+                ColumnBatch.from_dict(record_schema, data)
+            except InvalidParameterException:
+                pass
+            else:
+                raise Exception('build ColumnBatch with invalid data success!')
+
+
+if __name__ == '__main__':
+    test = TestColumnar()
+    test.test_get_tuple_columns_success()
+    test.test_deserialize_columns_with_null()
+    test.test_put_tuple_columns_success()
+    test.test_serialize_columns_same_as_records()
+    test.test_columns_with_invalid_value()
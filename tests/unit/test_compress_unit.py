@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# 'License'); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# 'AS IS' BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import os
+import sys
+import zlib
+
+import pytest
+
+sys.path.append('./')
+
+from datahub import DataHub
+from datahub.batch.batch_header import BatchHeader, BATCH_HEAD_SIZE
+from datahub.batch.batch_serializer import BatchSerializer
+from datahub.batch.schema_registry_client import SchemaRegistryClient
+from datahub.batch.utils import SchemaObject
+from datahub.exceptions import DatahubException
+from datahub.models import RecordSchema, FieldType, TupleRecord, CompressFormat
+from datahub.models.compress import get_compressor, zstd, CompressPolicy
+from datahub.rest import TransportType, httpx
+from unittest_util import gen_compressed_response, run_with_fixture_server
+
+
+class TestCompress:
+
+    def test_compress_round_trip(self):
+        data = b'datahub compress test ' * 200
+        for compress_format in CompressFormat:
+            if compress_format == CompressFormat.ZSTD and zstd is None:
+                continue
+            compressor = get_compressor(compress_format)
+            compressed = compressor.compress(data)
+            assert compressor.decompress(compressed, len(data)) == data
+            assert compressor.decompress(memoryview(b'xx' + compressed)[2:], len(data)) == data
+            if compress_format != CompressFormat.NONE:
+                assert len(compressed) < len(data)
+
+    def test_lz4_requires_raw_size(self):
+        data = b'lz4 ' * 100
+        compressor = get_compressor(CompressFormat.LZ4)
+        try:
+            compressor.decompress(compressor.compress(data))
+            assert False
+        except DatahubException:
+            pass
+
+    def test_deflate_is_raw(self):
+        data = b'deflate ' * 100
+        compressed = get_compressor(CompressFormat.DEFLATE).compress(data)
+        assert zlib.decompress(compressed, -zlib.MAX_WBITS) == data
+
+    def test_compressed_response(self):
+        # the response body is decompressed by the client only, though the http library decodes some encodings
+        content = b'{"ProjectNames": ["datahub_compress_test"]}'
+        transports = (TransportType.REQUESTS, TransportType.HTTPX) if httpx is not None else (TransportType.REQUESTS, )
+        for compress_format in CompressFormat:
+            if compress_format == CompressFormat.ZSTD and zstd is None:
+                continue
+            results = []
+
+            def test(endpoint):
+                for transport in transports:
+                    dh = DataHub('access_id', 'access_key', endpoint, transport=transport)
+                    results.append(dh.list_project().project_names)
+
+            run_with_fixture_server(test, gen_compressed_response(compress_format, content))
+            assert results == [['datahub_compress_test']] * len(transports)
+
+    def test_batch_compress_index(self):
+        record_schema = RecordSchema.from_lists(['bigint_field', 'string_field'], [FieldType.BIGINT, FieldType.STRING])
+        schema_object = SchemaObject('project', 'topic', None)
+        records = [TupleRecord(schema=record_schema, values=[index, 'a' * (index % 20)]) for index in range(200)]
+        for compress_format in CompressFormat:
+            if compress_format == CompressFormat.ZSTD and zstd is None:
+                continue
+            assert CompressFormat.get_compress(compress_format.get_index()) == compress_format
+            byte_data = BatchSerializer.serialize(compress_format, schema_object, records)
+            batch_header = BatchHeader.deserialize(byte_data[:BATCH_HEAD_SIZE])
+            assert batch_header.attributes == compress_format.get_index() | 8
+            record_list = BatchSerializer.deserialize(record_schema, schema_object, byte_data)
+            assert [record.values for record in record_list] == [record.values for record in records]
+
+    @pytest.mark.skipif(zstd is None, reason='zstandard is not installed')
+    def test_zstd_level(self):
+        data = bytes(bytearray(range(256))) * 100
+        compressor = get_compressor(CompressFormat.ZSTD)
+        level = compressor.level
+        try:
+            compressor.level = 19
+            assert compressor.decompress(compressor.compress(data), len(data)) == data
+        finally:
+            compressor.level = level
+
+    def test_compress_policy(self):
+        compressor = get_compressor(CompressFormat.LZ4)
+        policy = CompressPolicy(min_size=100, sample_size=1000, max_ratio=0.9, probe_interval=3)
+
+        assert policy.compress(compressor, b'a' * 50, 'small') is None
+        text = b'datahub compress policy ' * 100
+        assert compressor.decompress(policy.compress(compressor, text, 'text'), len(text)) == text
+        assert policy.get_ratio('text') < 0.9
+
+        # random data is skipped by sampling, then by ratio, and probed every 3 payloads
+        random_data = os.urandom(4000)
+        assert policy.compress(compressor, random_data, 'random') is None
+        assert policy.get_ratio('random') > 0.9
+        for _ in range(5):
+            assert policy.compress(compressor, random_data, 'random') is None
+
+        metrics = policy.metrics
+        assert metrics['skipped_small'] == 1
+        assert metrics['compressed'] == 1
+        assert metrics['raw_bytes'] == len(text)
+        assert metrics['skipped_sampled'] == 1
+        assert metrics['skipped_ratio'] == 4
+        assert metrics['probed'] == 1
+        assert metrics['not_smaller'] == 1
+
+    def test_batch_compress_policy(self):
+        record_schema = RecordSchema.from_lists(['bigint_field', 'string_field'], [FieldType.BIGINT, FieldType.STRING])
+        schema_object = SchemaObject('project', 'topic', None)
+        records = [TupleRecord(schema=record_schema, values=[index, 'a' * (index % 20)]) for index in range(200)]
+        policy = CompressPolicy(min_size=1 << 20)
+
+        byte_data = BatchSerializer.serialize(CompressFormat.LZ4, schema_object, records, policy)
+        batch_header = BatchHeader.deserialize(byte_data[:BATCH_HEAD_SIZE])
+        assert batch_header.attributes == CompressFormat.NONE.get_index() | 8
+        assert policy.metrics['skipped_small'] == 1
+        record_list = BatchSerializer.deserialize(record_schema, schema_object, byte_data)
+        assert [record.values for record in record_list] == [record.values for record in records]
+
+    @pytest.mark.skipif(zstd is None, reason='zstandard is not installed')
+    def test_zstd_dictionary(self):
+        record_schema = RecordSchema.from_lists(['host', 'status'], [FieldType.STRING, FieldType.BIGINT])
+        records = [TupleRecord(schema=record_schema, values=['host-%d.datahub.aliyun.com' % (index % 7), index % 3])
+                   for index in range(2000)]
+
+        class ListSchemaResult(object):
+            page_count = 1
+            record_schema_list = [{'VersionId': 5, 'RecordSchema': record_schema.to_json_string()}]
+
+        class FakeClient(object):
+            @staticmethod
+            def list_topic_schema(project_name, topic_name, page_num, page_size):
+                return ListSchemaResult()
+
+        schema_register = SchemaRegistryClient(FakeClient())
+        schema_object = SchemaObject('project', 'topic', schema_register)
+        plain_data = BatchSerializer.serialize(CompressFormat.ZSTD, schema_object, records[:10])
+
+        dict_data = BatchSerializer.train_dictionary(records, 1024)
+        assert schema_register.register_dictionary('project', 'topic', record_schema, dict_data) == 5
+        assert schema_register.get_dictionary('project', 'topic', 5).dictionary.as_bytes() == dict_data
+        dict_byte_data = BatchSerializer.serialize(CompressFormat.ZSTD, schema_object, records[:10])
+        assert len(dict_byte_data) < len(plain_data)
+
+        record_list = BatchSerializer.deserialize(record_schema, schema_object, dict_byte_data)
+        assert [record.values for record in record_list] == [record.values for record in records[:10]]
+
+
+if __name__ == '__main__':
+    test = TestCompress()
+    test.test_compress_round_trip()
+    test.test_lz4_requires_raw_size()
+    test.test_deflate_is_raw()
+    test.test_compressed_response()
+    test.test_batch_compress_index()
+    test.test_zstd_level()
+    test.test_compress_policy()
+    test.test_batch_compress_policy()
+    test.test_zstd_dictionary()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# 'License'); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# 'AS IS' BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import sys
+import threading
+
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
+
+sys.path.append('./')
+
+import requests
+
+from datahub import DataHub, TransportType
+from datahub.auth import AliyunAccount
+from datahub.client import ProducerConfig
+from datahub.client.common.constant import Constant
+from datahub.client.common.datahub_factory import DatahubFactory
+from datahub.models import BlobRecord, CompressFormat
+from datahub import rest
+from datahub.auth import aliyun_account
+from datahub.rest import Headers, httpx
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"ProjectNames": []}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        content = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.captured.append((self.command, self.path, dict(self.headers.items()), content))
+        body = b'{"FailedRecordCount": 0, "FailedRecords": []}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class KeepAliveServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    captured = []
+
+
+def list_project_concurrently(dh, thread_num, request_num):
+    def run():
+        for i in range(request_num):
+            dh.list_project()
+
+    threads = [threading.Thread(target=run) for _ in range(thread_num)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestConnection:
+
+    def test_connection_metrics(self):
+        server = KeepAliveServer(('127.0.0.1', 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever).start()
+        try:
+            endpoint = 'http://127.0.0.1:%d' % server.server_address[1]
+            dh = DataHub('access_id', 'access_key', endpoint, pool_maxsize=4)
+            list_project_concurrently(dh, 4, 20)
+            metrics = dh.get_connection_metrics()
+            assert metrics['requests'] == 80
+            assert 1 <= metrics['created'] <= 4
+            assert metrics['discarded'] == 0
+            assert metrics['reused'] == metrics['requests'] - metrics['created']
+
+            dh = DataHub('access_id', 'access_key', endpoint, pool_maxsize=1)
+            list_project_concurrently(dh, 8, 20)
+            metrics = dh.get_connection_metrics()
+            assert metrics['requests'] == 160
+            assert metrics['created'] - metrics['discarded'] <= 1
+
+            if httpx is not None:
+                dh = DataHub('access_id', 'access_key', endpoint, pool_maxsize=4, transport=TransportType.HTTPX)
+                list_project_concurrently(dh, 4, 20)
+                metrics = dh.get_connection_metrics()
+                assert metrics['requests'] == 80
+                assert 1 <= metrics['created'] <= 4
+                assert metrics['reused'] == metrics['requests'] - metrics['created']
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_factory_pool_size(self):
+        config = ProducerConfig('access_id', 'access_key', 'http://endpoint')
+        config.async_thread_limit = 32
+        dh = DatahubFactory.create_datahub_client(config)
+        adapter = dh._datahub_impl._rest_client.transport._session.get_adapter('http://endpoint')
+        assert adapter._pool_maxsize == 32 + Constant.EXTRA_POOL_CONNECTIONS
+
+        config.async_thread_limit = 8
+        assert DatahubFactory.create_datahub_client(config) is not dh
+
+    def test_user_agent_cached(self):
+        get_host_ip = rest.get_host_ip
+        detect_count = []
+
+        def count_get_host_ip():
+            detect_count.append(1)
+            return get_host_ip()
+
+        rest.get_host_ip = count_get_host_ip
+        rest._user_agent_cache.clear()
+        try:
+            dh0 = DataHub('access_id', 'access_key', 'http://endpoint')
+            dh1 = DataHub('access_id', 'access_key', 'http://endpoint')
+            assert dh0._datahub_impl._rest_client.user_agent is dh1._datahub_impl._rest_client.user_agent
+            assert len(detect_count) == 1
+
+            # the host ip supplied skips the detection
+            config = ProducerConfig('access_id', 'access_key', 'http://endpoint')
+            config.host_ip = '10.0.0.1'
+            dh2 = DatahubFactory.create_datahub_client(config)
+            assert dh2._datahub_impl._rest_client.user_agent.startswith('pyclient/')
+            assert dh2._datahub_impl._rest_client.user_agent.endswith(' ip/10.0.0.1')
+            assert len(detect_count) == 1
+        finally:
+            rest.get_host_ip = get_host_ip
+
+    def test_request_signing_cache(self):
+        aliyun_account._canonical_resource_cache.clear()
+        account = AliyunAccount(access_id='access_id', access_key='access_key')
+        client = rest.RestClient(account, 'http://endpoint', user_agent='test')
+        signatures = []
+        for _ in range(2):
+            prepared_req = client._prepare_request(rest.HTTPMethod.POST, '/projects/p%20x/topics/t?b=2&a=1',
+                                                   rest.CompressFormat.NONE, data='{}', headers={'x-datahub-int': 1})
+            assert prepared_req.headers['x-datahub-int'] == '1'
+            assert prepared_req.headers[Headers.USER_AGENT] == 'test'
+            signatures.append((prepared_req.headers[Headers.DATE], prepared_req.headers[Headers.AUTHORIZATION]))
+        assert aliyun_account._canonical_resource_cache == {'/projects/p%20x/topics/t?b=2&a=1': '/projects/p x/topics/t?a=1&b=2'}
+        # requests signed in the same second get the same date and signature
+        assert signatures[0][0] != signatures[1][0] or signatures[0][1] == signatures[1][1]
+
+    def test_prepared_hmac(self):
+        class RotatedCredential(object):
+            def __init__(self):
+                self.access_key = 'access_key0'
+
+            def get_credential(self):
+                return self
+
+            def get_access_key_id(self):
+                return 'access_id'
+
+            def get_access_key_secret(self):
+                return self.access_key
+
+            def get_security_token(self):
+                return ''
+
+        def sign(account):
+            prepared_req = requests.Request('POST', 'http://endpoint/projects/p/topics/t/shards/0',
+                                            headers={Headers.CONTENT_TYPE: 'application/json', Headers.DATE: 'date'},
+                                            data=b'{}').prepare()
+            account.sign_request(prepared_req)
+            return prepared_req.headers[Headers.AUTHORIZATION]
+
+        credential = RotatedCredential()
+        credential_account = AliyunAccount(credential=credential)
+        expects = [sign(AliyunAccount(access_id='access_id', access_key=key)) for key in ('access_key0', 'access_key1')]
+        assert expects[0] != expects[1]
+        assert [sign(credential_account), sign(credential_account)] == [expects[0]] * 2
+
+        # the prepared hmac is refreshed when the key rotated
+        credential.access_key = 'access_key1'
+        assert sign(credential_account) == expects[1]
+
+        account = AliyunAccount(access_id='access_id', access_key='access_key0')
+        assert sign(account) == expects[0]
+        account.access_key = 'access_key1'
+        assert sign(account) == expects[1]
+
+    def test_httpx_transport(self):
+        if httpx is None:
+            return
+        server = KeepAliveServer(('127.0.0.1', 0), KeepAliveHandler)
+        server.captured = []
+        threading.Thread(target=server.serve_forever).start()
+        try:
+            endpoint = 'http://127.0.0.1:%d' % server.server_address[1]
+            records = [BlobRecord(blob_data=b'datahub transport test ' * 100) for _ in range(10)]
+            for transport in (TransportType.REQUESTS, TransportType.HTTPX):
+                dh = DataHub('access_id', 'access_key', endpoint, compress_format=CompressFormat.LZ4,
+                             transport=transport)
+                assert dh.put_records('project', 'topic', records).failed_record_count == 0
+                assert dh.list_project().project_names == []
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert len(server.captured) == 2
+        (method0, path0, headers0, content0), (method1, path1, headers1, content1) = server.captured
+        assert (method0, path0, content0) == (method1, path1, content1)
+        for name in (Headers.CONTENT_TYPE, Headers.CONTENT_ENCODING, Headers.RAW_SIZE, Headers.CLIENT_VERSION,
+                     Headers.USER_AGENT, Headers.CONTENT_LENGTH):
+            assert headers0[name] == headers1[name]
+        assert headers1[Headers.CONTENT_ENCODING] == CompressFormat.LZ4.value
+
+        # the signature is the same as requests signs with the same headers
+        for method, path, headers in ((method0, path0, headers0), (method1, path1, headers1)):
+            authorization = headers.pop(Headers.AUTHORIZATION)
+            prepared_req = requests.Request(method, 'http://endpoint' + path, headers=headers).prepare()
+            AliyunAccount(access_id='access_id', access_key='access_key').sign_request(prepared_req)
+            assert prepared_req.headers[Headers.AUTHORIZATION] == authorization
+
+    def test_proxies_setter(self):
+        server = KeepAliveServer(('127.0.0.1', 0), KeepAliveHandler)
+        server.captured = []
+        threading.Thread(target=server.serve_forever).start()
+        try:
+            # the fixture server acts as the proxy, requests to the unresolvable endpoint reach it only by proxy
+            proxies = {'http': 'http://127.0.0.1:%d' % server.server_address[1]}
+            transports = (TransportType.REQUESTS, TransportType.HTTPX) if httpx is not None else (TransportType.REQUESTS, )
+            for transport in transports:
+                dh = DataHub('access_id', 'access_key', 'http://endpoint.invalid', transport=transport, retry_times=0)
+                dh._datahub_impl.rest_client.proxies = proxies
+                assert dh._datahub_impl.rest_client.transport.proxies == proxies
+                assert dh.put_records('project', 'topic', [BlobRecord(blob_data=b'proxy')]).failed_record_count == 0
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert [path for _, path, _, _ in server.captured] == ['http://endpoint.invalid/projects/project/topics/topic/shards'] * len(transports)
+
+
+if __name__ == '__main__':
+    test = TestConnection()
+    test.test_connection_metrics()
+    test.test_factory_pool_size()
+    test.test_user_agent_cached()
+    test.test_request_signing_cache()
+    test.test_prepared_hmac()
+    test.test_httpx_transport()
+    test.test_proxies_setter()
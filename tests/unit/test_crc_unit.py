@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# 'License'); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# 'AS IS' BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import sys
+
+sys.path.append('./')
+
+from datahub.utils.crc import available_crc32c_backends, crc32c, crc32c_backend, get_crc32c_function
+
+
+class TestCrc:
+
+    def test_crc32c_backends(self):
+        backends = available_crc32c_backends()
+        assert 'table' in backends
+        assert crc32c_backend() == backends[0]
+
+        data = bytes(bytearray(range(256))) * 10
+        for backend in backends:
+            func = get_crc32c_function(backend)
+            assert func(b'123456789') & 0xffffffff == 0xE3069283
+            assert func(data) & 0xffffffff == crc32c(data)
+            assert func(memoryview(data)[3:]) & 0xffffffff == crc32c(data[3:])
+
+    def test_unknown_crc32c_backend(self):
+        try:
+            get_crc32c_function('unknown')
+        except ValueError:
+            pass
+        else:
+            raise Exception('get unknown crc32c backend success!')
+
+
+if __name__ == '__main__':
+    test = TestCrc()
+    test.test_crc32c_backends()
+    test.test_unknown_crc32c_backend()
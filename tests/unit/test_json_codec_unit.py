@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# 'License'); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# 'AS IS' BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+import json
+import re
+import sys
+
+sys.path.append('./')
+
+from datahub.exceptions import InvalidParameterException
+from datahub.models import RecordSchema, FieldType, TupleRecord
+from datahub.models.params import PutRecordsRequestParams
+from datahub.utils import json_dumps, json_loads, get_json_backends, get_json_backend, set_json_backend, \
+    double_to_str, to_text
+
+
+class TestJsonCodec:
+
+    def test_json_backends(self):
+        default_backend = get_json_backend()
+        assert get_json_backends()[0] == default_backend
+        assert 'json' in get_json_backends()
+
+        obj = {'Action': 'pub', 'Records': [{'Data': ['1', None, '中文'], 'Sequence': 2 ** 63 - 1}]}
+        try:
+            for backend in get_json_backends():
+                set_json_backend(backend)
+                assert get_json_backend() == backend
+                assert json.loads(to_text(json_dumps(obj))) == obj
+                assert json_loads(json.dumps(obj)) == obj
+                assert json_loads(json.dumps(obj).encode('utf-8')) == obj
+                # fall back to the standard json for int over 64 bits
+                assert json_loads(json_dumps({'value': 2 ** 70})) == {'value': 2 ** 70}
+        finally:
+            set_json_backend(default_backend)
+
+        try:
+            set_json_backend('unknown')
+        except InvalidParameterException:
+            pass
+        else:
+            raise Exception('set unknown json backend success!')
+
+    def test_double_to_str(self):
+        for value in (0.0, -0.0, 1.0, 1.5, 100.0, 0.1, -2.5e-300, 1e300, 5e-324, 123456789.123,
+                      float('inf'), float('-inf'), float('nan')):
+            assert double_to_str(value) == re.sub(r'0+e', 'e', '%.16e' % value)
+        assert double_to_str(1.5) == '1.5e+00'
+        assert double_to_str(None) is None
+
+    def test_put_records_content(self):
+        record_schema = RecordSchema.from_lists(['double_field', 'bool_field', 'string_field'],
+                                                [FieldType.DOUBLE, FieldType.BOOLEAN, FieldType.STRING])
+        record = TupleRecord(schema=record_schema, values=[1.25, True, '中文'])
+        content = json.loads(to_text(PutRecordsRequestParams([record]).content()))
+        assert content['Action'] == 'pub'
+        assert content['Records'][0]['Data'] == ['1.25e+00', 'true', '中文']
+
+
+if __name__ == '__main__':
+    test = TestJsonCodec()
+    test.test_json_backends()
+    test.test_double_to_str()
+    test.test_put_records_content()
@@ -30,8 +30,9 @@ from httmock import HTTMock
 from datahub import DataHub, DatahubProtocolType
 from datahub.exceptions import ResourceNotFoundException, InvalidOperationException, \
     InvalidParameterException, LimitExceededException, ShardSealedException, InvalidCursorException
-from datahub.models import RecordSchema, FieldType, BlobRecord, TupleRecord, CompressFormat
-from datahub.proto.datahub_pb2 import PutRecordsRequest, GetRecordsRequest
+from datahub.models import RecordSchema, Field, FieldType, BlobRecord, TupleRecord, CompressFormat
+from datahub.proto.datahub_pb2 import PutRecordsRequest, GetRecordsRequest, GetRecordsResponse, RecordEntry
+from datahub.proto.proto_utils import encode_proto, encode_put_records_request, decode_get_records_response
 from datahub.utils import unwrap_pb_frame, to_binary
 from .unittest_util import gen_mock_api, gen_pb_mock_api, _TESTS_PATH
 
@@ -835,6 +836,111 @@ class TestRecord:
             pass
         else:
             raise Exception('set value out of range success!')
+    def test_encode_pb_record_entry(self):
+        record_schema = RecordSchema.from_lists(['bigint_field', 'string_field', 'bool_field'],
+                                                [FieldType.BIGINT, FieldType.STRING, FieldType.BOOLEAN], [True, True, True])
+        record0 = TupleRecord(schema=record_schema, values=[1, 'a' * 200, True])
+        record0.shard_id = '0'
+        record0.partition_key = 'key'
+        record0.attributes = {'key': 'value', '中文': '属性'}
+        record1 = BlobRecord(blob_data=b'\x00\x01' * 100)
+        record1.hash_key = '4FFFFFFFFFFFFFFD7FFFFFFFFFFFFFFD'
+        for record in (record0, record1):
+            expect = encode_proto(PutRecordsRequest, {'records': [record.to_pb_record_entry()]})
+            assert encode_put_records_request([record.encode_pb_record_entry()]) == expect
+
+        record2 = TupleRecord(schema=record_schema, values=[None, 'a', None])
+        pb_record_entry = RecordEntry()
+        pb_record_entry.ParseFromString(record2.encode_pb_record_entry())
+        assert [field_data.HasField('value') for field_data in pb_record_entry.data.data] == [False, True, False]
+        assert pb_record_entry.data.data[1].value == b'a'
+
+    def test_decode_get_records_response(self):
+        response = GetRecordsResponse(next_cursor='30005af19b3800000000000003e80000', record_count=3,
+                                      start_sequence=1000, latest_sequence=1002, latest_time=1660194841312)
+        entry0 = response.records.add()
+        entry0.shard_id = '0'
+        entry0.sequence = 1000
+        entry0.system_time = 1660194841312
+        entry0.data.data.add().value = b'a' * 300
+        entry0.data.data.add()
+        entry0.data.data.add().value = b'true'
+        attribute = entry0.attributes.attributes.add()
+        attribute.key = '中文'
+        attribute.value = '属性' * 100
+        attribute = entry0.attributes.attributes.add()
+        attribute.key = 'key'
+        attribute.value = 'value'
+        entry1 = response.records.add()
+        entry1.sequence = 1001
+        entry1.system_time = -1
+        entry1.data.data.add().value = b'\x00\x01'
+        response.records.add()
+        pb_str = response.SerializeToString()
+
+        decoder = decode_get_records_response(pb_str, streaming=True)
+        message = decode_get_records_response(pb_str, streaming=False)
+        assert len(decoder) == len(message) == 3
+        for name in ('next_cursor', 'record_count', 'start_sequence', 'latest_sequence', 'latest_time'):
+            assert getattr(decoder, name) == getattr(message, name)
+        records = list(decoder.records())
+        assert records == list(message.records())
+        assert records[0] == ([b'a' * 300, b'', b'true'], {'中文': '属性' * 100, 'key': 'value'}, 1000, 1660194841312)
+        assert records[1] == ([b'\x00\x01'], {}, 1001, -1)
+        assert records[2] == ([], {}, 0, 0)
+
+        try:
+            decode_get_records_response(pb_str[:100], streaming=True)
+        except ValueError:
+            pass
+        else:
+            raise Exception('decode truncated response success!')
+
+    def test_build_tuple_record_from_wire(self):
+        record_schema = RecordSchema.from_lists(
+            ['tinyint_field', 'bigint_field', 'double_field', 'bool_field', 'string_field', 'decimal_field',
+             'timestamp_field'],
+            [FieldType.TINYINT, FieldType.BIGINT, FieldType.DOUBLE, FieldType.BOOLEAN, FieldType.STRING,
+             FieldType.DECIMAL, FieldType.TIMESTAMP])
+        wire_values = [
+            [b'1', b'-9223372036854775808', b'1.5', b'true', '中文'.encode('utf-8'), b'12.345', b'1455869335000000'],
+            ['1', '-9223372036854775808', '1.5', 'false', '中文', '12.345', '1455869335000000'],
+            [1, -9223372036854775808, 1.5, True, '中文', decimal.Decimal('12.345'), 1455869335000000],
+            [b'', b'', b'', b'', b'', b'', b''],
+            [None, None, None, None, None, None, None],
+        ]
+        for values in wire_values:
+            record = TupleRecord.from_wire(record_schema, values)
+            expect = TupleRecord(schema=record_schema, values=values)
+            assert record.values == expect.values
+            assert record.get_value('string_field') == expect.get_value('string_field')
+        assert TupleRecord.from_wire(record_schema, [b'1']).values == (1, None, None, None, None, None, None)
+
+        record_schema.add_field(Field('int_field', FieldType.INTEGER, allow_null=False))
+        record = TupleRecord.from_wire(record_schema, [b'1', b'2', b'1.5', b'TRUE', b'a', b'1', b'3', b'4'])
+        assert record.values == (1, 2, 1.5, True, 'a', decimal.Decimal('1'), 3, 4)
+        assert record.get_value('int_field') == 4
+        for values in ([b'1', b'2', b'1.5', b'yes', b'a', b'1', b'3', b'4'],
+                       [b'1', b'2', b'1.5', b'true', b'a', b'1', b'3', None],
+                       [b'1', b'2', b'1.5', b'true', b'a', b'1', b'3', b'']):
+            try:
+                TupleRecord.from_wire(record_schema, values)
+            except InvalidParameterException:
+                pass
+            else:
+                raise Exception('build tuple record from invalid wire values success!')
+
+    def test_blob_record_lazy_decode(self):
+        blob_data = os.urandom(64 * 1024)
+        values = base64.b64encode(blob_data).decode('ascii')
+        record = BlobRecord(values=values)
+        assert record._blob_data is None
+        assert record.encode_values() is values
+        assert record.blob_data == blob_data
+        assert record.decode_values() == blob_data
+        assert record.encode_pb_values() == [blob_data]
+        assert BlobRecord(blob_data=blob_data).encode_values() == values
+
 
 if __name__ == '__main__':
     test = TestRecord()
@@ -863,3 +969,7 @@ if __name__ == '__main__':
     test.test_put_tuple_record_pb_success()
     test.test_get_tuple_record_pb_success()
     test.test_set_value_out_of_range()
+    test.test_encode_pb_record_entry()
+    test.test_decode_get_records_response()
+    test.test_build_tuple_record_from_wire()
+    test.test_blob_record_lazy_decode()
@@ -19,10 +19,16 @@
 
 import json
 import os
+import threading
 
+import six
 from httmock import urlmatch, response
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
 
 from datahub.exceptions import InvalidParameterException
+from datahub.models.compress import get_compressor
+from datahub.rest import Headers
 
 _TESTS_PATH = os.path.abspath(os.path.dirname(__file__))
 _FIXTURE_PATH = os.path.join(_TESTS_PATH, '../fixtures')
@@ -107,3 +113,75 @@ def gen_batch_mock_api(check):
         return response(status_code, content, headers, request=request)
 
     return datahub_batch_api_mock
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.__response(b'')
+
+    def do_POST(self):
+        self.__response(self.rfile.read(int(self.headers['Content-Length'])))
+
+    do_PUT = do_POST
+
+    def __response(self, content):
+        headers = dict(self.headers.items())
+        self.server.captured.append((self.command, self.path, headers, content))
+        status_code, response_headers, body = self.server.gen_response(self.path, headers, content)
+        self.send_response(status_code)
+        for name, value in six.iteritems(response_headers):
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('x-datahub-request-id', '0')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, gen_response):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), FixtureHandler)
+        self.gen_response = gen_response
+        self.captured = []
+
+
+def gen_fixture_response(path, headers, content):
+    # json requests are served by json fixtures, pb requests by bin fixtures
+    content_type = headers.get('Content-Type', 'application/json')
+    suffix = 'json' if content_type == 'application/json' else 'bin'
+    with open(os.path.join(_FIXTURE_PATH, '%s.%s' % (path.replace('/', '.')[1:], suffix)), 'rb') as f:
+        body = f.read()
+    return 500 if suffix == 'json' and b'ErrorCode' in body else 200, {'Content-Type': content_type}, body
+
+
+def gen_compressed_response(compress_format, content):
+    def gen_response(path, headers, request_content):
+        return 200, {
+            Headers.CONTENT_TYPE: 'application/json',
+            Headers.CONTENT_ENCODING: compress_format.value,
+            Headers.RAW_SIZE: str(len(content))
+        }, get_compressor(compress_format).compress(content)
+
+    return gen_response
+
+
+def run_with_fixture_server(test, gen_response=gen_fixture_response):
+    """
+    Run test(endpoint) with a local http server for the clients not mocked by httmock, like the async client.
+    The (status code, headers, body) responded is built by gen_response(path, headers, content),
+    return the captured (method, path, headers, content)
+    """
+    server = FixtureServer(gen_response)
+    threading.Thread(target=server.serve_forever).start()
+    try:
+        test('http://127.0.0.1:%d' % server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+    return server.captured
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# 'License'); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# 'AS IS' BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import asyncio
+import json
+
+from datahub import DatahubProtocolType
+from datahub.client import AsyncDatahubConsumer, AsyncDatahubProducer
+from datahub.client.common.config import ConsumerConfig, ProducerConfig
+from datahub.models import BlobRecord, CompressFormat
+from datahub.rest import httpx
+from unit.unittest_util import run_with_fixture_server
+from unit_consumer.unittest_util import gen_consumer_final_response, get_fixture_action
+
+
+def run_with_server(test):
+    return run_with_fixture_server(lambda endpoint: asyncio.run(test(endpoint)), gen_consumer_final_response)
+
+
+class TestAsyncClient:
+
+    def test_async_consumer(self):
+        if httpx is None:
+            return
+
+        async def consume(endpoint):
+            consumer_config = ConsumerConfig('access_id', 'access_key', endpoint, DatahubProtocolType.JSON,
+                                             CompressFormat.NONE)
+            cnt = 0
+            async with AsyncDatahubConsumer('success', 'success', '166123931038000XXX', consumer_config) as consumer:
+                async for record in consumer:
+                    assert record.system_time == 1526292424292
+                    assert record.values == 'iVBORw0KGgoAAAANSUhEUgAAB5FrTVeMB4wHjAeMBD3nAgEU'
+                    assert record.record_key.is_ready()
+                    cnt += 1
+                    if cnt >= 20:
+                        break
+            assert cnt == 20
+
+        captured = run_with_server(consume)
+        actions = [get_fixture_action(headers, content) for _, _, headers, content in captured]
+        assert actions.index('joinGroup') < actions.index('heartBeat') < actions.index('open') < actions.index('sub')
+        # the acked offset is committed when closed, then leave group
+        commit = json.loads(captured[actions.index('commit')][3])
+        assert commit['Offsets']['0']['Sequence'] == 123
+        assert actions[-1] == 'leaveGroup'
+
+    def test_async_producer(self):
+        if httpx is None:
+            return
+
+        async def produce(endpoint):
+            producer_config = ProducerConfig('access_id', 'access_key', endpoint, DatahubProtocolType.PB,
+                                             CompressFormat.NONE)
+            async with AsyncDatahubProducer('success', 'success', producer_config) as producer:
+                shard_ids = [await producer.write([BlobRecord(blob_data=b'sync')]) for _ in range(3)]
+                assert sorted(shard_ids) == ['0', '1', '2']
+
+                futures = [await producer.write_async([BlobRecord(blob_data=b'async %d' % i)]) for i in range(30)]
+                await producer.flush()
+                results = await asyncio.gather(*futures)
+                assert sorted(set(result.shard_id for result in results)) == ['0', '1', '2']
+
+                # buffered records not flushed are failed when closed
+                future = await producer.write_async([BlobRecord(blob_data=b'not flushed')])
+            try:
+                await future
+                assert False
+            except Exception as e:
+                assert 'closed' in str(e)
+
+        captured = run_with_server(produce)
+        puts = [content for _, _, headers, content in captured if get_fixture_action(headers, content) == 'put']
+        # 3 sync writes, and the async records are packed into one request per shard
+        assert len(puts) == 6
+        assert sum(content.count(b'async') for content in puts) == 30
+
+
+if __name__ == '__main__':
+    test = TestAsyncClient()
+    test.test_async_consumer()
+    test.test_async_producer()
@@ -77,4 +77,26 @@ def gen_consumer_final_api(check):
             content['ErrorMessage'] = 'Loads fixture %s failed, error: %s' % (res_file, e)
         return response(status_code, content, headers, request=request)
 
-    return datahub_api_mock
\ No newline at end of file
+    return datahub_api_mock
+
+def get_fixture_action(headers, content):
+    """
+    Action of the request captured by unit.unittest_util.run_with_fixture_server, 'put' for put records by shard in pb
+    """
+    if not content:
+        return None
+    if headers.get('Content-Type') != 'application/json':
+        return 'put'
+    return json.loads(content)['Action']
+
+
+def gen_consumer_final_response(path, headers, content):
+    action = get_fixture_action(headers, content)
+    if action == 'put':
+        # put records by shard in pb protocol, the result has no content
+        return 200, {'Content-Type': 'application/json'}, b''
+    path = path.replace('/', '.')[1:]
+    if action:
+        path += '.' + action
+    with open(os.path.join(_FIXTURE_FINAL_PATH, '%s.json' % path), 'rb') as f:
+        return 200, {'Content-Type': 'application/json'}, f.read()